@@ -0,0 +1,85 @@
+import os
+import json
+import time
+from pathlib import Path
+
+
+class JsonlCheckpoint:
+    """
+    追加写入的任务检查点：每完成一个任务写一行 {"task": 任务键, "records": [...], "failed": bool}，
+    距上次 fsync 超过 fsync_interval 秒时落盘。resume 时读取已有文件，成功完成的任务可直接跳过，
+    失败的任务会重跑，同一任务以最后一行为准。compact() 生成原来的 JSON 数组格式
+    """
+
+    def __init__(self, path, fsync_interval: float = 5.0, resume: bool = True):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.fsync_interval = fsync_interval
+        self.entries = self.load() if resume else {}
+        self.file = self.path.open('a' if resume else 'w', encoding='utf-8')
+        self.last_sync = time.monotonic()
+
+    def load(self) -> dict[str, dict]:
+        entries = {}
+        if not self.path.exists():
+            return entries
+        valid_size = 0
+        with self.path.open('rb') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except (json.JSONDecodeError, UnicodeDecodeError):
+                    # 崩溃时最后一行可能只写了一半
+                    continue
+                if not line.endswith(b"\n"):
+                    continue
+                entries.pop(entry["task"], None)
+                entries[entry["task"]] = entry
+                valid_size = f.tell()
+        if valid_size < self.path.stat().st_size:
+            # 截掉写了一半的尾部，免得新记录接在残行后面
+            with self.path.open('r+b') as f:
+                f.truncate(valid_size)
+        if entries:
+            done = sum(not entry["failed"] for entry in entries.values())
+            print(f"[RESUME] 从 {self.path} 恢复 {done} 个已完成任务，{len(entries) - done} 个失败任务将重跑")
+        return entries
+
+    def done(self, task: str) -> bool:
+        entry = self.entries.get(task)
+        return entry is not None and not entry["failed"]
+
+    def append(self, task: str, records: list[dict], failed: bool = False):
+        entry = {"task": task, "records": records, "failed": failed}
+        self.entries.pop(task, None)
+        self.entries[task] = entry
+        self.file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self.file.flush()
+        if time.monotonic() - self.last_sync >= self.fsync_interval:
+            self.sync()
+
+    def sync(self):
+        os.fsync(self.file.fileno())
+        self.last_sync = time.monotonic()
+
+    def close(self):
+        if not self.file.closed:
+            self.sync()
+            self.file.close()
+
+    def compact(self, output_path, order: list[str] | None = None) -> int:
+        """
+        把检查点整理为 JSON 数组写入 output_path（先写临时文件再替换），order 给出任务顺序，
+        不在其中的任务排在最后。返回写出的记录数
+        """
+        tasks = list(self.entries)
+        if order is not None:
+            rank = {task: i for i, task in enumerate(order)}
+            tasks.sort(key=lambda task: rank.get(task, len(rank)))
+        records = [record for task in tasks for record in self.entries[task]["records"]]
+        output_path = Path(output_path)
+        tmp_path = output_path.with_suffix(".tmp")
+        with tmp_path.open('w', encoding='utf-8') as f:
+            json.dump(records, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, output_path)
+        return len(records)
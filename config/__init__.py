@@ -1,20 +1,161 @@
-from neo4j import GraphDatabase
-from pydantic import SecretStr
-from langchain_openai import ChatOpenAI
-from langchain_ollama import ChatOllama
+import os
+import json
+import atexit
+from functools import lru_cache
+from pathlib import Path
 
-API = "Your API Key"
-URL = "Your URL"
+# 以下为默认值；同名环境变量或 APIKG_CONFIG 指向的 JSON 文件（默认 config/settings.json）中的同名键会覆盖它们
+DEFAULTS = {
+    "API": "Your API Key",
+    "URL": "Your URL",
+    "LLM_MODEL": "model name",
+    "OLLAMA_MODEL": "model name",
+    "EVAL_API": "Your API Key",
+    "EVAL_URL": "Your URL",
+    "EVAL_MODEL": "model name",
+    "NEO4J_URI": "bolt://localhost:7687",
+    "NEO4J_USER": "name",
+    "NEO4J_PASSWORD": "password",
+    # "neo4j" 或 "memory"；memory 直接加载 API_JSON_DIR 下提取出的 JSON，无需数据库
+    "GRAPH_BACKEND": "neo4j",
+    "API_JSON_DIR": r"Your path to the api_JSON folder",
+    "EMBED_MODEL": "sentence-transformers/all-MiniLM-L6-v2",
+    # LLM 响应缓存；TTL 单位为秒，0 表示永不过期
+    "LLM_CACHE_ENABLED": True,
+    "LLM_CACHE_PATH": str(Path(__file__).resolve().parent.parent / ".cache" / "llm_cache.sqlite"),
+    "LLM_CACHE_TTL": 0,
+    "LLM_CACHE_MAX_ENTRIES": 100_000,
+    # 同时进行的 LLM 调用上限（0 表示不限），以及按服务商（接口主机名）的每分钟 token 上限
+    "LLM_MAX_CONCURRENCY": 8,
+    "LLM_TPM_LIMITS": {},
+    # 生成数据时实体语料的格式（summary / full / hybrid）与每个提示词中语料的 token 上限（0 表示不裁剪）
+    "CORPUS_MODE": "summary",
+    "CORPUS_TOKEN_BUDGET": 1500,
+    "langsmith_api": "Your API",
+}
 
-NEO4J_URI = "bolt://localhost:7687"
-NEO4J_AUTH = ("name", "password")
+CONFIG_FILE = Path(__file__).resolve().parent / "settings.json"
 
-EMBED_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
 
-driver = GraphDatabase.driver(NEO4J_URI, auth=NEO4J_AUTH)
+@lru_cache(maxsize=None)
+def settings() -> dict:
+    values = dict(DEFAULTS)
+    config_file = Path(os.environ.get("APIKG_CONFIG", CONFIG_FILE))
+    if config_file.exists():
+        with config_file.open('r', encoding='utf-8') as f:
+            values.update(json.load(f))
+    for key in DEFAULTS:
+        if key in os.environ:
+            values[key] = os.environ[key]
+    return values
 
-llm = ChatOpenAI(api_key=SecretStr(API), model="model name", base_url=URL)
 
-ollama_llm = ChatOllama(model="model name", temperature=0.3)
+def setting(key: str):
+    return settings()[key]
 
-langsmith_api = "Your API"
\ No newline at end of file
+
+def flag(key: str) -> bool:
+    value = setting(key)
+    if isinstance(value, str):
+        return value.strip().lower() not in ("", "0", "false", "no", "off")
+    return bool(value)
+
+
+@lru_cache(maxsize=None)
+def get_driver():
+    from neo4j import GraphDatabase
+
+    driver = GraphDatabase.driver(setting("NEO4J_URI"), auth=(setting("NEO4J_USER"), setting("NEO4J_PASSWORD")))
+    atexit.register(driver.close)
+    return driver
+
+
+@lru_cache(maxsize=None)
+def get_graph_store():
+    from graph_store import Neo4jGraphStore, MemoryGraphStore
+
+    if setting("GRAPH_BACKEND") == "memory":
+        return MemoryGraphStore.from_json_folder(setting("API_JSON_DIR"))
+    return Neo4jGraphStore(get_driver())
+
+
+@lru_cache(maxsize=None)
+def get_llm():
+    from pydantic import SecretStr
+    from langchain_openai import ChatOpenAI
+
+    return ChatOpenAI(api_key=SecretStr(setting("API")), model=setting("LLM_MODEL"), base_url=setting("URL"))
+
+
+@lru_cache(maxsize=None)
+def get_ollama_llm():
+    from langchain_ollama import ChatOllama
+
+    return ChatOllama(model=setting("OLLAMA_MODEL"), temperature=0.3)
+
+
+@lru_cache(maxsize=None)
+def get_eval_llm():
+    from pydantic import SecretStr
+    from langchain_openai import ChatOpenAI
+
+    return ChatOpenAI(api_key=SecretStr(setting("EVAL_API")), model=setting("EVAL_MODEL"), base_url=setting("EVAL_URL"))
+
+
+@lru_cache(maxsize=None)
+def get_llm_cache():
+    from llm_cache import LLMCache
+
+    if not flag("LLM_CACHE_ENABLED"):
+        return None
+    cache = LLMCache(
+        setting("LLM_CACHE_PATH"),
+        ttl=float(setting("LLM_CACHE_TTL")) or None,
+        max_entries=int(setting("LLM_CACHE_MAX_ENTRIES")),
+    )
+    atexit.register(cache.close)
+    atexit.register(cache.report)
+    return cache
+
+
+@lru_cache(maxsize=None)
+def get_llm_limiter():
+    from llm_limits import LLMLimiter
+
+    tpm_limits = setting("LLM_TPM_LIMITS")
+    if isinstance(tpm_limits, str):
+        tpm_limits = json.loads(tpm_limits or "{}")
+    return LLMLimiter(int(setting("LLM_MAX_CONCURRENCY")), {k: int(v) for k, v in tpm_limits.items()})
+
+
+@lru_cache(maxsize=None)
+def get_corpus_cache():
+    from corpus_cache import CorpusCache
+
+    return CorpusCache(get_graph_store())
+
+
+def get_cached_llm(schema=None, llm=None):
+    """
+    返回带持久化缓存与全局限流的模型包装；schema 非空时输出结构化结果，否则输出文本
+    """
+    from llm_cache import CachedLLM
+
+    return CachedLLM(llm or get_llm(), get_llm_cache(), schema, get_llm_limiter())
+
+
+LAZY_ATTRIBUTES = {
+    "driver": get_driver,
+    "graph_store": get_graph_store,
+    "llm": get_llm,
+    "ollama_llm": get_ollama_llm,
+}
+
+
+def __getattr__(name):
+    # 兼容旧写法 `from config import llm`，但只有真正访问时才创建客户端
+    if name in LAZY_ATTRIBUTES:
+        return LAZY_ATTRIBUTES[name]()
+    if name in DEFAULTS:
+        return setting(name)
+    raise AttributeError(f"module 'config' has no attribute '{name}'")
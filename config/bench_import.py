@@ -0,0 +1,54 @@
+import os
+import sys
+import json
+import statistics
+import subprocess
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+ENTRY_POINTS = {
+    "generate_multi_api_data": ROOT / "generate_multi_api_data",
+    "eval": ROOT / "eval",
+}
+
+PROBE = """
+import sys, time, json
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+import config
+created = [f.__name__ for f in (config.get_driver, config.get_graph_store, config.get_llm,
+                                config.get_ollama_llm, config.get_eval_llm) if f.cache_info().currsize]
+print(json.dumps({{"seconds": elapsed, "created": created, "neo4j_loaded": "neo4j" in sys.modules}}))
+"""
+
+
+def measure_import(module: str, entry_dir: Path, repeat: int = 5) -> dict:
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([str(entry_dir), str(ROOT)]))
+    runs = []
+    for _ in range(repeat):
+        result = subprocess.run(
+            [sys.executable, "-c", PROBE.format(module=module)],
+            cwd=entry_dir, env=env, capture_output=True, text=True
+        )
+        if result.returncode != 0:
+            raise RuntimeError(f"导入 {module} 失败:\n{result.stderr}")
+        runs.append(json.loads(result.stdout.strip().splitlines()[-1]))
+    return {
+        "median": statistics.median(run["seconds"] for run in runs),
+        "created": runs[-1]["created"],
+        "neo4j_loaded": runs[-1]["neo4j_loaded"],
+    }
+
+
+def run_benchmark(repeat: int = 5):
+    for module, entry_dir in ENTRY_POINTS.items():
+        stats = measure_import(module, entry_dir, repeat)
+        created = ", ".join(stats["created"]) or "无"
+        print(f"[BENCH] import {module}: 中位数 {stats['median'] * 1000:.1f} ms（{repeat} 次），"
+              f"导入期间创建的客户端: {created}，neo4j 驱动包已加载: {stats['neo4j_loaded']}")
+
+
+if __name__ == "__main__":
+    run_benchmark()
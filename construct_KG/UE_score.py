@@ -1,45 +1,41 @@
-import math
+import random
+import asyncio
+import argparse
 from typing import TypedDict
-from config import driver
-from config import llm
+from config import get_graph_store, get_llm, get_llm_cache
+from llm_cache import CachedLLM
+from llm_limits import estimate_tokens
+from graph_store import STRUCTURE_RELATIONS, node_key
+from info_score import DEFAULT_CLIP, info_scores, report_distribution
+
+CONCURRENCY = 8
+MAX_RETRIES = 5
+BASE_DELAY = 1.0
+WRITE_BATCH = 20
+BATCH_TOKEN_BUDGET = 3000
+MAX_BATCH_STRUCTURES = 10
 
 def get_module_names() -> list[str]:
-    query = """
-    MATCH (m:Module)
-    RETURN m.名称 AS name
-    ORDER BY name
-    """
-    with driver.session() as session:
-        results = session.run(query)
-        return [record["name"] for record in results]
-
-def get_entity_corpus(entity_parent: str) -> str:
-    query = """
-    MATCH (parent {名称: $entity_parent})
-    MATCH (parent)-[:HAS_METHOD|HAS_PROPERTY|HAS_TYPE_ALIAS|HAS_INTERFACE|HAS_CLASS|HAS_ENUM]->(child)
-    OPTIONAL MATCH (parent)-[:BELONGS_TO*0..5]->(m:Module)
-    RETURN 
-        child.名称 AS name,
-        child.功能描述 AS description,
-        parent.唯一键 AS parent_origin,
-        labels(child) AS labels
-    """
-    with driver.session() as session:
-        results = session.run(query, entity_parent=entity_parent)
-        items = []
+    return get_graph_store().module_names()
+
+def format_corpus(entity_parent: str, children: list[dict]) -> str:
+    items = []
+    for record in children:
+        name = record.get("name") or "unknown"
+        labels = record.get("labels") or []
+        label_str = ", ".join(labels)
+        line = f"- ([{label_str}]) {name}"
+        items.append(line)
 
-        for record in results:
-            name = record.get("name") or "unknown"
-            labels = record.get("labels") or []
-            label_str = ", ".join(labels)
-            line = f"- ([{label_str}]) {name}"
-            items.append(line)
+    if not items:
+        return f"No members found under structure `{entity_parent}`."
 
-        if not items:
-            return f"No members found under structure `{entity_parent}`."
+    corpus = f"The other API member corpus of the structure where `{entity_parent}` is located is as follows:\n" + "\n".join(items)
+    return corpus
 
-        corpus = f"The other API member corpus of the structure where `{entity_parent}` is located is as follows:\n" + "\n".join(items)
-        return corpus
+def get_entity_corpus(entity_parent: str, store=None) -> str:
+    store = store or get_graph_store()
+    return format_corpus(entity_parent, store.children(entity_parent, STRUCTURE_RELATIONS))
 
 PROMPT_TEMPLATE = """
 Please use your knowledge to evaluate the probability that the following methods or properties belong to {name}.
@@ -60,61 +56,254 @@ Output format:
 
 """
 
+BATCH_PROMPT_TEMPLATE = """
+Please use your knowledge to evaluate, for each structure below, the probability that each listed method or property belongs to that structure.
+---
+
+{sections}
+
+---
+
+For every structure, assign a score between 0 and 1 to each of its methods/properties, representing the probability that it belongs to that structure. A value closer to 1 indicates greater reliability, while a value closer to 0 suggests incompleteness or inaccuracy.
+Use the structure key shown in backticks and the member names exactly as listed, and score every member of every structure.
+
+Output format:
+{{
+    "structures": {{
+        "structure key 1": {{"function 1": 0.85, "function 2": 0.75}},
+        "structure key 2": {{"function 3": 0.9}},
+        ...
+    }}
+}}
+
+"""
+
 class ScoreList(TypedDict):
     score_list: dict[str, float]
 
-def compute_info_score(prob_dict: dict[str, float]) -> float:
-    return round(sum(-math.log2(p) for p in prob_dict.values() if p > 0), 4)
-
-def process_all_non_leaf_nodes_under_module(module_name: str = "@kit.ArkTS"):
-    query = """
-        MATCH (m:Module {名称: $module_name})<-[:BELONGS_TO*0..5]-(parent)
-        WHERE EXISTS {
-            MATCH (parent)-[:HAS_METHOD|HAS_PROPERTY|HAS_TYPE_ALIAS|HAS_INTERFACE|HAS_CLASS|HAS_ENUM]->()
-        }
-        WITH DISTINCT parent
-        RETURN parent.名称 AS name, parent.info_score AS info_score
-        ORDER BY name
-        """
-
-    with driver.session() as session:
-        result = session.run(query, module_name=module_name)
-        parents = [(record["name"], record.get("info_score")) for record in result]
-
-    structured_llm = llm.with_structured_output(ScoreList)
-
-    for name, existing_score in parents:
-        if existing_score is not None:
-            print(f"⏭ `{name}` 已有 info_score={existing_score}，跳过。")
-            continue
+class BatchScoreList(TypedDict):
+    structures: dict[str, dict[str, float]]
+
+class TokenUsage:
+    """
+    按调用类型统计 LLM 调用次数与估算的提示词 token 数
+    """
 
-        print(f"\n[PROCESSING] 结构体: {name}")
-        corpus = get_entity_corpus(name)
+    def __init__(self):
+        self.calls = {"single": 0, "batch": 0, "fallback": 0}
+        self.prompt_tokens = {"single": 0, "batch": 0, "fallback": 0}
 
-        if corpus.startswith("No members"):
-            print("⚠️ 无成员，跳过。")
+    def record(self, kind: str, prompt: str):
+        self.calls[kind] += 1
+        self.prompt_tokens[kind] += estimate_tokens(prompt)
+
+    def report(self, module_name: str, structures: int):
+        calls = sum(self.calls.values())
+        tokens = sum(self.prompt_tokens.values())
+        detail = "，".join(f"{kind} {self.calls[kind]} 次 / {self.prompt_tokens[kind]} tokens" for kind in self.calls)
+        per_call = structures / calls if calls else 0
+        print(f"[USAGE] 模块 {module_name}: LLM 调用 {calls} 次（{detail}），"
+              f"估算提示词 {tokens} tokens，平均每次调用覆盖 {per_call:.1f} 个结构")
+
+def compute_info_score(prob_dict: dict[str, float], clip: dict | None = None) -> float:
+    return float(info_scores([prob_dict], **(clip or DEFAULT_CLIP))[0])
+
+def check_score_dict(score_dict) -> dict[str, float]:
+    if not isinstance(score_dict, dict) or not all(isinstance(v, (int, float)) for v in score_dict.values()):
+        raise ValueError(f"评分结果格式不正确: {score_dict!r}")
+    return score_dict
+
+def is_rate_limited(error: Exception) -> bool:
+    status = getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+    return status == 429 or "rate limit" in str(error).lower()
+
+async def invoke_with_retry(structured_llm, prompt: str, max_retries: int = MAX_RETRIES, base_delay: float = BASE_DELAY):
+    """
+    调用 ainvoke，失败时按指数退避加随机抖动重试；限流错误（429）的等待时间翻倍
+    """
+    for attempt in range(max_retries + 1):
+        try:
+            return await structured_llm.ainvoke(prompt)
+        except Exception as e:
+            if attempt == max_retries:
+                raise
+            delay = base_delay * (2 ** attempt) * (2 if is_rate_limited(e) else 1)
+            delay *= random.uniform(0.5, 1.5)
+            print(f"[WARN] LLM 调用失败（第 {attempt + 1} 次），{delay:.1f}s 后重试：{e}")
+            await asyncio.sleep(delay)
+
+def structure_key(structure: dict) -> str:
+    # 同一唯一键可能同时是 Class 和 Interface，分数与批量提示词中的结构都按 (标签, 唯一键) 区分
+    return node_key(structure["label"], structure["origin"])
+
+def format_section(structure: dict) -> str:
+    members = "\n".join(
+        f"- ([{', '.join(child.get('labels') or [])}]) {child.get('name') or 'unknown'}"
+        for child in structure["children"]
+    )
+    return f"### Structure `{structure_key(structure)}` ({structure['name']})\n{members}"
+
+def pack_batches(structures: list[dict], token_budget: int, max_structures: int = MAX_BATCH_STRUCTURES) -> list[list[dict]]:
+    """
+    按成员数从少到多把结构装进批次，每批提示词的估算 token 数不超过 token_budget；
+    单独就超出预算的结构自成一批，按单结构提示词调用
+    """
+    overhead = estimate_tokens(BATCH_PROMPT_TEMPLATE)
+    batches = []
+    current = []
+    used = overhead
+    for structure in sorted(structures, key=lambda s: len(s["children"])):
+        cost = estimate_tokens(format_section(structure))
+        if overhead + cost > token_budget:
+            batches.append([structure])
             continue
+        if current and (used + cost > token_budget or len(current) >= max_structures):
+            batches.append(current)
+            current = []
+            used = overhead
+        current.append(structure)
+        used += cost
+    if current:
+        batches.append(current)
+    return batches
 
-        prompt = PROMPT_TEMPLATE.format(name=name, corpus=corpus)
+def validate_batch_scores(structure: dict, scores) -> dict[str, float] | None:
+    if not isinstance(scores, dict):
+        return None
+    expected = {child.get("name") or "unknown" for child in structure["children"]}
+    if not expected <= scores.keys():
+        return None
+    values = {name: scores[name] for name in expected}
+    if not all(isinstance(v, (int, float)) and 0 <= v <= 1 for v in values.values()):
+        return None
+    return values
 
+async def score_structure(structure: dict, structured_llm, semaphore: asyncio.Semaphore, usage: TokenUsage,
+                          kind: str = "single", **retry_options):
+    name, uid = structure["name"], structure_key(structure)
+    corpus = format_corpus(name, structure["children"])
+    prompt = PROMPT_TEMPLATE.format(name=name, corpus=corpus)
+    usage.record(kind, prompt)
+    async with semaphore:
         try:
-            response = structured_llm.invoke(prompt)
-            score_dict = response["score_list"]
-            info_score = compute_info_score(score_dict)
+            response = await invoke_with_retry(structured_llm, prompt, **retry_options)
+            score_dict = check_score_dict(response["score_list"])
         except Exception as e:
-            print(f"❌ LLM处理失败：{e}")
+            print(f"❌ `{uid}` LLM处理失败：{e}")
+            return uid, None
+
+    print(f"[SCORED] `{uid}` 评分列表：{score_dict}")
+    return uid, score_dict
+
+async def score_batch(batch: list[dict], batch_llm, single_llm, semaphore: asyncio.Semaphore, usage: TokenUsage,
+                      **retry_options) -> list[tuple[str, dict[str, float] | None]]:
+    """
+    一次调用为一批结构打分；输出缺结构、缺成员或分数越界的结构逐个回退为单结构调用
+    """
+    if len(batch) == 1:
+        return [await score_structure(batch[0], single_llm, semaphore, usage, **retry_options)]
+
+    prompt = BATCH_PROMPT_TEMPLATE.format(sections="\n\n".join(format_section(s) for s in batch))
+    usage.record("batch", prompt)
+    async with semaphore:
+        try:
+            response = await invoke_with_retry(batch_llm, prompt, **retry_options)
+            returned = response["structures"]
+        except Exception as e:
+            print(f"❌ 批量打分失败（{len(batch)} 个结构）：{e}")
+            returned = {}
+    if not isinstance(returned, dict):
+        returned = {}
+
+    results = []
+    missing = []
+    for structure in batch:
+        key = structure_key(structure)
+        scores = validate_batch_scores(structure, returned.get(key))
+        if scores is None:
+            missing.append(structure)
             continue
+        print(f"[SCORED] `{key}` 评分列表：{scores}")
+        results.append((key, scores))
+
+    if missing:
+        print(f"[WARN] 批量结果中 {len(missing)}/{len(batch)} 个结构不完整，回退为单结构调用")
+        results += await asyncio.gather(*(
+            score_structure(structure, single_llm, semaphore, usage, kind="fallback", **retry_options)
+            for structure in missing
+        ))
+    return results
+
+async def score_module_async(module_name: str = "@kit.ArkTS", concurrency: int = CONCURRENCY,
+                             write_batch: int = WRITE_BATCH, token_budget: int | None = None,
+                             clip: dict | None = None, store=None, llm=None, cache=None,
+                             **retry_options) -> dict[str, float]:
+    """
+    并发为模块下所有非叶子结构打分：先一次性取回整个模块的结构及其成员并在内存中拼好语料，
+    最多 concurrency 个 LLM 请求同时进行，完成的分数攒满 write_batch 个后按 (标签, 唯一键) 一次性写回图存储。
+    token_budget 非空时（默认不启用）把小结构打包进同一个提示词批量打分；每批待写入的信息量按 clip 规则向量化计算；
+    cache 默认使用配置中的持久化 LLM 缓存
+    """
+    store = store or get_graph_store()
+    cache = get_llm_cache() if cache is None else cache
+    llm = llm or get_llm()
+    single_llm = CachedLLM(llm, cache, ScoreList)
+    batch_llm = CachedLLM(llm, cache, BatchScoreList)
+    structures = await asyncio.to_thread(store.structure_corpora, module_name, STRUCTURE_RELATIONS)
+
+    pending = []
+    for structure in structures:
+        if structure["info_score"] is not None:
+            print(f"⏭ `{structure_key(structure)}` 已有 info_score={structure['info_score']}，跳过。")
+        else:
+            pending.append(structure)
+    print(f"[INFO] 模块 {module_name}: 待打分 {len(pending)} 个结构，并发 {concurrency}")
+
+    batches = pack_batches(pending, token_budget) if token_budget else [[structure] for structure in pending]
+    usage = TokenUsage()
+    semaphore = asyncio.Semaphore(concurrency)
+    tasks = [score_batch(batch, batch_llm, single_llm, semaphore, usage, **retry_options) for batch in batches]
 
-        print("评分列表：", score_dict)
-        print("总信息量（bit）：", info_score)
+    clip = clip or DEFAULT_CLIP
+    scores = {}
+    to_write = {}
 
-        with driver.session() as session:
-            session.run("""
-                MATCH (n {名称: $name})
-                SET n.info_score = $score
-            """, name=name, score=info_score)
+    async def flush():
+        totals = info_scores(list(to_write.values()), **clip)
+        batch_scores = dict(zip(to_write, totals.tolist()))
+        await asyncio.to_thread(store.set_info_scores, batch_scores)
+        scores.update(batch_scores)
+        to_write.clear()
 
-        print(f"✅ `{name}` 信息量写入完成")
+    for task in asyncio.as_completed(tasks):
+        for uid, score_dict in await task:
+            if score_dict is not None:
+                to_write[uid] = score_dict
+        if len(to_write) >= write_batch:
+            await flush()
+            print(f"✅ 已写入 {len(scores)}/{len(pending)} 个结构的信息量")
+    if to_write:
+        await flush()
+    await asyncio.to_thread(store.flush)
+    print(f"✅ 模块 {module_name} 信息量写入完成：成功 {len(scores)}/{len(pending)}")
+    usage.report(module_name, len(pending))
+    report_distribution(module_name, list(scores), list(scores.values()))
+    return scores
+
+def process_all_non_leaf_nodes_under_module(module_name: str = "@kit.ArkTS", concurrency: int = CONCURRENCY,
+                                            batch: bool = False, token_budget: int = BATCH_TOKEN_BUDGET):
+    """
+    batch 为 True 时启用批量打分，每个提示词的估算 token 数不超过 token_budget；默认逐个结构打分
+    """
+    return asyncio.run(score_module_async(module_name, concurrency=concurrency,
+                                          token_budget=token_budget if batch else None))
 
 if __name__ == "__main__":
-    process_all_non_leaf_nodes_under_module("module_name")
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--module", default="module_name")
+    parser.add_argument("--concurrency", type=int, default=CONCURRENCY)
+    parser.add_argument("--batch", action="store_true", help="把小结构打包进同一个提示词批量打分")
+    parser.add_argument("--token-budget", type=int, default=BATCH_TOKEN_BUDGET, help="批量打分时每个提示词的 token 上限")
+    args = parser.parse_args()
+    process_all_non_leaf_nodes_under_module(args.module, args.concurrency, batch=args.batch,
+                                            token_budget=args.token_budget)
@@ -0,0 +1,90 @@
+import io
+import re
+import time
+import contextlib
+from pathlib import Path
+import extract_api_info
+from extract_api_info import classify_declaration
+from legacy_extract import (
+    extract_name,
+    is_function_declaration,
+    extract_function_name,
+    is_property_declaration,
+    is_interface_function_signature,
+    is_enum_member_declaration,
+)
+
+def predicate_chain(line: str) -> tuple[str | None, str | None]:
+    """
+    基线（5f8b70b）process_body 的判断链，谓词直接取自 legacy_extract 中原样保留的基线实现
+    """
+    for keyword in ('class', 'interface', 'namespace', 'enum'):
+        if keyword in line:
+            return keyword, extract_name(line, keyword)
+    match = re.match(r'^export\s+import\s+(\w+)\s*=\s*([\w.]+);', line.strip())
+    if match:
+        return 'export_import', match.group(1)
+    if re.match(r'^(export\s+)?(declare\s+)?type\s+\w+\s*=', line.strip()):
+        return 'type_alias', extract_name(line, 'type')
+    if is_function_declaration(line):
+        return 'method', extract_function_name(line)
+    if 'struct' in line:
+        return 'struct', extract_name(line, 'struct')
+    if is_property_declaration(line):
+        return 'property', None
+    if is_interface_function_signature(line):
+        return 'call_signature', None
+    if is_enum_member_declaration(line):
+        return 'enum_member', re.match(r'^(\w+)', line.strip()).group(1)
+    return None, None
+
+
+def collect_member_lines(api_dir: str) -> list[str]:
+    lines = []
+
+    def recording_classifier(line):
+        lines.append(line)
+        return classify_declaration(line)
+
+    extract_api_info.classify_declaration = recording_classifier
+    try:
+        for file in sorted(Path(api_dir).rglob("*")):
+            if file.is_file() and file.stem != "permission":
+                with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+                    try:
+                        extract_api_info.simplify_api(str(file))
+                    except Exception:
+                        pass
+    finally:
+        extract_api_info.classify_declaration = classify_declaration
+    return lines
+
+
+def time_per_line(func, lines: list[str], repeat: int = 3) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for line in lines:
+            func(line)
+        best = min(best, time.perf_counter() - start)
+    return best / len(lines) * 1e6
+
+
+def run_benchmark(api_dir: str):
+    lines = collect_member_lines(api_dir)
+    mismatches = [line for line in lines if predicate_chain(line) != classify_declaration(line)]
+    print(f"[INFO] 成员首行 {len(lines)} 条，两种实现分类不一致 {len(mismatches)} 条")
+    for line in mismatches[:10]:
+        print(f"[MISMATCH] {line.strip()!r}: 基线 {predicate_chain(line)}，现在 {classify_declaration(line)}")
+
+    before = time_per_line(predicate_chain, lines)
+    after = time_per_line(classify_declaration, lines)
+    print(f"[BENCH] 判断链（原始正则字符串）: {before:.2f} µs/行")
+    print(f"[BENCH] 预编译分类器: {after:.2f} µs/行")
+    print(f"[BENCH] 加速比: {before / after:.2f}x")
+    return mismatches
+
+
+if __name__ == "__main__":
+    api_folder = Path(__file__).resolve().parent.parent / "HarmonyOS-API" / "ets" / "api"
+    run_benchmark(str(api_folder))
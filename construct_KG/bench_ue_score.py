@@ -0,0 +1,121 @@
+import io
+import re
+import time
+import random
+import asyncio
+import argparse
+import contextlib
+from graph_store import MemoryGraphStore
+from llm_cache import LLMCache
+from UE_score import score_module_async, BatchScoreList
+
+MODULE = "@kit.BenchKit"
+
+
+class FakeStructuredLLM:
+    """
+    本地假 LLM：ainvoke 固定延迟后按语料中的成员逐个给分，可按比例抛出限流错误以走重试路径，
+    批量提示词下可按比例漏掉结构以走回退路径
+    """
+
+    def __init__(self, latency: float, failure_rate: float = 0.0, drop_rate: float = 0.0, seed: int = 0):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.drop_rate = drop_rate
+        self.random = random.Random(seed)
+        self.calls = 0
+
+    def with_structured_output(self, schema):
+        return FakeRunnable(self, schema)
+
+    def score_members(self, text: str) -> dict[str, float]:
+        members = re.findall(r'^- \(\[[^\]]*\]\) (.+)$', text, re.MULTILINE)
+        return {member: self.random.uniform(0.05, 1.0) for member in members}
+
+    async def ainvoke(self, prompt: str, schema=None):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        if self.random.random() < self.failure_rate:
+            raise RuntimeError("429 rate limit exceeded")
+        if schema is BatchScoreList:
+            sections = re.split(r'^### Structure `([^`]+)`.*$', prompt, flags=re.MULTILINE)[1:]
+            return {"structures": {
+                uid: self.score_members(body)
+                for uid, body in zip(sections[::2], sections[1::2])
+                if self.random.random() >= self.drop_rate
+            }}
+        return {"score_list": self.score_members(prompt)}
+
+
+class FakeRunnable:
+    def __init__(self, llm: FakeStructuredLLM, schema):
+        self.llm = llm
+        self.schema = schema
+
+    async def ainvoke(self, prompt: str):
+        return await self.llm.ainvoke(prompt, self.schema)
+
+
+def synthetic_store(structures: int, members: int, seed: int = 0) -> MemoryGraphStore:
+    """
+    合成模块：每个结构的成员数在 1..members 之间随机，模拟真实 Kit 中大量小结构的分布
+    """
+    rng = random.Random(seed)
+    nodes = {"Module": {MODULE: {"名称": MODULE}}, "Class": {}, "Method": {}}
+    relations = {("BELONGS_TO", "Class", "Module"): [], ("HAS_METHOD", "Class", "Method"): []}
+    for i in range(structures):
+        class_uid = f"{MODULE}.Class{i}"
+        nodes["Class"][class_uid] = {"名称": f"Class{i}", "功能描述": "", "注释信息": ""}
+        relations[("BELONGS_TO", "Class", "Module")].append((class_uid, MODULE))
+        for j in range(rng.randint(1, members)):
+            method_uid = f"{class_uid}.method{j}"
+            nodes["Method"][method_uid] = {"名称": f"method{j}", "功能描述": "", "注释信息": ""}
+            relations[("HAS_METHOD", "Class", "Method")].append((class_uid, method_uid))
+    return MemoryGraphStore(nodes, relations)
+
+
+def run_once(structures: int, members: int, concurrency: int, latency: float, failure_rate: float,
+             token_budget: int | None = None, drop_rate: float = 0.0):
+    store = synthetic_store(structures, members)
+    llm = FakeStructuredLLM(latency, failure_rate, drop_rate)
+    output = io.StringIO()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(output):
+        scores = asyncio.run(score_module_async(
+            MODULE, concurrency=concurrency, token_budget=token_budget, store=store, llm=llm, cache=LLMCache(),
+            base_delay=latency
+        ))
+    usage = next(line for line in output.getvalue().splitlines() if line.startswith("[USAGE]"))
+    return time.perf_counter() - start, len(scores), llm.calls, usage
+
+
+def run_benchmark(structures: int, members: int, latency: float, failure_rate: float, levels: list[int]):
+    baseline = None
+    for concurrency in levels:
+        elapsed, scored, calls, _ = run_once(structures, members, concurrency, latency, failure_rate)
+        baseline = baseline or elapsed
+        print(f"[BENCH] 并发 {concurrency:>3}: {elapsed:.2f}s，{scored / elapsed:.1f} 结构/秒，"
+              f"成功 {scored}/{structures}，LLM 调用 {calls} 次，相对并发 {levels[0]} 加速 {baseline / elapsed:.1f}x")
+
+
+def run_batch_benchmark(structures: int, members: int, latency: float, token_budget: int, drop_rate: float,
+                        concurrency: int):
+    for label, budget in (("单结构", None), (f"批量（预算 {token_budget}）", token_budget)):
+        elapsed, scored, calls, usage = run_once(structures, members, concurrency, latency, 0.0, budget, drop_rate)
+        print(f"[BENCH] {label}: {elapsed:.2f}s，成功 {scored}/{structures}，LLM 调用 {calls} 次")
+        print(f"        {usage}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--structures", type=int, default=200)
+    parser.add_argument("--members", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.2, help="假 LLM 每次调用的延迟（秒）")
+    parser.add_argument("--failure-rate", type=float, default=0.05, help="假 LLM 返回限流错误的概率")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument("--token-budget", type=int, default=3000, help="批量模式每个提示词的 token 预算")
+    parser.add_argument("--drop-rate", type=float, default=0.05, help="批量输出中漏掉某个结构的概率")
+    args = parser.parse_args()
+    run_benchmark(args.structures, args.members, args.latency, args.failure_rate, args.concurrency)
+    run_batch_benchmark(args.structures, args.members, args.latency, args.token_budget, args.drop_rate,
+                        args.concurrency[-1])
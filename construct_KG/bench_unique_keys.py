@@ -0,0 +1,109 @@
+import io
+import copy
+import time
+import contextlib
+from pathlib import Path
+from extract_api_info import simplify_api
+from graph_store.loader import preprocess_nodes_unique_keys
+
+
+def scan_build_unique_key(node, nodes_map, cache):
+    if node is None:
+        return None
+    uid = node.get("唯一键")
+    if uid in cache:
+        return cache[uid]
+
+    parent_name = node.get("上级")
+    name = node.get("名称")
+    if not parent_name:
+        cache[uid] = name
+        return name
+
+    parent_node = nodes_map.get(parent_name)
+    if not parent_node:
+        parents = [n for n in nodes_map.values() if n.get("名称") == parent_name]
+        parent_node = parents[0] if parents else None
+
+    parent_uid = scan_build_unique_key(parent_node, nodes_map, cache) if parent_node else parent_name
+    full_uid = f"{parent_uid}.{name}" if parent_uid else name
+    cache[uid] = full_uid
+    return full_uid
+
+
+def scan_preprocess_nodes_unique_keys(nodes):
+    """
+    改造前的实现：每个节点都全表扫描寻找上级，作为基准与正确性参照
+    """
+    for node in nodes:
+        name = node.get("名称")
+        parent = node.get("上级")
+        node["唯一键"] = f"{parent}.{name}" if parent else name
+
+    nodes_map = {node["唯一键"]: node for node in nodes}
+    cache = {}
+    for node in nodes:
+        node["唯一键"] = scan_build_unique_key(node, nodes_map, cache)
+
+    for node in nodes:
+        parent = node.get("上级")
+        if not parent:
+            continue
+        candidates = [n["唯一键"] for n in nodes if n.get("名称") == parent]
+        if len(candidates) == 1:
+            node["上级"] = candidates[0]
+        elif len(candidates) > 1:
+            exacts = [c for c in candidates if c.split('.')[-1] == parent]
+            if exacts:
+                node["上级"] = exacts[0]
+
+    for node in nodes:
+        parent = node.get("上级")
+        if parent:
+            next((n for n in nodes if n["唯一键"] == parent), None)
+    return nodes
+
+
+def indexed_preprocess(nodes):
+    nodes = preprocess_nodes_unique_keys(nodes)
+    nodes_by_uid = {}
+    for node in nodes:
+        nodes_by_uid.setdefault(node["唯一键"], node)
+    for node in nodes:
+        parent = node.get("上级")
+        if parent:
+            nodes_by_uid.get(parent)
+    return nodes
+
+
+def timed(func, nodes):
+    nodes = copy.deepcopy(nodes)
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = func(nodes)
+    return time.perf_counter() - start, result
+
+
+def run_benchmark(api_dir: str, top: int = 10):
+    files = sorted(
+        (f for f in Path(api_dir).rglob("*") if f.is_file() and f.stem != "permission"),
+        key=lambda f: f.stat().st_size,
+        reverse=True
+    )[:top]
+
+    for file in files:
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+            data = simplify_api(str(file))
+        if not data:
+            continue
+        nodes = data["节点"]
+        before, expected = timed(scan_preprocess_nodes_unique_keys, nodes)
+        after, actual = timed(indexed_preprocess, nodes)
+        status = "一致" if expected == actual else "不一致"
+        print(f"[BENCH] {file.name}: {len(nodes)} 个节点，扫描 {before * 1000:.1f} ms → 索引 {after * 1000:.1f} ms"
+              f"（{before / after:.1f}x，结果{status}）")
+
+
+if __name__ == "__main__":
+    api_folder = Path(__file__).resolve().parent.parent / "HarmonyOS-API" / "ets" / "api"
+    run_benchmark(str(api_folder))
@@ -0,0 +1,63 @@
+import shutil
+import argparse
+import tempfile
+from pathlib import Path
+from config import get_driver
+from schema import API_NODE_LABEL
+from extract_api_info import process_all_api_files
+from json2KG import process_api_folder
+
+NODES_QUERY = f"MATCH (n:{API_NODE_LABEL}) RETURN labels(n) AS labels, n.唯一键 AS uid"
+EDGES_QUERY = f"""
+MATCH (a:{API_NODE_LABEL})-[r]->(b:{API_NODE_LABEL})
+RETURN type(r) AS type, a.唯一键 AS from_uid, b.唯一键 AS to_uid
+"""
+
+
+def snapshot() -> tuple[set, set]:
+    with get_driver().session() as session:
+        nodes = {(tuple(sorted(r["labels"])), r["uid"]) for r in session.run(NODES_QUERY)}
+        edges = {(r["type"], r["from_uid"], r["to_uid"]) for r in session.run(EDGES_QUERY)}
+    return nodes, edges
+
+
+def check_incremental(api_dir: str, sample: int = 40) -> bool:
+    """
+    在一小批声明文件上比较增量导入和全量导入的结果：先全量导入，再删除一个源文件、
+    把另一个源文件整体换成别的内容（原有成员全部消失），增量提取并导入后，与重新全量导入的节点集和关系集比对。
+    会清空当前连接的 Neo4j 数据库，只能对测试库运行
+    """
+    files = sorted(f for f in Path(api_dir).glob("*.d.ts") if f.is_file())[:sample]
+    with tempfile.TemporaryDirectory() as tmp:
+        src, out, log = Path(tmp) / "api", Path(tmp) / "clean_api", str(Path(tmp) / "log.txt")
+        src.mkdir()
+        for file in files:
+            shutil.copy(file, src / file.name)
+
+        process_all_api_files(str(src), str(out), log)
+        process_api_folder(str(out))
+
+        (src / files[0].name).unlink()
+        shutil.copy(files[2], src / files[1].name)
+        process_all_api_files(str(src), str(out), log)
+        process_api_folder(str(out), incremental=True)
+        incremental = snapshot()
+
+        process_api_folder(str(out))
+        full = snapshot()
+
+    for name, got, expected in (("节点", incremental[0], full[0]), ("关系", incremental[1], full[1])):
+        print(f"[INFO] {name}：增量 {len(got)}，全量 {len(expected)}，"
+              f"多出 {len(got - expected)}，缺少 {len(expected - got)}")
+        for item in sorted(got ^ expected, key=str)[:10]:
+            print(f"[MISMATCH] {name} {item}")
+    return incremental == full
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--api-dir", default=str(Path(__file__).resolve().parent.parent / "HarmonyOS-API" / "ets" / "api"))
+    parser.add_argument("--sample", type=int, default=40)
+    args = parser.parse_args()
+    if not check_incremental(args.api_dir, args.sample):
+        raise SystemExit(1)
@@ -0,0 +1,35 @@
+import io
+import json
+import contextlib
+from pathlib import Path
+from extract_api_info import simplify_api
+from legacy_extract import simplify_api_legacy
+
+
+def run_quietly(func, file_path: str):
+    with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+        try:
+            return json.dumps(func(file_path), ensure_ascii=False, indent=2)
+        except Exception as e:
+            return f"{type(e).__name__}: {e}"
+
+
+def check_parity(api_dir: str) -> list[str]:
+    mismatches = []
+    files = sorted(f for f in Path(api_dir).rglob("*") if f.is_file() and f.stem != "permission")
+
+    for file in files:
+        expected = run_quietly(simplify_api_legacy, str(file))
+        actual = run_quietly(simplify_api, str(file))
+        if expected != actual:
+            mismatches.append(str(file))
+            print(f"[MISMATCH] {file}")
+
+    print(f"[INFO] 共比对 {len(files)} 个文件，不一致 {len(mismatches)} 个")
+    return mismatches
+
+
+if __name__ == "__main__":
+    api_folder = Path(__file__).resolve().parent.parent / "HarmonyOS-API"
+    if check_parity(str(api_folder)):
+        raise SystemExit(1)
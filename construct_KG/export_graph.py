@@ -0,0 +1,106 @@
+import os
+import csv
+import argparse
+from pathlib import Path
+import networkx as nx
+from graph_store.loader import collect_graph
+from schema import API_NODE_LABEL
+
+NODE_PROPERTIES = ["名称", "功能描述", "注释信息", "装饰器"]
+
+
+def export_neo4j_csv(graph, output_dir: str):
+    nodes, relations = graph
+    output_path = Path(output_dir)
+    output_path.mkdir(parents=True, exist_ok=True)
+    args = []
+
+    for label, items in sorted(nodes.items()):
+        file_path = output_path / f"nodes_{label}.csv"
+        with file_path.open('w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow([f"唯一键:ID({label})", *NODE_PROPERTIES, ":LABEL"])
+            for uid, props in items.items():
+                writer.writerow([uid, *(props.get(key, "") for key in NODE_PROPERTIES), f"{label};{API_NODE_LABEL}"])
+        args.append(f"--nodes={file_path.name}")
+
+    for (rel_type, from_label, to_label), pairs in sorted(relations.items()):
+        file_path = output_path / f"relationships_{rel_type}_{from_label}_{to_label}.csv"
+        with file_path.open('w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow([f":START_ID({from_label})", f":END_ID({to_label})", ":TYPE"])
+            for from_uid, to_uid in pairs:
+                writer.writerow([from_uid, to_uid, rel_type])
+        args.append(f"--relationships={file_path.name}")
+
+    command = ("neo4j-admin database import full neo4j --overwrite-destination --multiline-fields=true "
+               + " ".join(args))
+    (output_path / "import_command.txt").write_text(command + "\n", encoding='utf-8')
+    print(f"[INFO] CSV 已导出到 {output_path}，在该目录下执行 import_command.txt 中的命令即可离线导入")
+
+
+def to_networkx(graph) -> nx.MultiDiGraph:
+    nodes, relations = graph
+    G = nx.MultiDiGraph()
+    for label, items in nodes.items():
+        for uid, props in items.items():
+            G.add_node(f"{label}:{uid}", label=label, 唯一键=uid,
+                       **{key: props.get(key, "") for key in NODE_PROPERTIES})
+    for (rel_type, from_label, to_label), pairs in relations.items():
+        for from_uid, to_uid in pairs:
+            G.add_edge(f"{from_label}:{from_uid}", f"{to_label}:{to_uid}", key=rel_type, type=rel_type)
+    return G
+
+
+def export_graphml(graph, output_file: str):
+    Path(output_file).parent.mkdir(parents=True, exist_ok=True)
+    nx.write_graphml(to_networkx(graph), output_file)
+    print(f"[INFO] GraphML 已导出到 {output_file}")
+
+
+def export_parquet(graph, output_dir: str):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("导出 Parquet 需要先安装 pyarrow：pip install pyarrow") from e
+
+    nodes, relations = graph
+    output_path = Path(output_dir)
+    output_path.mkdir(parents=True, exist_ok=True)
+
+    node_columns = {"id": [], "label": [], "唯一键": [], **{key: [] for key in NODE_PROPERTIES}}
+    for label, items in sorted(nodes.items()):
+        for uid, props in items.items():
+            node_columns["id"].append(f"{label}:{uid}")
+            node_columns["label"].append(label)
+            node_columns["唯一键"].append(uid)
+            for key in NODE_PROPERTIES:
+                node_columns[key].append(props.get(key, ""))
+
+    edge_columns = {"source": [], "target": [], "type": []}
+    for (rel_type, from_label, to_label), pairs in sorted(relations.items()):
+        for from_uid, to_uid in pairs:
+            edge_columns["source"].append(f"{from_label}:{from_uid}")
+            edge_columns["target"].append(f"{to_label}:{to_uid}")
+            edge_columns["type"].append(rel_type)
+
+    pq.write_table(pa.table(node_columns), output_path / "nodes.parquet")
+    pq.write_table(pa.table(edge_columns), output_path / "edges.parquet")
+    print(f"[INFO] Parquet 节点表与边表已导出到 {output_path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--api-dir", default=r"Your path to the api_JSON folder")
+    parser.add_argument("--output-dir", default=r"Your path to the graph export folder")
+    parser.add_argument("--format", choices=["csv", "graphml", "parquet"], nargs="+", default=["csv"])
+    args = parser.parse_args()
+
+    graph = collect_graph(args.api_dir)
+    if "csv" in args.format:
+        export_neo4j_csv(graph, os.path.join(args.output_dir, "neo4j_import"))
+    if "graphml" in args.format:
+        export_graphml(graph, os.path.join(args.output_dir, "api_kg.graphml"))
+    if "parquet" in args.format:
+        export_parquet(graph, os.path.join(args.output_dir, "parquet"))
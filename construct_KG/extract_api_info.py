@@ -1,9 +1,55 @@
+import io
 import re
 import sys
 import json
+import argparse
+import contextlib
 import traceback
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
 from utils import LoggerWriter
+from manifest import file_hash, text_hash, load_manifest, save_manifest, record_removed
+
+PARSER_VERSION = "2"
+
+PROPERTY_PATTERN = re.compile(
+    r'^(?:readonly\s+)?\w+\s*[?!]?\s*:\s*[\w\.\<\>\[\]\|\&\,\?\(\)\s]+;?$'
+    r'|^(?:readonly\s+)?\w+\s*[?!]?\s*:\s*([\'"][^\'"]+[\'"]\s*(\|\s*[\'"][^\'"]+[\'"])*)\s*;?$'
+    r'|^(?:readonly\s+)?\w+\s*[?!]?\s*:\s*\(.*\)\s*=>\s*[\w\.\<\>\[\]\|\&\,\s]+;?$'
+)
+
+FUNCTION_PATTERN = re.compile(
+    r'^(export\s+)?(declare\s+)?function\s+\w+\s*\(.*'
+    r'|^type\s+\w+\s*=\s*\(.*'
+    r'|^(?:public|private|protected|static|readonly|\s)*\s*\w+\s*\(.*'
+    r'|^\w+\s*\(.*'
+    r'|^\w+\s*:\s*\(.*'
+    r'|^\w+\s*:\s*function\s*\(.*'
+    r'|^constructor\s*\(.*'
+    r'|^\[\s*[\w\.]+\s*\]\s*\(.*'
+    r'|^\w+\s*\(.*\)\s*:\s*.+;'
+    r'|^\[(\w+(\.\w+)*)\]\s*\((.*?)\)\s*:\s*([^;{]+);?$'
+)
+
+FUNCTION_NAME_PATTERN = re.compile(
+    r'^(?:export\s+)?(?:declare\s+)?(?:async\s+)?function\s+(?P<function>[^\s(]+)\s*\('
+    r'|^(?:(?:public|private|protected|static|readonly|async)\s+)*(?P<member>[^\s(]+)\s*\('
+    r'|^\[\s*(?P<computed>[^]]+)\s*]\s*\('
+    r'|^type\s+(?P<alias>[^\s=]+)\s*=\s*\(.*\)\s*=>'
+)
+
+CALL_SIGNATURE_PATTERN = re.compile(r'^\(.*\)\s*:\s*[\w.<>\[\]|&,\s]+;?$')
+
+ENUM_MEMBER_PATTERN = re.compile(r'^(\w+)\s*(=\s*[^,]+)?\s*,?$')
+
+EXPORT_IMPORT_PATTERN = re.compile(r'^export\s+import\s+(\w+)\s*=\s*([\w.]+);')
+
+TYPE_ALIAS_PATTERN = re.compile(r'^(export\s+)?(declare\s+)?type\s+\w+\s*=')
+
+NAME_PATTERNS = {
+    keyword: re.compile(rf'\b{keyword}\s+(\w+)')
+    for keyword in ('class', 'interface', 'namespace', 'enum', 'struct', 'type', 'extends')
+}
 
 
 def pan(line: str):
@@ -19,72 +65,123 @@ def pan_import(line: str):
 
 
 def extract_name(line: str, name: str):
-    pattern = rf'\b{name}\s+(\w+)'
-    match = re.search(pattern, line)
+    pattern = NAME_PATTERNS.get(name) or re.compile(rf'\b{name}\s+(\w+)')
+    match = pattern.search(line)
     if match:
         return match.group(1)
     return None
 
 
-def process_by_state_machine(ts_code: str):
-    lines = ts_code.splitlines()
-    state = 0
-    comments = {}
-    count = 0
-    current_comment = ""
-    for line in lines:
-        line = line.strip()
-        if state == 0:
-            if line.startswith('/**'):
-                state = 1
-                current_comment = line[3:].strip()
-            else:
-                break
-        elif state == 1:
-            if line.endswith('*/'):
-                current_comment += "\n" + line[:-2].strip()
-                comments[f"{count}"] = current_comment.strip()
-                count += 1
-                current_comment = ""
-                state = 0
-            else:
-                if pan(line):
-                    continue
-                else:
-                    current_comment += "\n" + line[1:].strip()
-        elif state == 2:
-            if line.startswith('/**'):
-                state = 3
-                current_comment = line[3:].strip()
-        elif state == 3:
-            if line.endswith('*/'):
-                current_comment += " " + line[:-2].strip()
-                comments[f"{count}"] = current_comment.strip()
-                count += 1
-                current_comment = ""
-                state = 0
-            else:
-                if pan(line):
-                    continue
+WHITESPACE = re.compile(r'\s*')
+
+
+class SourceCursor:
+    """
+    在同一份源码字符串上移动的游标，[pos, end) 始终对应旧实现中被反复切片、strip 后的剩余代码
+    """
+    __slots__ = ('text', 'pos', 'end')
+
+    def __init__(self, text: str, pos: int = 0, end: int | None = None):
+        self.text = text
+        self.pos = pos
+        self.end = len(text) if end is None else end
+        self.strip()
+
+    def strip(self):
+        self.pos = WHITESPACE.match(self.text, self.pos, self.end).end()
+        while self.end > self.pos and self.text[self.end - 1].isspace():
+            self.end -= 1
+
+    def at_end(self) -> bool:
+        return self.pos >= self.end
+
+    def rest(self) -> str:
+        return self.text[self.pos:self.end]
+
+    def is_text(self, value: str) -> bool:
+        return self.end - self.pos == len(value) and self.text.startswith(value, self.pos)
+
+    def line_end(self, start: int) -> int:
+        nl = self.text.find('\n', start, self.end)
+        return self.end if nl == -1 else nl
+
+    def read_doc_comment(self):
+        """
+        逐行扫描开头连续的 /** */ 注释，返回 (最后一段注释, 注释段数)；没有注释时返回 None
+        """
+        state = 0
+        count = 0
+        last_comment = None
+        current_comment = ""
+        start = self.pos
+        while start < self.end:
+            stop = self.line_end(start)
+            line = self.text[start:stop].strip()
+            start = stop + 1
+            if state == 0:
+                if line.startswith('/**'):
+                    state = 1
+                    current_comment = line[3:].strip()
                 else:
-                    current_comment += "\n" + line[1:].strip()
-        elif state == 4:
-            if line.startswith('/**'):
-                current_comment = line[3:].strip()
-                state = 1
+                    break
             elif line.endswith('*/'):
-                current_comment += " " + line[:-2].strip()
-                comments[f"{count}"] = current_comment.strip()
+                current_comment += "\n" + line[:-2].strip()
+                last_comment = current_comment.strip()
                 count += 1
                 current_comment = ""
                 state = 0
-            else:
-                if current_comment:
-                    comments[f"{count}"] = current_comment.strip()
+            elif not pan(line):
+                current_comment += "\n" + line[1:].strip()
+        if count:
+            return last_comment, count
+        return None
+
+    def skip_comments(self, count: int):
+        while count > 0:
+            index = self.text.find('*/', self.pos, self.end)
+            self.pos = min(self.pos + 1 if index == -1 else index + 2, self.end)
+            self.strip()
+            count -= 1
+
+    def read_decorators(self) -> list:
+        decorator_lines = []
+        while self.pos < self.end:
+            stop = self.line_end(self.pos)
+            line = self.text[self.pos:stop].strip()
+            if not line.startswith('@'):
                 break
-    if comments:
-        return comments[f"{count - 1}"], count if count > 0 else None
-    return None
+            decorator_lines.append(line)
+            self.pos = min(stop + 1, self.end)
+        self.strip()
+        return decorator_lines
+
+    def read_member(self) -> list:
+        """
+        读取一个成员声明（花括号与方括号配平为止），保留旧实现按成员行数回退游标的行为
+        """
+        member_lines = []
+        line_starts = []
+        brace_count = 0
+        bracket_count = 0
+        start = self.pos
+        while start < self.end:
+            stop = self.line_end(start)
+            line_starts.append(start)
+            stripped = self.text[start:stop].strip()
+            start = stop + 1
+            if not stripped:
+                continue
+            member_lines.append(stripped)
+            brace_count += stripped.count('{') - stripped.count('}')
+            bracket_count += stripped.count('[') - stripped.count(']')
+            if brace_count <= 0 and bracket_count <= 0:
+                break
+        if len(member_lines) < len(line_starts):
+            self.pos = line_starts[len(member_lines)]
+        else:
+            self.pos = min(start, self.end)
+        self.strip()
+        return member_lines
 
 
 def extract_info(kit_json, process_code, isIn: bool):
@@ -151,77 +248,70 @@ def extract_info(kit_json, process_code, isIn: bool):
     return api_info
 
 
-def delete_annotation(count, ts_code):
-    while count > 0:
-        end = ts_code.find('*/') + 2
-        ts_code = ts_code[end:].strip()
-        count -= 1
+def delete_import(ts_code):
+    while pan_import(ts_code.splitlines()[0]):
+        ts_code = "\n".join(ts_code.splitlines()[1:]).strip()
     return ts_code
 
 
 def is_property_declaration(line: str) -> bool:
-    line = line.strip()
-    patterns = [
-        r'^(?:readonly\s+)?\w+\s*[?!]?\s*:\s*[\w\.\<\>\[\]\|\&\,\?\(\)\s]+;?$',
-
-        r'^(?:readonly\s+)?\w+\s*[?!]?\s*:\s*([\'"][^\'"]+[\'"]\s*(\|\s*[\'"][^\'"]+[\'"])*)\s*;?$',
-
-        r'^(?:readonly\s+)?\w+\s*[?!]?\s*:\s*\(.*\)\s*=>\s*[\w\.\<\>\[\]\|\&\,\s]+;?$',
-    ]
-    return any(re.match(p, line) for p in patterns)
+    return PROPERTY_PATTERN.match(line.strip()) is not None
 
 
 def is_interface_function_signature(line: str) -> bool:
-    line = line.strip()
-    return bool(re.match(r'^\(.*\)\s*:\s*[\w.<>\[\]|&,\s]+;?$', line))
-
-
-def delete_import(ts_code):
-    while pan_import(ts_code.splitlines()[0]):
-        ts_code = "\n".join(ts_code.splitlines()[1:]).strip()
-    return ts_code
+    return CALL_SIGNATURE_PATTERN.match(line.strip()) is not None
 
 
 def is_function_declaration(line: str) -> bool:
-    line = line.strip()
-    patterns = [
-        r'^(export\s+)?(declare\s+)?function\s+\w+\s*\(.*',
-        r'^type\s+\w+\s*=\s*\(.*',
-        r'^(?:public|private|protected|static|readonly|\s)*\s*\w+\s*\(.*',
-        r'^\w+\s*\(.*',
-        r'^\w+\s*:\s*\(.*',
-        r'^\w+\s*:\s*function\s*\(.*',
-        r'^constructor\s*\(.*',
-        r'^\[\s*[\w\.]+\s*\]\s*\(.*'
-        r'^\w+\s*\(.*\)\s*:\s*.+;',
-        r'^\[(\w+(\.\w+)*)\]\s*\((.*?)\)\s*:\s*([^;{]+);?$',
-    ]
-    return any(re.match(p, line) for p in patterns)
+    return FUNCTION_PATTERN.match(line.strip()) is not None
 
 
 def extract_function_name(line: str) -> str | None:
     """
     提取函数名称，兼容 export/declare/async、类成员方法、计算属性方法、函数类型别名等
     """
+    match = FUNCTION_NAME_PATTERN.match(line.strip())
+    if not match:
+        return None
+    if match.group('computed') is not None:
+        return f"[{match.group('computed')}]"
+    return match.group(match.lastgroup)
+
+
+def is_enum_member_declaration(line: str) -> bool:
     line = line.strip()
+    if is_function_declaration(line) or is_property_declaration(line):
+        return False
+    return ENUM_MEMBER_PATTERN.match(line) is not None
 
-    match = re.match(r'^(?:export\s+)?(?:declare\s+)?(?:async\s+)?function\s+([^\s(]+)\s*\(', line)
-    if match:
-        return match.group(1)
 
-    match = re.match(r'^(?:(?:public|private|protected|static|readonly|async)\s+)*([^\s(]+)\s*\(', line)
-    if match:
-        return match.group(1)
+def classify_declaration(line: str) -> tuple[str | None, str | None]:
+    """
+    按 process_body 原有的判断顺序一次性识别成员首行，返回 (声明类型, 名称)，无法识别时返回 (None, None)
+    property / call_signature 的名称需要结合后续行解析，此处返回 None
+    """
+    for keyword in ('class', 'interface', 'namespace', 'enum'):
+        if keyword in line:
+            return keyword, extract_name(line, keyword)
 
-    match = re.match(r'^\[\s*([^]]+)\s*]\s*\(', line)
+    stripped = line.strip()
+    match = EXPORT_IMPORT_PATTERN.match(stripped)
     if match:
-        return f"[{match.group(1)}]"
-
-    match = re.match(r'^type\s+([^\s=]+)\s*=\s*\(.*\)\s*=>', line)
+        return 'export_import', match.group(1)
+    if TYPE_ALIAS_PATTERN.match(stripped):
+        return 'type_alias', extract_name(line, 'type')
+    if FUNCTION_PATTERN.match(stripped):
+        return 'method', extract_function_name(stripped)
+    if 'struct' in line:
+        return 'struct', extract_name(line, 'struct')
+    if PROPERTY_PATTERN.match(stripped):
+        return 'property', None
+    if CALL_SIGNATURE_PATTERN.match(stripped):
+        return 'call_signature', None
+    match = ENUM_MEMBER_PATTERN.match(stripped)
     if match:
-        return match.group(1)
-
-    return None
+        return 'enum_member', match.group(1)
+    return None, None
 
 
 def extract_enum_members(enum_code: str):
@@ -272,13 +362,6 @@ def remove_inline_annotations(code: str) -> str:
     return '\n'.join(cleaned).strip()
 
 
-def is_enum_member_declaration(line: str) -> bool:
-    line = line.strip()
-    if is_function_declaration(line) or is_property_declaration(line):
-        return False
-    return re.match(r'^\w+\s*(=\s*[^,]+)?\s*,?$', line) is not None
-
-
 def has_brace_in_first_line(ts_code: str) -> bool:
     lines = ts_code.strip().splitlines()
 
@@ -319,78 +402,65 @@ def extract_next_block(code: str) -> tuple[str, str]:
 
 
 def split_top_level_blocks(ts_code: str) -> list:
+    lines = ts_code.strip().splitlines()
     blocks = []
-    remaining_code = ts_code.strip()
-    while remaining_code:
-        block, remaining_code = extract_next_struct_block(remaining_code)
-        if block:
-            blocks.append(block.strip())
-        else:
-            break
-    return blocks
-
-
-def extract_next_struct_block(code: str) -> tuple[str, str]:
-    lines = code.strip().splitlines()
-    buffer = []
-    brace_count = 0
     struct_keywords = ['class', 'interface', 'enum', 'namespace', 'struct']
-
     i = 0
-    comment_blocks = []
 
     while i < len(lines):
-        line = lines[i]
-        stripped = line.strip()
+        buffer = []
+        brace_count = 0
+        comment_blocks = []
 
-        if not stripped:
-            i += 1
-            continue
+        while i < len(lines):
+            line = lines[i]
+            stripped = line.strip()
 
-        if stripped.startswith('/**'):
-            comment_block = [line]
-            i += 1
-            while i < len(lines):
-                line = lines[i]
-                comment_block.append(line)
-                if '*/' in line:
-                    break
+            if not stripped:
                 i += 1
-            comment_blocks.extend(comment_block)
-            i += 1
-            continue
+                continue
 
-        if stripped.startswith('@'):
-            comment_blocks.append(line)
-            i += 1
-            continue
+            if stripped.startswith('/**'):
+                comment_block = [line]
+                i += 1
+                while i < len(lines):
+                    line = lines[i]
+                    comment_block.append(line)
+                    if '*/' in line:
+                        break
+                    i += 1
+                comment_blocks.extend(comment_block)
+                i += 1
+                continue
 
-        if any(kw in stripped for kw in struct_keywords) and '{' in stripped:
-            buffer.extend(comment_blocks)
-            comment_blocks.clear()
-            buffer.append(line)
-            brace_count += stripped.count('{') - stripped.count('}')
-            i += 1
-            break
-        else:
-            comment_blocks.clear()
-            i += 1
+            if stripped.startswith('@'):
+                comment_blocks.append(line)
+                i += 1
+                continue
 
-    if not buffer:
-        return None, '\n'.join(lines[i:]).strip()
+            if any(kw in stripped for kw in struct_keywords) and '{' in stripped:
+                buffer.extend(comment_blocks)
+                buffer.append(line)
+                brace_count += stripped.count('{') - stripped.count('}')
+                i += 1
+                break
+            else:
+                comment_blocks.clear()
+                i += 1
 
-    while i < len(lines):
-        line = lines[i]
-        buffer.append(line)
-        brace_count += line.count('{') - line.count('}')
-        if brace_count <= 0:
-            i += 1
+        if not buffer:
             break
-        i += 1
 
-    block = '\n'.join(buffer).strip()
-    rest = '\n'.join(lines[i:]).strip()
-    return block, rest
+        while i < len(lines):
+            line = lines[i]
+            buffer.append(line)
+            brace_count += line.count('{') - line.count('}')
+            i += 1
+            if brace_count <= 0:
+                break
+
+        blocks.append('\n'.join(buffer).strip())
+    return blocks
 
 
 def process_body(ts_code: str, api_info: dict, total_info: dict, deepth: int):
@@ -398,47 +468,29 @@ def process_body(ts_code: str, api_info: dict, total_info: dict, deepth: int):
     lines = ts_code.splitlines()
     if lines == []:
         return total_info
-    if 'class' in lines[0]:
-        current_info['类型'] = 'class'
-        current_info['名称'] = extract_name(lines[0], 'class')
+    kind, name = classify_declaration(lines[0])
+    if kind in ('class', 'interface'):
+        current_info['类型'] = kind
+        current_info['名称'] = name
         if 'extends' in lines[0]:
             current_info['父类'] = extract_name(lines[0], 'extends')
-    elif 'interface' in lines[0]:
-        current_info['类型'] = 'interface'
-        current_info['名称'] = extract_name(lines[0], 'interface')
-        if 'extends' in lines[0]:
-            current_info['父类'] = extract_name(lines[0], 'extends')
-    elif 'namespace' in lines[0]:
-        current_info['类型'] = 'namespace'
-        current_info['名称'] = extract_name(lines[0], 'namespace')
-    elif 'enum' in lines[0]:
-        current_info['类型'] = 'enum'
-        current_info['名称'] = extract_name(lines[0], 'enum')
-    elif re.match(r'^export\s+import\s+\w+\s*=\s*[\w.]+;', lines[0].strip()):
-        line = lines[0].strip()
-        match = re.match(r'^export\s+import\s+(\w+)\s*=\s*([\w.]+);', line)
-        if match:
-            current_info['类型'] = 'export_import'
-            current_info['名称'] = match.group(1)
-            current_info['映射自'] = match.group(2)
-    elif re.match(r'^(export\s+)?(declare\s+)?type\s+\w+\s*=', lines[0].strip()):
-        current_info['类型'] = 'type_alias'
-        current_info['名称'] = extract_name(lines[0], 'type')
-    elif is_function_declaration(lines[0]):
+    elif kind in ('namespace', 'enum', 'type_alias', 'struct'):
+        current_info['类型'] = kind
+        current_info['名称'] = name
+    elif kind == 'export_import':
+        current_info['类型'] = 'export_import'
+        current_info['名称'] = name
+        current_info['映射自'] = EXPORT_IMPORT_PATTERN.match(lines[0].strip()).group(2)
+    elif kind == 'method':
         current_info['类型'] = 'method'
-        function_name = extract_function_name(lines[0])
-        current_info['名称'] = function_name
-        if function_name == 'constructor':
+        current_info['名称'] = name
+        if name == 'constructor':
             current_info['返回值'] = extract_return_type_from_constructor(api_info.get('上级', ''))
         elif ':' in lines[0]:
             current_info['返回值'] = extract_return_type(lines[0])
         else:
             current_info['返回值'] = 'void'
-        current_info['名称'] = function_name
-    elif 'struct' in lines[0]:
-        current_info['类型'] = 'struct'
-        current_info['名称'] = extract_name(lines[0], 'struct')
-    elif is_property_declaration(lines[0]):
+    elif kind == 'property':
         if '[' in lines[0] and not lines[0].strip().endswith(';'):
             full_decl_lines = [lines[0].strip()]
             bracket_count = lines[0].count('[') - lines[0].count(']')
@@ -456,11 +508,10 @@ def process_body(ts_code: str, api_info: dict, total_info: dict, deepth: int):
             current_info['类型'] = 'property'
             current_info['名称'], type_str = match.groups()
             current_info['属性类型'] = type_str.strip()
-    elif is_interface_function_signature(lines[0]):
+    elif kind == 'call_signature':
         current_info['类型'] = 'call_signature'
         current_info['签名'] = lines[0].strip().rstrip(';')
-
-    elif is_enum_member_declaration(lines[0]):
+    elif kind == 'enum_member':
         line = lines[0].strip().rstrip(',')
         match = re.match(r'^(\w+)\s*(=\s*[^,]+)?$', line)
         if match:
@@ -503,21 +554,14 @@ def process_body(ts_code: str, api_info: dict, total_info: dict, deepth: int):
     if open_brace_index == -1 or close_brace_index == -1 or close_brace_index < open_brace_index:
         return total_info
 
-    inner_code = block_code[open_brace_index + 1:close_brace_index].strip()
+    inner_code = SourceCursor(block_code, open_brace_index + 1, close_brace_index)
 
-    while inner_code:
-        lines = inner_code.splitlines()
-        if not lines or inner_code == '}':
+    while not inner_code.at_end():
+        if inner_code.is_text('}'):
             break
-        process_code, count = process_by_state_machine(inner_code)
-        inner_code = delete_annotation(count, inner_code)
-        inner_lines = inner_code.splitlines()
-
-        decorator_lines = []
-        while inner_lines and inner_lines[0].strip().startswith('@'):
-            decorator_lines.append(inner_lines.pop(0).strip())
-
-        inner_code = '\n'.join(inner_lines).strip()
+        process_code, count = inner_code.read_doc_comment()
+        inner_code.skip_comments(count)
+        decorator_lines = inner_code.read_decorators()
 
         inner_api_info = extract_info(api_info, process_code, True)
 
@@ -526,35 +570,11 @@ def process_body(ts_code: str, api_info: dict, total_info: dict, deepth: int):
 
         inner_api_info['上级'] = current_info['名称']
 
-        lines = inner_code.splitlines()
-        member_lines = []
-        brace_count = 0
-        bracket_count = 0
-        start_collecting = False
-
-        for i, line in enumerate(lines):
-            stripped = line.strip()
-            if not stripped:
-                continue
-            if not start_collecting:
-                member_lines.append(stripped)
-                brace_count += stripped.count('{') - stripped.count('}')
-                bracket_count += stripped.count('[') - stripped.count(']')
-                start_collecting = True
-                if brace_count <= 0 and bracket_count <= 0:
-                    break
-            else:
-                member_lines.append(stripped)
-                brace_count += stripped.count('{') - stripped.count('}')
-                bracket_count += stripped.count('[') - stripped.count(']')
-                if brace_count <= 0 and bracket_count <= 0:
-                    break
-
+        member_lines = inner_code.read_member()
         if not member_lines:
             break
 
         member_code = "\n".join(member_lines)
-        inner_code = "\n".join(lines[len(member_lines):]).strip()
 
         if has_brace_in_first_line(member_code):
             if len(member_code.strip().splitlines()) == 1 and '{' in member_code and '}' in member_code:
@@ -627,30 +647,20 @@ def simplify_api(file_path: str):
     for i, block in enumerate(blocks):
         try:
             block_head = block.strip().splitlines()[0]
+            cursor = SourceCursor(block)
 
-            if i == 0:
-                if block_head == '/**':
-                    comment_prefix, count = process_by_state_machine(block)
-                    clean_code = delete_annotation(count, block)
-                    api_info = extract_info(kit_json, comment_prefix, False)
-                else:
-                    block_index = raw_code_with_comments.find(block_head)
-                    comment_prefix = raw_code_with_comments[:block_index] if block_index != -1 else ''
-                    api_info = extract_info(kit_json, comment_prefix + '\n' + block, False)
-                    clean_code = block
+            if i == 0 and block_head != '/**':
+                block_index = raw_code_with_comments.find(block_head)
+                comment_prefix = raw_code_with_comments[:block_index] if block_index != -1 else ''
+                api_info = extract_info(kit_json, comment_prefix + '\n' + block, False)
             else:
-                process_code, count = process_by_state_machine(block)
-                clean_code = delete_annotation(count, block)
+                process_code, count = cursor.read_doc_comment()
+                cursor.skip_comments(count)
                 api_info = extract_info(kit_json, process_code, False)
 
             api_info['上级'] = module_name
-            block = clean_code
-
-            lines = block.splitlines()
-            decorator_lines = []
-            while lines and lines[0].strip().startswith('@'):
-                decorator_lines.append(lines.pop(0).strip())
-            block = '\n'.join(lines).strip()
+            decorator_lines = cursor.read_decorators()
+            block = cursor.rest()
 
             if decorator_lines:
                 api_info['装饰器'] = decorator_lines
@@ -662,12 +672,13 @@ def simplify_api(file_path: str):
             traceback.print_exc()
 
     for decl in single_decls:
-        result = process_by_state_machine(decl)
+        cursor = SourceCursor(decl)
+        result = cursor.read_doc_comment()
         if result is None:
             continue
         process_code, count = result
-        clean_decl = delete_annotation(count, decl)
-        clean_decl = remove_inline_annotations(clean_decl)
+        cursor.skip_comments(count)
+        clean_decl = remove_inline_annotations(cursor.rest())
         api_info = extract_info(kit_json, process_code, False)
         api_info['上级'] = module_name
         total_info = process_body(clean_decl, api_info, total_info, 1)
@@ -675,33 +686,120 @@ def simplify_api(file_path: str):
     return total_info
 
 
-def process_all_api_files(api_dir: str, output_dir: str, log_path: str):
+def extract_file(file_path: str):
+    """
+    解析单个声明文件，返回 (JSON 文本, 解析过程中的输出, 错误信息)，可在子进程中执行
+    """
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+        try:
+            result = simplify_api(file_path)
+            return json.dumps(result, ensure_ascii=False, indent=2), output.getvalue(), None
+        except Exception as e:
+            return None, output.getvalue(), str(e)
+
+
+def is_up_to_date(entry: dict | None, digest: str, output_path: Path) -> bool:
+    # 解析失败的文件也记录哈希，内容和解析器都没变时不再重试
+    if entry is None or entry.get("hash") != digest or entry.get("parser_version") != PARSER_VERSION:
+        return False
+    return "error" in entry or (output_path / entry["output"]).exists()
+
+
+def process_all_api_files(api_dir: str, output_dir: str, log_path: str, workers: int = 1, incremental: bool = True):
     api_path = Path(api_dir)
     output_path = Path(output_dir)
     output_path.mkdir(parents=True, exist_ok=True)
 
+    sources = sorted(file for file in api_path.rglob("*") if file.is_file() and file.stem != "permission")
+    hashes = {file.relative_to(api_path).as_posix(): file_hash(file) for file in sources}
+
+    manifest = load_manifest(output_path)
+    previous = dict(manifest["files"])
+    files = []
+    added = []
+    for file in sources:
+        source = file.relative_to(api_path).as_posix()
+        if incremental and is_up_to_date(previous.get(source), hashes[source], output_path):
+            continue
+        files.append(file)
+        if source not in previous:
+            added.append(file)
+    removed = [source for source in previous if source not in hashes]
+    known_failures = sum(1 for file in sources if file not in files
+                         and "error" in previous.get(file.relative_to(api_path).as_posix(), {}))
+
     with open(log_path, 'w', encoding='utf-8') as log_file:
         sys.stdout = LoggerWriter(log_file)
         sys.stderr = LoggerWriter(log_file)
 
-        for file in api_path.rglob("*"):
-            if file.is_file() and file.stem != "permission":
-                relative_path = file.relative_to(api_path)
-                output_file = output_path / relative_path.with_suffix(".json")
-                output_file.parent.mkdir(parents=True, exist_ok=True)
-
-                log_message(f"处理文件: {file}", log_file)
-
-                try:
-                    result = simplify_api(str(file))
-                    with output_file.open('w', encoding='utf-8') as f:
-                        json.dump(result, f, ensure_ascii=False, indent=2)
-                    log_message(f"写入成功: {output_file}", log_file)
-                except Exception as e:
-                    log_message(f"处理文件 {file} 出错: {e}", log_file)
-
-        sys.stdout = sys.__stdout__
-        sys.stderr = sys.__stderr__
+        try:
+            for source in removed:
+                entry = manifest["files"].pop(source)
+                record_removed(manifest, entry)
+                if "output" in entry:
+                    (output_path / entry["output"]).unlink(missing_ok=True)
+                log_message(f"源文件已删除，移除输出: {output_path / entry.get('output', source)}", log_file)
+
+            if workers > 1:
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    results = executor.map(extract_file, [str(file) for file in files], chunksize=4)
+                    failed = write_results(files, results, api_path, output_path, log_file, manifest, hashes)
+            else:
+                results = map(extract_file, [str(file) for file in files])
+                failed = write_results(files, results, api_path, output_path, log_file, manifest, hashes)
+
+            log_message(
+                f"[INFO] 新增 {len(added)} 个，变更 {len(files) - len(added)} 个，本次解析失败 {failed} 个，"
+                f"删除 {len(removed)} 个，未变化跳过 {len(sources) - len(files)} 个（其中已知失败 {known_failures} 个）",
+                log_file
+            )
+        finally:
+            save_manifest(output_path, manifest)
+            sys.stdout = sys.__stdout__
+            sys.stderr = sys.__stderr__
+
+
+def write_results(files: list, results, api_path: Path, output_path: Path, log_file, manifest: dict,
+                  hashes: dict) -> int:
+    """
+    写出解析结果并更新清单，返回解析失败的文件数
+    """
+    failed = 0
+    for file, (content, output, error) in zip(files, results):
+        source = file.relative_to(api_path).as_posix()
+        relative_path = file.relative_to(api_path).with_suffix(".json")
+        output_file = output_path / relative_path
+        output_file.parent.mkdir(parents=True, exist_ok=True)
+
+        log_message(f"处理文件: {file}", log_file)
+        if output:
+            sys.stdout.write(output)
+
+        if error is None:
+            with output_file.open('w', encoding='utf-8') as f:
+                f.write(content)
+            previous = manifest["files"].get(source, {})
+            manifest["files"][source] = {
+                "hash": hashes[source],
+                "parser_version": PARSER_VERSION,
+                "output": relative_path.as_posix(),
+                "output_hash": text_hash(content),
+            }
+            if "imported" in previous:
+                manifest["files"][source]["imported"] = previous["imported"]
+            log_message(f"写入成功: {output_file}", log_file)
+        else:
+            # 保留上次成功的输出信息（旧 JSON 仍在输出目录中），记下失败时的哈希与错误
+            manifest["files"][source] = {
+                **manifest["files"].get(source, {}),
+                "hash": hashes[source],
+                "parser_version": PARSER_VERSION,
+                "error": error,
+            }
+            failed += 1
+            log_message(f"处理文件 {file} 出错: {error}", log_file)
+    return failed
 
 
 def log_message(message: str, log_file):
@@ -711,8 +809,13 @@ def log_message(message: str, log_file):
 
 
 if __name__ == "__main__":
-    api_folder = r"path\to\your\research\openharmony\ets\api"
-    output_folder = r"path\to\your\research\clean_api"
-    log_file_path = r"path\to\your\research\log\generate_json\log.txt"
-    process_all_api_files(api_folder, output_folder, log_file_path)
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--api-dir", default=r"path\to\your\research\openharmony\ets\api")
+    parser.add_argument("--output-dir", default=r"path\to\your\research\clean_api")
+    parser.add_argument("--log-path", default=r"path\to\your\research\log\generate_json\log.txt")
+    parser.add_argument("--workers", type=int, default=1, help="并行解析的进程数，1 表示串行")
+    parser.add_argument("--full", action="store_true", help="忽略清单缓存，重新解析全部文件")
+    args = parser.parse_args()
+    process_all_api_files(args.api_dir, args.output_dir, args.log_path,
+                          workers=args.workers, incremental=not args.full)
 
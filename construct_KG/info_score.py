@@ -0,0 +1,110 @@
+import json
+import argparse
+import numpy as np
+
+# nonpositive: "drop" 与旧实现一致，忽略 p <= 0 的成员；"clip" 把它们截断到 p_min 计入
+# p_max: 概率上限，超过 1 的输出按 1 计（贡献 0 bit），设为 None 则不截断
+DEFAULT_CLIP = {"nonpositive": "drop", "p_min": 1e-6, "p_max": 1.0}
+
+
+def info_scores(prob_dicts: list[dict[str, float]], nonpositive: str = "drop", p_min: float = 1e-6,
+                p_max: float | None = 1.0, decimals: int = 4) -> np.ndarray:
+    """
+    一次向量化计算多个结构的信息量：所有成员概率拼成一个数组，按结构编号 bincount 求和 -log2(p)
+    """
+    if nonpositive not in ("drop", "clip"):
+        raise ValueError(f"不支持的 nonpositive 规则: {nonpositive}")
+    lengths = np.fromiter((len(d) for d in prob_dicts), dtype=np.int64, count=len(prob_dicts))
+    probs = np.fromiter((p for d in prob_dicts for p in d.values()), dtype=np.float64, count=int(lengths.sum()))
+    owners = np.repeat(np.arange(len(prob_dicts)), lengths)
+
+    keep = probs > 0
+    if nonpositive == "clip":
+        keep = ~np.isnan(probs)
+        probs = np.maximum(probs, p_min)
+    if p_max is not None:
+        probs = np.minimum(probs, p_max)
+
+    bits = np.zeros_like(probs)
+    bits[keep] = -np.log2(probs[keep])
+    totals = np.bincount(owners, weights=bits, minlength=len(prob_dicts)).astype(np.float64)
+    return np.round(totals, decimals)
+
+
+def distribution(scores, bins: int = 10, outlier_iqr: float = 1.5) -> dict:
+    """
+    分数分布：基本统计量、分位数、直方图，以及按 IQR 规则判定的离群值下标
+    """
+    scores = np.asarray(scores, dtype=np.float64)
+    if scores.size == 0:
+        return {"count": 0}
+    q = np.quantile(scores, [0.05, 0.25, 0.5, 0.75, 0.95])
+    iqr = q[3] - q[1]
+    low, high = q[1] - outlier_iqr * iqr, q[3] + outlier_iqr * iqr
+    counts, edges = np.histogram(scores, bins=bins)
+    return {
+        "count": int(scores.size),
+        "mean": float(scores.mean()),
+        "std": float(scores.std()),
+        "min": float(scores.min()),
+        "max": float(scores.max()),
+        "quantiles": dict(zip(["p5", "p25", "p50", "p75", "p95"], map(float, q))),
+        "histogram": {"counts": counts.tolist(), "edges": edges.tolist()},
+        "outlier_bounds": [float(low), float(high)],
+        "outliers": np.flatnonzero((scores < low) | (scores > high)).tolist(),
+    }
+
+
+def report_distribution(module_name: str, names: list[str], scores, bins: int = 10) -> dict:
+    stats = distribution(scores, bins)
+    if not stats["count"]:
+        print(f"[STATS] 模块 {module_name}: 没有已打分的结构")
+        return stats
+    q = stats["quantiles"]
+    print(f"[STATS] 模块 {module_name}: {stats['count']} 个结构，均值 {stats['mean']:.2f}，标准差 {stats['std']:.2f}，"
+          f"范围 [{stats['min']:.2f}, {stats['max']:.2f}]")
+    print(f"        分位数 p5={q['p5']:.2f} p25={q['p25']:.2f} p50={q['p50']:.2f} p75={q['p75']:.2f} p95={q['p95']:.2f}")
+    peak = max(stats["histogram"]["counts"])
+    for count, left, right in zip(stats["histogram"]["counts"], stats["histogram"]["edges"], stats["histogram"]["edges"][1:]):
+        bar = "#" * round(30 * count / peak) if peak else ""
+        print(f"        [{left:8.2f}, {right:8.2f}) {count:5d} {bar}")
+    if stats["outliers"]:
+        outliers = ", ".join(f"{names[i]}={float(np.asarray(scores)[i]):.2f}" for i in stats["outliers"][:10])
+        more = f" 等 {len(stats['outliers'])} 个" if len(stats["outliers"]) > 10 else ""
+        print(f"        离群结构: {outliers}{more}")
+    stats["outliers"] = [names[i] for i in stats["outliers"]]
+    return stats
+
+
+def analyze_modules(store, modules: list[str] | None = None, bins: int = 10) -> dict[str, dict]:
+    """
+    每个模块只读一次已打分节点，汇总各模块与全 SDK 的分数分布
+    """
+    modules = modules or store.module_names()
+    report = {}
+    all_names, all_scores = [], []
+    for module in modules:
+        nodes = store.scored_nodes_in_module(module)
+        names = [node["origin"] for node in nodes]
+        scores = np.array([node["score"] for node in nodes], dtype=np.float64)
+        report[module] = report_distribution(module, names, scores, bins)
+        all_names += names
+        all_scores.append(scores)
+    if len(modules) > 1:
+        report["ALL"] = report_distribution("ALL", all_names, np.concatenate(all_scores) if all_scores else [], bins)
+    return report
+
+
+if __name__ == "__main__":
+    from config import get_graph_store
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--module", nargs="*", help="只分析指定模块，默认全部模块")
+    parser.add_argument("--bins", type=int, default=10)
+    parser.add_argument("--output", help="把分布统计写入该 JSON 文件")
+    args = parser.parse_args()
+
+    report = analyze_modules(get_graph_store(), args.module, args.bins)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
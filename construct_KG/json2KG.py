@@ -1,177 +1,167 @@
 import os
-import json
 import traceback
-from neo4j import GraphDatabase
-
-driver = GraphDatabase.driver("bolt://localhost:7687", auth=("name", "password"))
+from pathlib import Path
+from config import get_driver
+from graph_store.loader import LABEL_MAP, RESERVED_FILES, load_graph_rows, merge_rows
+from schema import API_NODE_LABEL, ensure_schema
+from manifest import MANIFEST_NAME, load_manifest, save_manifest, pending_imports, mark_imported
 
 def clear_database(tx):
     tx.run("MATCH (n) DETACH DELETE n")
 
-def ensure_node(tx, name, label, unique_id, extra_props=None):
-    if not name:
-        return
-    props = ", ".join(f'{k}: ${k}' for k in extra_props) if extra_props else ''
-    query = f"""
-        MERGE (n:{label} {{ 唯一键: $唯一键 }})
-        SET n.名称 = $名称
-        {f", n += {{ {props} }}" if props else ""}
+BATCH_SIZE = 1000
+# 节点和关系上记录写入它们的 JSON 文件（相对路径列表），增量导入时据此撤销变更或删除的文件
+SOURCE_PROPERTY = "来源文件"
+
+def add_source(var):
+    return (f"SET {var}.{SOURCE_PROPERTY} = CASE WHEN row.source IN coalesce({var}.{SOURCE_PROPERTY}, []) "
+            f"THEN {var}.{SOURCE_PROPERTY} ELSE coalesce({var}.{SOURCE_PROPERTY}, []) + row.source END")
+
+def merge_nodes(tx, label, rows):
+    tx.run(f"""
+        UNWIND $rows AS row
+        MERGE (n:`{label}` {{ 唯一键: row.唯一键 }})
+        SET n:{API_NODE_LABEL}, n += row.props
+        {add_source("n")}
+    """, rows=rows)
+
+def merge_relations(tx, rel_type, from_label, to_label, rows):
+    tx.run(f"""
+        UNWIND $rows AS row
+        MATCH (a:`{from_label}` {{ 唯一键: row.from_uid }})
+        MATCH (b:`{to_label}` {{ 唯一键: row.to_uid }})
+        MERGE (a)-[r:`{rel_type}`]->(b)
+        {add_source("r")}
+    """, rows=rows)
+
+def delete_source(tx, source):
     """
-    params = {"名称": name, "唯一键": unique_id}
-    if extra_props:
-        params.update(extra_props)
-    tx.run(query, **params)
-
-def create_relation(tx, from_uid, to_uid, rel_type):
-    query = f"""
-        MATCH (a {{唯一键: $from_uid}}), (b {{唯一键: $to_uid}})
-        MERGE (a)-[r:{rel_type}]->(b)
+    撤销一个 JSON 文件写入的内容：从节点和关系的来源列表中去掉它，不再有来源的关系和节点随之删除。
+    该文件写入的关系两端都是它写入的节点，所以只需从这些节点出发查找关系
     """
-    tx.run(query, from_uid=from_uid, to_uid=to_uid)
-
-def build_unique_key(node, nodes_map, cache):
-    if node is None:
-        return None
-    uid = node.get("唯一键")
-    if uid in cache:
-        return cache[uid]
-
-    parent_name = node.get("上级")
-    name = node.get("名称")
-    if not parent_name:
-        cache[uid] = name
-        return name
-
-    parent_node = nodes_map.get(parent_name)
-    if not parent_node:
-        parents = [n for n in nodes_map.values() if n.get("名称") == parent_name]
-        parent_node = parents[0] if parents else None
-
-    parent_uid = build_unique_key(parent_node, nodes_map, cache) if parent_node else parent_name
-    full_uid = f"{parent_uid}.{name}" if parent_uid else name
-    cache[uid] = full_uid
-    return full_uid
-
-def preprocess_nodes_unique_keys(nodes):
-    for node in nodes:
-        name = node.get("名称")
-        parent = node.get("上级")
-        if not parent:
-            node["唯一键"] = name
-        else:
-            node["唯一键"] = f"{parent}.{name}"
-
-    nodes_map = {node["唯一键"]: node for node in nodes}
-    cache = {}
-
-    for node in nodes:
-        new_uid = build_unique_key(node, nodes_map, cache)
-        node["唯一键"] = new_uid
-
-    for node in nodes:
-        parent = node.get("上级")
-        if not parent:
-            continue
-        candidates = [n["唯一键"] for n in nodes if n.get("名称") == parent]
-        if len(candidates) == 1:
-            node["上级"] = candidates[0]
-        elif len(candidates) > 1:
-            exacts = [c for c in candidates if c.split('.')[-1] == parent]
-            if exacts:
-                node["上级"] = exacts[0]
-            else:
-                print(f"[WARN] 多重匹配无精确匹配，保留原上级: {parent}")
-        else:
-            print(f"[WARN] 未找到上级唯一键，保留原上级: {parent}")
-
-    return nodes
-
-def create_graph(json_path, clear_db=False):
-    with open(json_path, 'r', encoding='utf-8') as f:
-        try:
-            data = json.load(f)
-            if not isinstance(data, dict):
-                print(f"[WARNING] 文件 {json_path} 内容为空或不是合法字典，已跳过")
-                return
-        except json.JSONDecodeError:
-            print(f"[WARNING] 文件 {json_path} 不是合法 JSON，已跳过")
-            return
-
-    nodes = data.get("节点", [])
-    nodes = preprocess_nodes_unique_keys(nodes)
-
-    label_map = {
-        "interface": "Interface",
-        "property": "Property",
-        "call_signature": "CallSignature",
-        "method": "Method",
-        "type_alias": "TypeAlias",
-        "enum": "Enum",
-        "enum_member": "EnumMember",
-        "namespace": "Namespace",
-        "class": "Class",
-        "struct": "Struct",
-        "export_import": "ExportImport",
-        "module": "Module"
-    }
-
-    with driver.session() as session:
+    tx.run(f"""
+        MATCH (a:{API_NODE_LABEL})-[r]->()
+        WHERE $source IN a.{SOURCE_PROPERTY} AND $source IN r.{SOURCE_PROPERTY}
+        SET r.{SOURCE_PROPERTY} = [s IN r.{SOURCE_PROPERTY} WHERE s <> $source]
+        WITH r WHERE size(r.{SOURCE_PROPERTY}) = 0
+        DELETE r
+    """, source=source)
+    tx.run(f"""
+        MATCH (n:{API_NODE_LABEL})
+        WHERE $source IN n.{SOURCE_PROPERTY}
+        SET n.{SOURCE_PROPERTY} = [s IN n.{SOURCE_PROPERTY} WHERE s <> $source]
+        WITH n WHERE size(n.{SOURCE_PROPERTY}) = 0
+        DETACH DELETE n
+    """, source=source)
+
+def source_key(json_path, api_folder_path=None) -> str:
+    """
+    来源文件键：相对 API JSON 目录的 posix 路径。未给出目录时向上查找带提取清单的目录，找不到则用文件名
+    """
+    json_path = Path(json_path).resolve()
+    if api_folder_path is None:
+        api_folder_path = next((p for p in json_path.parents if (p / MANIFEST_NAME).exists()), json_path.parent)
+    return json_path.relative_to(Path(api_folder_path).resolve()).as_posix()
+
+def tag_rows(rows, source):
+    for items in rows.values():
+        for row in items:
+            row["source"] = source
+
+def write_graph_rows(session, node_rows, relation_rows, batch_size=BATCH_SIZE):
+    """
+    先写全部节点再写关系，每个标签/关系类型在一个事务内按 batch_size 分批 UNWIND
+    """
+    def write_batches(tx, write, key, rows):
+        for start in range(0, len(rows), batch_size):
+            write(tx, *key, rows[start:start + batch_size])
+
+    for label, rows in node_rows.items():
+        session.execute_write(write_batches, merge_nodes, (label,), rows)
+    for key, rows in relation_rows.items():
+        session.execute_write(write_batches, merge_relations, key, rows)
+
+def create_graph(json_path, clear_db=False, batch_size=BATCH_SIZE, api_folder_path=None):
+    rows = load_graph_rows(json_path)
+    if rows is None:
+        return
+    for part in rows:
+        tag_rows(part, source_key(json_path, api_folder_path))
+
+    with get_driver().session() as session:
         if clear_db:
             print("[INFO] 清空数据库中...")
             session.execute_write(clear_database)
             print("[INFO] 数据库已清空")
+        write_graph_rows(session, *rows, batch_size=batch_size)
 
-        for node in nodes:
-            type_ = node.get("类型", "结构体")
-            if type_ == "call_signature":
-                name = node.get("签名", "未知签名")
-            else:
-                name = node.get("名称")
-
-            module = node.get("所属模块")
-            parent = node.get("上级")
-            desc = node.get("功能描述", "")
-            comment = "\n".join(node.get("注释信息", []))
-            label = label_map.get(type_.lower(), type_.capitalize())
-
-            unique_id = node.get("唯一键")
-
-            props = {
-                "功能描述": desc,
-                "注释信息": comment
-            }
-            if "装饰器" in node:
-                props["装饰器"] = "\n".join(node["装饰器"])
-
-            session.execute_write(ensure_node, name, label, unique_id, props)
-
-            if parent and (not module or module == "未知模块"):
-                parent_node = next((n for n in nodes if n["唯一键"] == parent), None)
-                high_level_labels = {"Namespace", "Class", "Interface", "Enum", "Struct"}
-                if parent_node and label_map.get(parent_node.get("类型", "").lower(), parent_node.get("类型", "").capitalize()) in high_level_labels:
-                    rel_type = f"HAS_{type_.upper()}"
-                    session.execute_write(create_relation, parent, unique_id, rel_type)
-
-            if module and module != "未知模块":
-                session.execute_write(ensure_node, module, "Module", module)
-                session.execute_write(create_relation, unique_id, module, "BELONGS_TO")
-
-def process_api_folder(api_folder_path: str):
+def process_api_folder(api_folder_path: str, incremental: bool = False, batch_size: int = BATCH_SIZE):
     json_files = []
     for root, _, files in os.walk(api_folder_path):
         for file in files:
-            if file.endswith(".json"):
+            if file.endswith(".json") and file not in RESERVED_FILES:
                 json_files.append(os.path.join(root, file))
     json_files.sort()
 
+    manifest = load_manifest(api_folder_path)
+    sources = {entry["output"]: source for source, entry in manifest["files"].items() if "output" in entry}
+    if incremental and not sources:
+        print("[WARN] 未找到提取清单，改为全量导入")
+        incremental = False
+    if incremental and not manifest.get("source_tracked"):
+        print("[WARN] 图中的节点没有来源文件记录，无法撤销旧内容，改为全量导入")
+        incremental = False
+    stale = []
+    if incremental:
+        pending = pending_imports(manifest)
+        json_files = [f for f in json_files if Path(f).relative_to(api_folder_path).as_posix() in pending]
+        # 变更的文件先撤销上次导入的内容再重新写入，已删除的文件只撤销
+        stale = sorted(set(pending) | set(manifest.get("removed", [])))
+        print(f"[INFO] 增量导入：{len(json_files)} 个文件有变化，{len(manifest.get('removed', []))} 个已删除，"
+              f"其余 {len(sources) - len(json_files)} 个已是最新")
+
+    node_rows = {}
+    relation_rows = {}
+    loaded = []
     for i, file_path in enumerate(json_files):
         print(f"[INFO] 正在处理第{i+1}/{len(json_files)}个文件: {file_path}")
         try:
-            clear_db = (i == 0)
-            create_graph(file_path, clear_db)
+            rows = load_graph_rows(file_path)
         except Exception as e:
             print(f"[ERROR] 处理 {file_path} 出错: {e}")
             traceback.print_exc()
+            continue
+        if rows is not None:
+            source = source_key(file_path, api_folder_path)
+            tag_rows(rows[0], source)
+            tag_rows(rows[1], source)
+            merge_rows(node_rows, rows[0])
+            merge_rows(relation_rows, rows[1])
+        loaded.append(file_path)
+
+    node_count = sum(len(rows) for rows in node_rows.values())
+    relation_count = sum(len(rows) for rows in relation_rows.values())
+    print(f"[INFO] 批量写入 {node_count} 个节点、{relation_count} 条关系，批大小 {batch_size}")
+
+    with get_driver().session() as session:
+        if not incremental:
+            print("[INFO] 清空数据库中...")
+            session.execute_write(clear_database)
+            print("[INFO] 数据库已清空")
+        ensure_schema(session, set(LABEL_MAP.values()) | set(node_rows))
+        for source in stale:
+            session.execute_write(delete_source, source)
+        write_graph_rows(session, node_rows, relation_rows, batch_size=batch_size)
+
+    for file_path in loaded:
+        source = sources.get(Path(file_path).relative_to(api_folder_path).as_posix())
+        if source:
+            mark_imported(manifest, source)
+    manifest["removed"] = []
+    manifest["source_tracked"] = True
+
+    if manifest["files"]:
+        save_manifest(api_folder_path, manifest)
 
 if __name__ == "__main__":
     api_path = r"Your path to the api_JSON folder"
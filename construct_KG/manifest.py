@@ -0,0 +1,67 @@
+import os
+import json
+import hashlib
+from pathlib import Path
+
+MANIFEST_NAME = "manifest.json"
+
+
+def file_hash(file_path) -> str:
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def load_manifest(output_dir) -> dict:
+    manifest_path = Path(output_dir) / MANIFEST_NAME
+    if not manifest_path.exists():
+        return {"files": {}}
+    try:
+        with manifest_path.open('r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"[WARN] 清单文件 {manifest_path} 无法读取，将全量处理: {e}")
+        return {"files": {}}
+    if not isinstance(manifest, dict) or not isinstance(manifest.get("files"), dict):
+        return {"files": {}}
+    return manifest
+
+
+def save_manifest(output_dir, manifest: dict):
+    manifest_path = Path(output_dir) / MANIFEST_NAME
+    tmp_path = manifest_path.with_suffix(".tmp")
+    with tmp_path.open('w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2, sort_keys=True)
+    os.replace(tmp_path, manifest_path)
+
+
+def pending_imports(manifest: dict) -> dict[str, str]:
+    """
+    返回自上次导入 Neo4j 以来内容有变化的 JSON 文件，键为相对输出路径，值为对应的源文件相对路径
+    """
+    return {
+        entry["output"]: source
+        for source, entry in manifest["files"].items()
+        if "output" in entry and entry.get("imported") != entry["output_hash"]
+    }
+
+
+def record_removed(manifest: dict, entry: dict):
+    """
+    源文件被删除时调用：已导入过的输出记入 removed，等下次增量导入时从图中删掉
+    """
+    removed = manifest.setdefault("removed", [])
+    if "imported" in entry and entry["output"] not in removed:
+        removed.append(entry["output"])
+
+
+def mark_imported(manifest: dict, source: str):
+    entry = manifest["files"].get(source)
+    if entry:
+        entry["imported"] = entry["output_hash"]
@@ -0,0 +1,85 @@
+from graph_store import STRUCTURE_RELATIONS, MEMBER_RELATIONS
+from graph_store.neo4j_store import (
+    API_NODE_LABEL,
+    MODULE_NAMES_QUERY,
+    ENTITIES_IN_MODULE_QUERY,
+    SCORED_NODES_QUERY,
+    set_info_scores_query,
+    children_query,
+    children_in_module_query,
+    structure_corpora_query,
+)
+
+HOT_QUERIES = {
+    "module_names": (MODULE_NAMES_QUERY, {}),
+    "children.structure": (children_query(STRUCTURE_RELATIONS), {"parent_name": "", "module_prefix": None}),
+    "children.member": (children_query(MEMBER_RELATIONS), {"parent_name": "", "module_prefix": ""}),
+    "children_in_module": (children_in_module_query(MEMBER_RELATIONS), {"module_prefix": ""}),
+    "structure_corpora": (structure_corpora_query(STRUCTURE_RELATIONS), {"module_name": "", "skip": 0, "limit": 1}),
+    "set_info_scores": (set_info_scores_query("Class"), {"rows": []}),
+    "entities_in_module": (ENTITIES_IN_MODULE_QUERY, {"prefix": "", "labels": []}),
+    "scored_nodes_in_module": (SCORED_NODES_QUERY, {"module_name": ""}),
+}
+
+
+def schema_statements(labels) -> list[str]:
+    statements = []
+    for label in sorted(labels):
+        statements.append(
+            f"CREATE CONSTRAINT `{label}_唯一键_unique` IF NOT EXISTS "
+            f"FOR (n:`{label}`) REQUIRE n.唯一键 IS UNIQUE"
+        )
+        statements.append(
+            f"CREATE INDEX `{label}_名称` IF NOT EXISTS FOR (n:`{label}`) ON (n.名称)"
+        )
+    statements += [
+        f"CREATE INDEX `{API_NODE_LABEL}_唯一键` IF NOT EXISTS FOR (n:{API_NODE_LABEL}) ON (n.唯一键)",
+        f"CREATE TEXT INDEX `{API_NODE_LABEL}_唯一键_text` IF NOT EXISTS FOR (n:{API_NODE_LABEL}) ON (n.唯一键)",
+        f"CREATE INDEX `{API_NODE_LABEL}_名称` IF NOT EXISTS FOR (n:{API_NODE_LABEL}) ON (n.名称)",
+        f"CREATE INDEX `{API_NODE_LABEL}_info_score` IF NOT EXISTS FOR (n:{API_NODE_LABEL}) ON (n.info_score)",
+    ]
+    return statements
+
+
+def ensure_schema(session, labels):
+    """
+    幂等地创建各标签 唯一键 唯一约束与 名称 / 唯一键 / info_score 索引，并为旧图中的节点补上公共标签
+    """
+    session.run(f"""
+        MATCH (n) WHERE NOT n:{API_NODE_LABEL}
+        CALL {{ WITH n SET n:{API_NODE_LABEL} }} IN TRANSACTIONS OF 10000 ROWS
+    """).consume()
+    for statement in schema_statements(labels):
+        session.run(statement).consume()
+    session.run("CALL db.awaitIndexes(300)").consume()
+    print(f"[INFO] 图数据库约束与索引已就绪（{len(labels)} 个标签）")
+
+
+def plan_operators(plan) -> list[str]:
+    operators = [plan["operatorType"]]
+    for child in plan.get("children", []):
+        operators.extend(plan_operators(child))
+    return operators
+
+
+def check_query_plans(session) -> dict[str, list[str]]:
+    failures = {}
+    for name, (query, params) in HOT_QUERIES.items():
+        plan = session.run("EXPLAIN " + query, **params).consume().plan
+        scans = [op for op in plan_operators(plan) if op.startswith("AllNodesScan")]
+        if scans:
+            failures[name] = scans
+            print(f"[ERROR] 查询 {name} 的执行计划包含全图扫描: {scans}")
+    if failures:
+        raise RuntimeError(f"{len(failures)} 个热点查询回退到 AllNodesScan: {', '.join(failures)}")
+    print(f"[INFO] {len(HOT_QUERIES)} 个热点查询均使用索引")
+    return failures
+
+
+if __name__ == "__main__":
+    from config import get_driver
+    from graph_store.loader import LABEL_MAP
+
+    with get_driver().session() as session:
+        ensure_schema(session, set(LABEL_MAP.values()))
+        check_query_plans(session)
@@ -0,0 +1,61 @@
+import re
+from llm_limits import count_tokens
+
+# 多个实体分摊预算时每个实体至少保留的 token 数
+MIN_ENTITY_BUDGET = 200
+
+
+def relevance(record: dict, question: str) -> int:
+    """
+    成员与问题的相关度：问题中以反引号给出该成员名为 2，作为独立单词出现为 1，否则为 0
+    """
+    name = record.get("name") or ""
+    if not name or not question:
+        return 0
+    if f"`{name}`" in question:
+        return 2
+    if re.search(rf"(?<![\w$]){re.escape(name)}(?![\w$])", question):
+        return 1
+    return 0
+
+
+def relevance_key(records: list[dict], question: str) -> tuple:
+    """
+    与 question 相关的成员及其相关度，决定裁剪结果，可作为缓存键：相关成员相同的问题裁出的语料相同
+    """
+    return tuple((i, score) for i, record in enumerate(records) if (score := relevance(record, question)))
+
+
+def split_budget(budget: int, parts: int) -> int:
+    # 0 表示不裁剪；分摊后不低于 MIN_ENTITY_BUDGET，避免大组里每个实体只剩 0 个 token
+    return max(budget // max(parts, 1), MIN_ENTITY_BUDGET) if budget else 0
+
+
+def select_members(records: list[dict], question: str, budget: int, build) -> list[dict]:
+    """
+    build(子集) 拼出语料。整体超过 budget token 时按相关度从高到低（同分保持原顺序）保留成员，
+    二分出不超预算的最多成员数；返回的子集保持原顺序，至少保留一个成员
+    """
+    if not budget or not records or count_tokens(build(records)) <= budget:
+        return records
+    order = sorted(range(len(records)), key=lambda i: -relevance(records[i], question))
+    low, high = 1, len(records) - 1
+    while low < high:
+        mid = (low + high + 1) // 2
+        if count_tokens(build([records[i] for i in sorted(order[:mid])])) <= budget:
+            low = mid
+        else:
+            high = mid - 1
+    return [records[i] for i in sorted(order[:low])]
+
+
+def budgeted_corpus(records: list[dict], question: str, budget: int, build) -> str:
+    kept = select_members(records, question, budget, build)
+    corpus = build(kept)
+    if len(kept) < len(records):
+        corpus += f"\n({len(records) - len(kept)} less relevant members omitted)"
+    return corpus
+
+
+def log_prompt_tokens(kind: str, prompt: str, corpus: str = ""):
+    print(f"[TOKENS] {kind}提示词 {count_tokens(prompt)} tokens，其中语料 {count_tokens(corpus)} tokens")
@@ -0,0 +1,66 @@
+import threading
+from graph_store import MEMBER_RELATIONS
+
+
+class CorpusCache:
+    """
+    单次运行内的实体语料缓存：成员记录按 (实体, 模块) 缓存，拼好的语料按 (实体, 模块, 模式) 缓存。
+    warm(module) 用一次批量查询预取整个模块的成员，之后该模块内的查询不再访问图数据库
+    """
+
+    def __init__(self, store, rel_types=MEMBER_RELATIONS):
+        self.store = store
+        self.rel_types = tuple(rel_types)
+        self.members_by_key = {}
+        self.corpora = {}
+        self.warmed = set()
+        self.hits = 0
+        self.misses = 0
+        self.queries = 0
+        self.lock = threading.Lock()
+
+    def warm(self, module: str):
+        with self.lock:
+            if module in self.warmed:
+                return
+            grouped = self.store.children_in_module(module, self.rel_types)
+            self.queries += 1
+            for entity, records in grouped.items():
+                self.members_by_key.setdefault((entity, module), records)
+            self.warmed.add(module)
+        print(f"[CACHE] 预取模块 {module} 的实体语料：{len(grouped)} 个实体")
+
+    def members(self, entity: str, module: str) -> list[dict]:
+        key = (entity, module)
+        with self.lock:
+            if key in self.members_by_key:
+                return self.members_by_key[key]
+            if module in self.warmed:
+                # 预取结果里没有的实体就是没有成员
+                return self.members_by_key.setdefault(key, [])
+        records = self.store.children(entity, self.rel_types, module)
+        with self.lock:
+            self.queries += 1
+            return self.members_by_key.setdefault(key, records)
+
+    def corpus(self, entity: str, module: str, mode: str, build, variant=()) -> str:
+        """
+        build(records) 把成员记录拼成语料，只在 (实体, 模块, 模式, variant) 首次出现时调用；
+        variant 区分同一实体的不同裁剪结果（如 token 预算与相关成员）
+        """
+        key = (entity, module, mode, variant)
+        with self.lock:
+            if key in self.corpora:
+                self.hits += 1
+                return self.corpora[key]
+            self.misses += 1
+        value = build(self.members(entity, module))
+        with self.lock:
+            return self.corpora.setdefault(key, value)
+
+    def report(self):
+        lookups = self.hits + self.misses
+        if not lookups:
+            return
+        print(f"[CACHE] 实体语料缓存命中 {self.hits} 次，未命中 {self.misses} 次，"
+              f"命中率 {self.hits / lookups:.1%}，图查询 {self.queries} 次")
@@ -1,15 +1,12 @@
 import os
 import json
-from langchain_openai import ChatOpenAI
 from pydantic import BaseModel
 from typing import Annotated
 from langgraph.graph.message import add_messages
 from langchain_core.messages import HumanMessage
 from langgraph.graph import StateGraph, END
-from pydantic import SecretStr
 import re
-
-llm = ChatOpenAI(base_url="Your URL", api_key=SecretStr("Your API Key"))
+from config import get_eval_llm, get_cached_llm
 
 
 class State(BaseModel):
@@ -57,8 +54,7 @@ def benchmark_step(state: State, llm):
     3. Return only the ArkTS code, with no explanations.
     4. No Markdown formatting, just plain code.
     """
-    response = llm.invoke([HumanMessage(content=prompt)])
-    generated_code = response.content
+    generated_code = get_cached_llm(llm=llm).invoke([HumanMessage(content=prompt)])
 
     project_root = r"path/to/your/HarmonyOS(DevEco Studio)/project"
     extract_and_write_code_from_test(test, generated_code, project_root, state.model_name)
@@ -103,4 +99,4 @@ if __name__ == "__main__":
     benchmark_file = r"path/to/your/benchmark.json"
     base_output_dir = r"path/to/your/benchmark_results"
 
-    run_benchmark(benchmark_file, os.path.join(base_output_dir, "model_name"), llm, "model_name")
+    run_benchmark(benchmark_file, os.path.join(base_output_dir, "model_name"), get_eval_llm(), "model_name")
@@ -0,0 +1,95 @@
+import time
+import random
+import argparse
+import tracemalloc
+from candidate_graph import build_candidate_graph
+from mcts import mcts_search, extract_top_paths
+
+
+def synthetic_nodes(count: int, seed: int = 0) -> list[dict]:
+    rng = random.Random(seed)
+    return [
+        {"id": f"n{i}", "name": f"Api{i}", "labels": ["Class"], "comment": "", "description": "",
+         "origin": f"@kit.BenchKit.Api{i}", "score": round(rng.uniform(0, 50), 4)}
+        for i in range(count)
+    ]
+
+
+def build_complete_graph(nodes: list[dict]):
+    """
+    旧实现：物化全部 n(n-1) 条边的完全有向图，仅作对照
+    """
+    import networkx as nx
+
+    G = nx.DiGraph()
+    for node in nodes:
+        G.add_node(node["id"], name=node["name"], score=node["score"], comment=node["comment"],
+                   description=node["description"], origin=node["origin"], labels=node["labels"])
+    for i in range(len(nodes)):
+        for j in range(len(nodes)):
+            if i != j:
+                G.add_edge(nodes[i]["id"], nodes[j]["id"], weight=(nodes[i]["score"] + nodes[j]["score"]) / 2)
+    return G
+
+
+def measure_build(build, nodes):
+    tracemalloc.start()
+    start = time.perf_counter()
+    G = build(nodes)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return G, elapsed, peak
+
+
+def same_edges(G, legacy) -> bool:
+    """
+    逐节点比较后继顺序和边权：两者一致时，任何只通过 successors/边权访问图的搜索在两种图上行为相同
+    """
+    for node_id in G.ids:
+        successors = G.successors(node_id)
+        if successors != list(legacy.successors(node_id)):
+            return False
+        if any(abs(G.weight(node_id, v) - legacy[node_id][v]["weight"]) > 1e-9 for v in successors):
+            return False
+    return True
+
+
+def search_paths(G, start_id, iterations: int, seed: int):
+    """
+    MCTS 只接受 CandidateGraph，路径检查也只在隐式候选图上做
+    """
+    root = mcts_search(G, start_id, iterations=iterations, rng=random.Random(seed))
+    tasks = extract_top_paths(root, G, top_k=10, sample_nodes_per_path=2, rng=random.Random(seed))
+    return [task["origin_path"] for task in tasks]
+
+
+def run_benchmark(sizes: list[int], iterations: int, seed: int):
+    for size in sizes:
+        nodes = synthetic_nodes(size, seed)
+        start_id = max(nodes, key=lambda n: n["score"])["id"]
+        G, elapsed, peak = measure_build(build_candidate_graph, nodes)
+        print(f"[BENCH] {size:>6} 个节点 隐式候选图: 构建 {elapsed * 1000:8.1f} ms，峰值内存 {peak / 2 ** 20:8.2f} MiB")
+        try:
+            legacy, legacy_elapsed, legacy_peak = measure_build(build_complete_graph, nodes)
+        except ImportError:
+            print("[WARN] 未安装 networkx，跳过完全图对照")
+            continue
+        print(f"[BENCH] {size:>6} 个节点 完全图:     构建 {legacy_elapsed * 1000:8.1f} ms，峰值内存 {legacy_peak / 2 ** 20:8.2f} MiB，"
+              f"边数 {legacy.number_of_edges()}")
+        print(f"        后继顺序与边权{'一致' if same_edges(G, legacy) else '不一致'}")
+        del legacy
+        start = time.perf_counter()
+        paths = search_paths(G, start_id, iterations, seed)
+        repeat = search_paths(G, start_id, iterations, seed)
+        print(f"        隐式候选图 MCTS {iterations} 次迭代 {(time.perf_counter() - start) / 2 * 1000:.1f} ms，"
+              f"路径 {len(paths)} 条，相同随机种子下{'可复现' if paths == repeat else '不可复现'}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[250, 500, 1000, 2000])
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    run_benchmark(args.sizes, args.iterations, args.seed)
@@ -0,0 +1,207 @@
+import math
+import time
+import random
+import argparse
+from candidate_graph import build_candidate_graph
+from bench_candidate_graph import synthetic_nodes
+from mcts import mcts_search, extract_top_paths, search_many, top_leaf_paths
+
+
+class LegacyNode:
+    def __init__(self, node_id, parent=None):
+        self.node_id = node_id
+        self.parent = parent
+        self.children = []
+        self.visits = 0
+        self.value = 0.0
+
+
+def legacy_ucb1(node, total_simulations, c=1.4):
+    if node.visits == 0:
+        return float('inf')
+    return node.value / node.visits + c * (math.sqrt(math.log(total_simulations) / node.visits))
+
+
+def legacy_mcts_search(G, start_node_id, iterations=50):
+    """
+    旧实现：每步重算子节点访问总数、列表成员判断、逐步扫描整个模块的随机模拟，仅作对照
+    """
+    root = LegacyNode(start_node_id)
+    all_nodes = {start_node_id: root}
+    for _ in range(iterations):
+        node = root
+        path = [node.node_id]
+        while node.children:
+            total_sim = sum(c.visits for c in node.children)
+            node = max(node.children, key=lambda n: legacy_ucb1(n, total_sim))
+            path.append(node.node_id)
+        neighbors = list(G.successors(node.node_id))
+        unvisited = [n for n in neighbors if n not in [c.node_id for c in node.children]]
+        if unvisited:
+            child = LegacyNode(random.choice(unvisited), parent=node)
+            node.children.append(child)
+            all_nodes[child.node_id] = child
+            node = child
+            path.append(node.node_id)
+        sim_path = path[:]
+        while True:
+            nxt = [n for n in G.successors(sim_path[-1]) if n not in sim_path]
+            if not nxt:
+                break
+            sim_path.append(random.choice(nxt))
+        sim_score = sum(G.nodes[n]["score"] for n in sim_path)
+        for nid in sim_path:
+            if nid not in all_nodes:
+                all_nodes[nid] = LegacyNode(nid)
+            all_nodes[nid].visits += 1
+            all_nodes[nid].value += sim_score
+    return root
+
+
+
+def legacy_extract_top_paths(root, G, top_k=5):
+    """
+    旧实现：递归枚举全部叶子路径再整体排序，仅作对照（不含实体采样部分）
+    """
+    paths = []
+
+    def dfs(node, path):
+        if not node.children:
+            paths.append(path[:])
+        for child in node.children:
+            dfs(child, path + [child.node_id])
+
+    dfs(root, [root.node_id])
+    scored = [(sum(G.nodes[n]["score"] for n in p), p) for p in paths]
+    scored.sort(reverse=True, key=lambda x: x[0])
+    return scored[:top_k]
+
+def iterations_per_second(search, G, start_id, iterations: int, seed: int) -> float:
+    random.seed(seed)
+    start = time.perf_counter()
+    search(G, start_id, iterations=iterations)
+    return iterations / (time.perf_counter() - start)
+
+
+def run_benchmark(size: int, iterations: int, legacy_iterations: int, neighbors: int | None, seed: int):
+    nodes = synthetic_nodes(size, seed)
+    G = build_candidate_graph(nodes, neighbors)
+    start_id = max(nodes, key=lambda n: n["score"])["id"]
+    mode = "完全图" if neighbors is None else f"top-{neighbors} 邻居"
+    new = iterations_per_second(mcts_search, G, start_id, iterations, seed)
+    print(f"[BENCH] {size:>5} 个节点（{mode}）新实现: {new:10.1f} 次迭代/秒（{iterations} 次迭代）")
+    if legacy_iterations:
+        old = iterations_per_second(legacy_mcts_search, G, start_id, legacy_iterations, seed)
+        print(f"[BENCH] {size:>5} 个节点（{mode}）旧实现: {old:10.3f} 次迭代/秒（{legacy_iterations} 次迭代），"
+              f"加速 {new / old:.0f}x")
+
+
+
+def top_path_sets(search, G, start_id, checkpoints: list[int], top_k: int, seed: int) -> list[set]:
+    # 同一随机种子下前 i 次迭代完全相同，重跑到各检查点即得到搜索过程中的快照
+    snapshots = []
+    for iterations in checkpoints:
+        random.seed(seed)
+        root = search(G, start_id, iterations=iterations)
+        snapshots.append({tuple(task["origin_path"]) for task in extract_top_paths(root, G, top_k=top_k)})
+    return snapshots
+
+
+def stable_after(checkpoints: list[int], snapshots: list[set]) -> int | None:
+    """
+    最早的检查点，此后 top-k 路径集合不再变化；直到最后一个检查点都在变则返回 None
+    """
+    for i in range(len(snapshots) - 1):
+        if all(snapshot == snapshots[i] for snapshot in snapshots[i + 1:]):
+            return checkpoints[i]
+    return None
+
+
+def run_convergence(size: int, neighbors: int | None, max_iterations: int, step: int, top_k: int, seed: int):
+    nodes = synthetic_nodes(size, seed)
+    G = build_candidate_graph(nodes, neighbors)
+    start_id = max(nodes, key=lambda n: n["score"])["id"]
+    mode = "完全图" if neighbors is None else f"top-{neighbors} 邻居"
+    checkpoints = list(range(step, max_iterations + 1, step))
+    searches = [("新实现", mcts_search)]
+    if neighbors is not None:
+        searches.append(("旧实现", legacy_mcts_search))
+    for label, search in searches:
+        snapshots = top_path_sets(search, G, start_id, checkpoints, top_k, seed)
+        stable = stable_after(checkpoints, snapshots)
+        overlap = len(snapshots[-1] & snapshots[-2]) / max(len(snapshots[-1]), 1) if len(snapshots) > 1 else 1.0
+        print(f"[BENCH] {size:>5} 个节点（{mode}）{label}: top-{top_k} 路径"
+              f"{f'在 {stable} 次迭代后稳定' if stable else f'到 {max_iterations} 次迭代仍未稳定'}，"
+              f"最后两个检查点重合 {overlap:.0%}，最终 {len(snapshots[-1])} 条路径")
+
+
+
+def run_parallel(size: int, neighbors: int | None, start_nodes: int, iterations: int, levels: list[int], seed: int):
+    nodes = synthetic_nodes(size, seed)
+    G = build_candidate_graph(nodes, neighbors)
+    start_ids = [node["id"] for node in sorted(nodes, key=lambda n: n["score"], reverse=True)[:start_nodes]]
+    baseline, reference = None, None
+    for workers in levels:
+        start = time.perf_counter()
+        results = search_many(G, start_ids, iterations=iterations, top_k=10, workers=workers, seed=seed)
+        elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        paths = [[task["origin_path"] for task in paths] for paths in results]
+        reference = reference or paths
+        print(f"[BENCH] {workers:>2} 个进程: {start_nodes} 个起点 × {iterations} 次迭代 {elapsed:.2f}s，"
+              f"相对 {levels[0]} 个进程加速 {baseline / elapsed:.1f}x，结果与首轮{'一致' if paths == reference else '不一致'}")
+
+
+
+def run_extract(size: int, iterations: int, top_k: int, seed: int):
+    nodes = synthetic_nodes(size, seed)
+    G = build_candidate_graph(nodes)
+    start_id = max(nodes, key=lambda n: n["score"])["id"]
+    for label, widening in (("宽树", 0.5), ("单链", 0.0)):
+        root = mcts_search(G, start_id, iterations=iterations, widening=widening, rng=random.Random(seed))
+        start = time.perf_counter()
+        top_leaf_paths(root, G, top_k)
+        new = time.perf_counter() - start
+        try:
+            start = time.perf_counter()
+            legacy_extract_top_paths(root, G, top_k)
+            old = f"{(time.perf_counter() - start) * 1000:.1f} ms"
+        except RecursionError:
+            old = "超出递归深度"
+        print(f"[BENCH] {label}（{iterations} 次迭代）提取 top-{top_k}: 新实现 {new * 1000:.1f} ms，旧实现 {old}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", type=int, default=5000)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--legacy-iterations", type=int, default=1, help="旧实现单次迭代很慢，只跑少量迭代估算速率")
+    # 完全图下旧实现每次模拟是 O(n³) 的列表扫描，5000 个节点跑不完一次迭代，只在较小的模块上对照
+    parser.add_argument("--legacy-sizes", type=int, nargs="*", default=[250, 500, 1000])
+    parser.add_argument("--neighbors", type=int, nargs="+", default=[0, 50], help="0 表示完全图")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--convergence", action="store_true", help="改为测量 top-k 路径稳定所需的迭代次数")
+    parser.add_argument("--max-iterations", type=int, default=3000)
+    parser.add_argument("--step", type=int, default=100)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--parallel", action="store_true", help="改为测量多起点进程池搜索的加速比")
+    parser.add_argument("--start-nodes", type=int, default=50)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--extract", action="store_true", help="改为测量 top-k 路径提取的耗时")
+    args = parser.parse_args()
+    if args.extract:
+        run_extract(args.size, args.max_iterations, args.top_k, args.seed)
+        raise SystemExit
+    if args.parallel:
+        for neighbors in args.neighbors:
+            run_parallel(args.size, neighbors or None, args.start_nodes, args.iterations, args.workers, args.seed)
+        raise SystemExit
+    if args.convergence:
+        for neighbors in args.neighbors:
+            run_convergence(args.size, neighbors or None, args.max_iterations, args.step, args.top_k, args.seed)
+        raise SystemExit
+    for neighbors in args.neighbors:
+        for size in args.legacy_sizes if not neighbors else []:
+            run_benchmark(size, args.iterations, args.legacy_iterations, None, args.seed)
+        legacy_iterations = args.legacy_iterations if neighbors else 0
+        run_benchmark(args.size, args.iterations, legacy_iterations, neighbors or None, args.seed)
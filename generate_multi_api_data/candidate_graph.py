@@ -0,0 +1,66 @@
+import numpy as np
+from typing import Dict, List
+
+NODE_FIELDS = ("name", "score", "comment", "description", "origin", "labels")
+
+
+class CandidateGraph:
+    """
+    模块内的隐式候选图：不物化 n² 条边，任意两个不同节点之间默认相连（与原来的完全图等价），
+    后继按节点加入顺序给出；neighbors=k 时每个节点只连向分数最高的 k 个其他节点。
+    边权恒为两端分数的均值，需要时由 weight() 按分数数组现算
+    """
+
+    def __init__(self, nodes: List[Dict], neighbors: int | None = None):
+        self.ids = [node["id"] for node in nodes]
+        self.index = {nid: i for i, nid in enumerate(self.ids)}
+        self.scores = np.array([node["score"] for node in nodes], dtype=np.float64)
+        self.nodes = {node["id"]: {field: node[field] for field in NODE_FIELDS} for node in nodes}
+        self.neighbors = neighbors
+        # top-k 邻居对所有节点相同（去掉自身即可），只需保存分数最高的 k+1 个
+        self.top_ids = None
+        self.top_index = None
+        if neighbors is not None:
+            self.top_index = np.argsort(-self.scores, kind="stable")[:neighbors + 1]
+            self.top_ids = [self.ids[i] for i in self.top_index]
+
+    def __len__(self):
+        return len(self.ids)
+
+    def number_of_nodes(self) -> int:
+        return len(self.ids)
+
+    def successors(self, node_id) -> List:
+        if self.top_ids is None:
+            return [nid for nid in self.ids if nid != node_id]
+        return [nid for nid in self.top_ids if nid != node_id][:self.neighbors]
+
+    def has_edge(self, u, v) -> bool:
+        if u == v or u not in self.index or v not in self.index:
+            return False
+        return self.top_ids is None or v in self.successors(u)
+
+    def successor_indices(self, i: int) -> np.ndarray:
+        if self.top_index is None:
+            return np.delete(np.arange(len(self.ids)), i)
+        return self.top_index[self.top_index != i][:self.neighbors]
+
+    def sample_successor(self, i: int, excluded, rng, tries: int = 32) -> int | None:
+        """
+        随机取一个不在 excluded 中的后继下标。完全图下先做拒绝采样，不必扫描整个模块；
+        连续 tries 次落在 excluded 中说明剩余候选不多，再退回到扫描
+        """
+        if self.top_index is None:
+            for _ in range(tries):
+                j = rng.randrange(len(self.ids))
+                if j != i and j not in excluded:
+                    return j
+        candidates = [j for j in self.successor_indices(i).tolist() if j not in excluded]
+        return rng.choice(candidates) if candidates else None
+
+    def weight(self, u, v) -> float:
+        return float((self.scores[self.index[u]] + self.scores[self.index[v]]) / 2)
+
+
+def build_candidate_graph(nodes: List[Dict], neighbors: int | None = None) -> CandidateGraph:
+    return CandidateGraph(nodes, neighbors)
@@ -1,20 +1,22 @@
-import os
-import json
 import re
-import traceback
-import math
 import random
-import networkx as nx
-from typing import Dict, List
 from langgraph.graph import StateGraph, START, END
 from node import (
     State,
     generate_comprehensive_question,
     generate_student_code,
     router,
-    get_entities_in_module
+    get_entities_in_module,
+    get_entity_corpus,
+    entity_context
 )
-from config import driver
+from config import get_graph_store, get_corpus_cache, setting
+from scheduler import run_as_completed, format_error
+from checkpoint import JsonlCheckpoint
+from question_batch import generate_questions_batched
+from corpus_budget import split_budget
+from candidate_graph import build_candidate_graph
+from mcts import search_many
 
 def build_graph():
     graph = StateGraph(State)
@@ -37,137 +39,21 @@ def build_graph():
     return graph.compile()
 
 def fetch_module_nodes_with_score(module_name: str):
-    with driver.session() as session:
-        result = session.run("""
-        MATCH (m:Module {名称: $module_name})<-[:BELONGS_TO]-(n)
-        WHERE n.info_score IS NOT NULL
-        RETURN elementId(n) AS id,
-               n.`名称` AS name,
-               labels(n) AS labels,
-               n.注释信息 AS comment,
-               n.`唯一键` AS origin,
-               n.功能描述 AS description,
-               n.info_score AS score
-        ORDER BY name
-        """, module_name=module_name)
-
-        return [
-            {
-                "id": r["id"],
-                "name": r["name"],
-                "labels": r["labels"],
-                "comment": r["comment"],
-                "origin": r["origin"],
-                "description": r["description"],
-                "score": r["score"]
-            }
-            for r in result
-        ]
-
-def build_nx_graph(nodes: List[Dict]):
-    G = nx.DiGraph()
-    for node in nodes:
-        G.add_node(node["id"], name=node["name"], score=node["score"], comment=node["comment"],description=node["description"], origin=node["origin"], labels=node["labels"])
-    for i in range(len(nodes)):
-        for j in range(len(nodes)):
-            if i != j:
-                avg_score = (nodes[i]["score"] + nodes[j]["score"]) / 2
-                G.add_edge(nodes[i]["id"], nodes[j]["id"], weight=avg_score)
-    return G
-
-class MCTSNode:
-    def __init__(self, node_id, parent=None):
-        self.node_id = node_id
-        self.parent = parent
-        self.children: List['MCTSNode'] = []
-        self.visits = 0
-        self.value = 0.0
-
-def ucb1(node: MCTSNode, total_simulations: int, c=1.4):
-    if node.visits == 0:
-        return float('inf')
-    return node.value / node.visits + c * (math.sqrt(math.log(total_simulations) / node.visits))
-
-def mcts_search(G: nx.DiGraph, start_node_id, iterations=50):
-    root = MCTSNode(start_node_id)
-    all_nodes = {start_node_id: root}
-    for _ in range(iterations):
-        node = root
-        path = [node.node_id]
-
-        # Selection
-        while node.children:
-            total_sim = sum(c.visits for c in node.children)
-            node = max(node.children, key=lambda n: ucb1(n, total_sim))
-            path.append(node.node_id)
-
-        # Expansion
-        neighbors = list(G.successors(node.node_id))
-        unvisited = [n for n in neighbors if n not in [c.node_id for c in node.children]]
-        if unvisited:
-            new_node_id = random.choice(unvisited)
-            child = MCTSNode(new_node_id, parent=node)
-            node.children.append(child)
-            all_nodes[new_node_id] = child
-            node = child
-            path.append(node.node_id)
-
-        # Simulation
-        sim_path = path[:]
-        while True:
-            cur = sim_path[-1]
-            neighbors = list(G.successors(cur))
-            nxt = [n for n in neighbors if n not in sim_path]
-            if not nxt:
-                break
-            sim_path.append(random.choice(nxt))
-
-        # Backpropagation
-        sim_score = sum(G.nodes[n]["score"] for n in sim_path)
-        for nid in sim_path:
-            if nid not in all_nodes:
-                all_nodes[nid] = MCTSNode(nid)
-            all_nodes[nid].visits += 1
-            all_nodes[nid].value += sim_score
-    return root
-
-def extract_top_paths(root, G, top_k=5, sample_nodes_per_path=3):
-    paths = []
-
-    def dfs(node, path):
-        if not node.children:
-            paths.append(path[:])
-        for child in node.children:
-            dfs(child, path + [child.node_id])
-
-    dfs(root, [root.node_id])
-
-    scored = [(sum(G.nodes[n]["score"] for n in p), p) for p in paths]
-    scored.sort(reverse=True, key=lambda x: x[0])
-
-    results = []
-    for score, p in scored[:top_k]:
-        sampled = random.sample(p, min(sample_nodes_per_path, len(p)))
-        entity_group = []
-        for nid in sampled:
-            node_data = G.nodes[nid]
-            entity_group.append({
-                "id": nid,
-                "name": node_data.get("name"),
-                "score": node_data.get("score"),
-                "labels": node_data.get("labels"),
-                "comment": node_data.get("comment"),
-                "origin": node_data.get("origin"),
-                "description": node_data.get("description")
-            })
-        results.append({
-            "entity_group": entity_group,
-            "origin_path": p,
-            "path_score": score
-        })
-    return results
+    return [
+        {
+            "id": r["id"],
+            "name": r["name"],
+            "labels": r["labels"],
+            "comment": r["comment"],
+            "origin": r["origin"],
+            "description": r["description"],
+            "score": r["score"]
+        }
+        for r in get_graph_store().scored_nodes_in_module(module_name)
+    ]
 
-def get_mcts_multi_entity_tasks(module_name: str, iterations=50, top_k=50, sample_nodes_per_path=2, start_nodes_limit=5):
+def get_mcts_multi_entity_tasks(module_name: str, iterations=50, top_k=50, sample_nodes_per_path=2, start_nodes_limit=5,
+                                neighbors=None, workers=1, seed=None):
     nodes = fetch_module_nodes_with_score(module_name)
     if not nodes:
         return []
@@ -175,84 +61,125 @@ def get_mcts_multi_entity_tasks(module_name: str, iterations=50, top_k=50, sampl
     sorted_nodes = sorted(nodes, key=lambda x: x["score"], reverse=True)
     start_nodes = sorted_nodes[:min(start_nodes_limit, len(sorted_nodes))]
 
-    G = build_nx_graph(nodes)
+    G = build_candidate_graph(nodes, neighbors)
     all_tasks = []
-
-    for start in start_nodes:
-        root = mcts_search(G, start["id"], iterations=iterations)
-        paths = extract_top_paths(root, G, top_k=top_k, sample_nodes_per_path=sample_nodes_per_path)
+    for paths in search_many(G, [start["id"] for start in start_nodes], iterations=iterations, top_k=top_k,
+                             sample_nodes_per_path=sample_nodes_per_path, workers=workers, seed=seed):
         all_tasks.extend(paths)
-
-    seen = set()
-    unique_tasks = []
-    for task in all_tasks:
-        path_key = tuple(task["origin_path"])
-        if path_key not in seen:
-            seen.add(path_key)
-            unique_tasks.append(task)
-
-    return unique_tasks
+    return all_tasks
 
 class ArkTSDataGenerator:
-    def __init__(self, version, module: str = "@kit.ArkTS", max_attempts: int = 1, use_mcts=True):
+    def __init__(self, version, module: str = "@kit.ArkTS", max_attempts: int = 1, use_mcts=True, warm_corpus=True,
+                 resume=False, seed=None, batch_questions=False, batch_token_budget=4000):
+        """
+        resume 为 True 时接着同名检查点继续，跳过已完成的路径；MCTS 路径带随机性，续跑时应传入与上次相同的 seed。
+        batch_questions 为 True 时先把多个任务的出题请求按 batch_token_budget 打包生成
+        """
         self.graph = build_graph()
         self.module = module
         self.max_attempts = max_attempts
-        self.logs = []
         self.version = version
         self.use_mcts = use_mcts
+        self.resume = resume
+        self.batch_questions = batch_questions
+        self.batch_token_budget = batch_token_budget
+        self.questions = {}
 
         if use_mcts:
+            rng = random.Random(seed) if seed is not None else random
             self.entities = get_mcts_multi_entity_tasks(
                 module,
                 iterations=100,
                 top_k=10,
-                sample_nodes_per_path=random.randint(2,3),
-                start_nodes_limit=50
+                sample_nodes_per_path=rng.randint(2,3),
+                start_nodes_limit=50,
+                workers=None,
+                seed=seed
             )
         else:
             self.entities = get_entities_in_module(module)
-
-    def generate_all(self):
-        for entity in self.entities:
-            if "entity_group" in entity:
-                print(f"\n[PROCESSING] 多结点路径：{[e['name'] for e in entity['entity_group']]} (score={entity['path_score']})")
-                try:
-                    self.generate_for_group(entity)
-                except Exception as e:
-                    tb_str = traceback.format_exc()
-                    print(f"[ERROR] 多节点任务出错: {e}\n{tb_str}")
-                    self.logs.append({"module": self.module, "error": str(e)})
-            else:
-                print(f"\n[PROCESSING] 正在处理：{entity['name']} {entity.get('labels')}")
-                try:
-                    self.generate_for_entity(entity)
-                except Exception as e:
-                    tb_str = traceback.format_exc()
-                    print(f"[ERROR] 处理 {entity['name']} 时出错: {e}\n{tb_str}")
-                    self.logs.append({"module": self.module, "entity": entity["name"], "error": str(e)})
-            self._save_logs()
-        self._save_logs()
+        if warm_corpus:
+            get_corpus_cache().warm(module)
+
+    def generate_all(self, workers=None):
+        """
+        并发处理全部实体/路径，workers 默认取 LLM_MAX_CONCURRENCY；每个任务完成即写入检查点，最终输出按任务顺序整理
+        """
+        workers = workers or int(setting("LLM_MAX_CONCURRENCY")) or 1
+        checkpoint = JsonlCheckpoint(self._output_path(".jsonl"), resume=self.resume)
+        pending = [entity for entity in self.entities if not checkpoint.done(self.task_key(entity))]
+        if len(pending) < len(self.entities):
+            print(f"[RESUME] 跳过 {len(self.entities) - len(pending)} 个已完成任务，剩余 {len(pending)} 个")
+        if self.batch_questions:
+            self.questions = self._batch_questions(pending, workers)
+        try:
+            run_as_completed(pending, self._run_task, workers,
+                        lambda entity, records, error: self._collect(checkpoint, entity, records, error))
+        finally:
+            checkpoint.close()
+        count = checkpoint.compact(self._output_path(".json"), [self.task_key(entity) for entity in self.entities])
+        print(f"[INFO] 模块 {self.module} 的训练数据已保存完成 ✅ 共 {count} 条")
+        get_corpus_cache().report()
+
+    def _batch_questions(self, tasks: list[dict], workers: int) -> dict[str, list[str]]:
+        budget = int(setting("CORPUS_TOKEN_BUDGET"))
+        items = []
+        for task in tasks:
+            entities = task.get("entity_group") or [task]
+            items.append({
+                "key": self.task_key(task),
+                "api_name": ", ".join(e["name"] for e in entities),
+                "apis": [e["name"] for e in entities],
+                "corpus": "\n\n".join(
+                    get_entity_corpus(e["name"], self.module, budget=split_budget(budget, len(entities)),
+                                      context=entity_context(e))
+                    for e in entities
+                ),
+            })
+        return generate_questions_batched(items, num=State.model_fields["num"].default,
+                                          token_budget=self.batch_token_budget, workers=workers)
+
+    @staticmethod
+    def task_key(entity: dict) -> str:
+        if "entity_group" in entity:
+            return "|".join(map(str, entity["origin_path"]))
+        return entity.get("origin") or entity["name"]
+
+    def _run_task(self, entity: dict):
+        if "entity_group" in entity:
+            print(f"\n[PROCESSING] 多结点路径：{[e['name'] for e in entity['entity_group']]} (score={entity['path_score']})")
+            return self.generate_for_group(entity)
+        print(f"\n[PROCESSING] 正在处理：{entity['name']} {entity.get('labels')}")
+        return self.generate_for_entity(entity)
+
+    def _collect(self, checkpoint: JsonlCheckpoint, entity: dict, records, error):
+        if error is not None and "entity_group" in entity:
+            print(f"[ERROR] 多节点任务出错: {error}\n{format_error(error)}")
+            records = [{"module": self.module, "error": str(error)}]
+        elif error is not None:
+            print(f"[ERROR] 处理 {entity['name']} 时出错: {error}\n{format_error(error)}")
+            records = [{"module": self.module, "entity": entity["name"], "error": str(error)}]
+        checkpoint.append(self.task_key(entity), records, failed=error is not None)
 
     def generate_for_entity(self, entity: dict):
         init_state = self._init_state(entity=entity)
         final_state = self.graph.invoke(State(**init_state), config={"recursion_limit": 100})
-        self._record_results(final_state, entity_name=entity["name"], labels=entity.get("labels"))
+        return self._record_results(final_state, entity_name=entity["name"], labels=entity.get("labels"))
 
     def generate_for_group(self, task: dict):
         init_state = self._init_state(entity=task)
         final_state = self.graph.invoke(State(**init_state),
                                         config={"recursion_limit": 100})
-        self._record_results(final_state,
-                             entity_name="|".join([e["name"] for e in task["entity_group"]]),
-                             labels=["MultiEntity"])
+        return self._record_results(final_state,
+                                    entity_name="|".join([e["name"] for e in task["entity_group"]]),
+                                    labels=["MultiEntity"])
     def _init_state(self, entity):
         return {
             "messages": [],
             "entity": entity["entity_group"][0] if "entity_group" in entity else entity,
             "entity_group": entity["entity_group"],
             "question": "",
-            "question_list": [],
+            "question_list": self.questions.get(self.task_key(entity), []),
             "student_code": "",
             "current_question_index": 0,
             "student_attempt": 0,
@@ -263,22 +190,20 @@ class ArkTSDataGenerator:
         }
 
     def _record_results(self, final_state, entity_name, labels):
-        for idx, question in enumerate(final_state.get("question_list", [])):
-            self.logs.append({
+        return [
+            {
                 "module": self.module,
                 "entity": entity_name,
                 "labels": labels,
                 "question": question,
                 "student_code": final_state['final_code'][idx],
-            })
+            }
+            for idx, question in enumerate(final_state.get("question_list", []))
+        ]
 
-    def _save_logs(self):
+    def _output_path(self, suffix: str) -> str:
         safe_name = re.sub(r'[^\w\-]', '_', self.module.replace("@kit.", ""))
-        output_path = f"/root/research/training_data/training_multi_data_{self.module}_{safe_name}_{self.version}.json"
-        os.makedirs(os.path.dirname(output_path), exist_ok=True)
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(self.logs, f, indent=2, ensure_ascii=False)
-        print(f"[INFO] 模块 {self.module} 的训练数据已保存完成 ✅")
+        return f"/root/research/training_data/training_multi_data_{self.module}_{safe_name}_{self.version}{suffix}"
 
 if __name__ == "__main__":
     generator = ArkTSDataGenerator(module="module_name", version=f"v{i}", use_mcts=True)
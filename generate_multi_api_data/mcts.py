@@ -0,0 +1,260 @@
+import os
+import math
+import heapq
+import random
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from typing import List
+from candidate_graph import CandidateGraph
+
+class MCTSNode:
+    __slots__ = ("node_id", "index", "parent", "children", "child_indices", "visits", "value", "child_visits")
+
+    def __init__(self, node_id, index: int, parent=None):
+        self.node_id = node_id
+        self.index = index
+        self.parent = parent
+        self.children: List['MCTSNode'] = []
+        self.child_indices = set()
+        self.visits = 0
+        self.value = 0.0
+        # 子节点访问次数之和，回传时增量维护，选择阶段不必每步求和
+        self.child_visits = 0
+
+def ucb1(node: MCTSNode, total_simulations: int, c=1.4):
+    if node.visits == 0:
+        return float('inf')
+    return node.value / node.visits + c * (math.sqrt(math.log(total_simulations) / node.visits))
+
+def select_child(node: MCTSNode, c=1.4) -> MCTSNode:
+    # 与 max(children, key=ucb1) 等价：未访问的子节点优先，分数相同时取靠前的
+    log_total = math.log(node.child_visits) if node.child_visits else 0.0
+    best, best_ucb = None, -math.inf
+    for child in node.children:
+        if child.visits == 0:
+            return child
+        value = child.value / child.visits + c * math.sqrt(log_total / child.visits)
+        if value > best_ucb:
+            best, best_ucb = child, value
+    return best
+
+def rollout(G: CandidateGraph, path: List[int], rng, np_rng) -> List[int]:
+    """
+    从 path 末端随机走到无路可走。完全图下剩余节点的随机游走顺序就是一个均匀随机排列，
+    直接用 NumPy 打乱，不再逐步扫描整个模块
+    """
+    if G.top_index is None:
+        rest = np.ones(len(G), dtype=bool)
+        rest[path] = False
+        tail = np.flatnonzero(rest)
+        np_rng.shuffle(tail)
+        return path + tail.tolist()
+    sim_path = path[:]
+    visited = set(path)
+    while (nxt := G.sample_successor(sim_path[-1], visited, rng)) is not None:
+        sim_path.append(nxt)
+        visited.add(nxt)
+    return sim_path
+
+def expandable(node: MCTSNode, widening: float) -> bool:
+    # 渐进加宽：子节点数不超过 visits^widening，widening=0 时退化为只在叶子处扩展
+    return len(node.children) < max(1, math.ceil(node.visits ** widening))
+
+def mcts_search(G: CandidateGraph, start_node_id, iterations=50, c=1.4, widening=0.5, rng=None):
+    """
+    树节点按从根出发的路径唯一确定，统计量只挂在树节点上：回传只沿本次选中的树路径更新，
+    模拟阶段经过的节点只贡献得分，不再另建游离节点，同一 API 出现在不同分支时也互不串扰
+    """
+    rng = rng or random
+    np_rng = np.random.default_rng(rng.getrandbits(64))
+    root = MCTSNode(start_node_id, G.index[start_node_id])
+    for _ in range(iterations):
+        node = root
+        path = [node.index]
+
+        # Selection
+        while node.children and not expandable(node, widening):
+            node = select_child(node, c)
+            path.append(node.index)
+
+        # Expansion：不回到本路径上已有的节点
+        new_index = G.sample_successor(node.index, node.child_indices.union(path), rng)
+        if new_index is not None:
+            child = MCTSNode(G.ids[new_index], new_index, parent=node)
+            node.children.append(child)
+            node.child_indices.add(new_index)
+            node = child
+            path.append(new_index)
+
+        # Simulation
+        sim_path = rollout(G, path, rng, np_rng)
+
+        # Backpropagation
+        sim_score = float(G.scores[sim_path].sum())
+        while node is not None:
+            node.visits += 1
+            node.value += sim_score
+            if node.parent is not None:
+                node.parent.child_visits += 1
+            node = node.parent
+    return root
+
+def path_to(node) -> List:
+    path = []
+    while node is not None:
+        path.append(node.node_id)
+        node = node.parent
+    return path[::-1]
+
+def path_key(path) -> frozenset:
+    # 同一组 API 不论经由哪个起点、以什么顺序组成路径，生成的任务都相同
+    return frozenset(path)
+
+def top_leaf_paths(root, G, top_k=5, seen: set | None = None, distinct: bool = False) -> List[tuple]:
+    """
+    非递归深度优先遍历，每层只保留一个 (节点, 路径得分, 子节点迭代器)，路径得分沿途累加；
+    用大小为 top_k 的最小堆保留得分最高的叶子路径（top_k 为 None 时保留全部），得分相同时先遍历到的优先，
+    与整体排序结果一致。path_key 已在 seen 中的路径遍历时直接跳过，入选路径的键会加入 seen。
+    distinct 为真（或给了 seen）时同一 path_key 只保留排名最前的一条，堆中的 top_k 条路径键互不相同
+    """
+    if top_k is not None and top_k <= 0:
+        return []
+    distinct = distinct or seen is not None
+    heap = []
+    best = {}  # distinct 时 path_key -> 堆中有效的条目，被替换或淘汰的旧条目留在堆里惰性删除
+    seq = 0
+
+    def drop_stale():
+        while heap and best.get(heap[0][2]) is not heap[0]:
+            heapq.heappop(heap)
+
+    stack = [(root, G.nodes[root.node_id]["score"], iter(root.children))]
+    while stack:
+        node, score, children = stack[-1]
+        if not node.children:
+            stack.pop()
+            key = path_key(path_to(node)) if distinct else None
+            if seen is not None and key in seen:
+                continue
+            entry = (score, -seq, key, node)
+            seq += 1
+            if not distinct:
+                if top_k is None or len(heap) < top_k:
+                    heapq.heappush(heap, entry)
+                elif entry[:2] > heap[0][:2]:
+                    heapq.heapreplace(heap, entry)
+                continue
+            if key in best:
+                if entry[:2] > best[key][:2]:
+                    best[key] = entry
+                    heapq.heappush(heap, entry)
+                    drop_stale()
+                continue
+            if top_k is None or len(best) < top_k:
+                best[key] = entry
+                heapq.heappush(heap, entry)
+            elif entry[:2] > heap[0][:2]:
+                del best[heapq.heappop(heap)[2]]
+                best[key] = entry
+                heapq.heappush(heap, entry)
+                drop_stale()
+            continue
+        child = next(children, None)
+        if child is None:
+            stack.pop()
+            continue
+        stack.append((child, score + G.nodes[child.node_id]["score"], iter(child.children)))
+    if distinct:
+        heap = list(best.values())
+    heap.sort(key=lambda entry: entry[:2], reverse=True)
+    scored = [(score, path_to(node)) for score, _, _, node in heap]
+    if seen is not None:
+        seen.update(path_key(p) for _, p in scored)
+    return scored
+
+def take_unseen(scored: List[tuple], top_k: int, seen: set) -> List[tuple]:
+    """
+    从已按得分排好序的路径中取前 top_k 条 path_key 不在 seen 中的路径，并把它们的键加入 seen
+    """
+    picked = []
+    for score, p in scored:
+        if len(picked) >= top_k:
+            break
+        key = path_key(p)
+        if key not in seen:
+            seen.add(key)
+            picked.append((score, p))
+    return picked
+
+def sample_entity_groups(scored: List[tuple], G, sample_nodes_per_path=3, rng=None):
+    rng = rng or random
+    results = []
+    for score, p in scored:
+        sampled = rng.sample(p, min(sample_nodes_per_path, len(p)))
+        entity_group = []
+        for nid in sampled:
+            node_data = G.nodes[nid]
+            entity_group.append({
+                "id": nid,
+                "name": node_data.get("name"),
+                "score": node_data.get("score"),
+                "labels": node_data.get("labels"),
+                "comment": node_data.get("comment"),
+                "origin": node_data.get("origin"),
+                "description": node_data.get("description")
+            })
+        results.append({
+            "entity_group": entity_group,
+            "origin_path": p,
+            "path_score": score
+        })
+    return results
+
+def extract_top_paths(root, G, top_k=5, sample_nodes_per_path=3, rng=None, seen: set | None = None):
+    return sample_entity_groups(top_leaf_paths(root, G, top_k, seen), G, sample_nodes_per_path, rng)
+
+# 进程池中每个 worker 持有的候选图；fork 启动时直接继承父进程内存（写时复制，只读共享），
+# spawn 启动时由 initializer 每个 worker 只反序列化一次
+_worker_graph: CandidateGraph | None = None
+
+def init_worker(G: CandidateGraph):
+    global _worker_graph
+    _worker_graph = G
+
+def search_from(G: CandidateGraph, start_node_id, iterations, seed, limit):
+    """
+    从一个起点搜索，返回得分最高的 limit 条路径键互不相同的叶子路径（按得分从高到低）。
+    随机数只由 (seed, 起点) 决定，与由哪个 worker、以什么顺序执行无关
+    """
+    rng = random.Random(f"{seed}:{start_node_id}")
+    root = mcts_search(G, start_node_id, iterations=iterations, rng=rng)
+    return top_leaf_paths(root, G, top_k=limit, distinct=True)
+
+def _search_in_worker(args):
+    return search_from(_worker_graph, *args)
+
+def search_many(G: CandidateGraph, start_node_ids: List, iterations=50, top_k=5, sample_nodes_per_path=3,
+                workers: int | None = 1, seed=None) -> List[List[dict]]:
+    """
+    从多个起点分别搜索，按起点顺序（重复的起点只搜一次）返回各自的 top 路径。workers 为 1 时串行，
+    None 表示用满 CPU。各起点的候选路径回到主进程后按起点顺序去重：前面的起点已选过的同一组 API
+    不再入选，由该起点后续的路径递补，因此相同 seed 下结果与 workers 无关。
+    第 i 个起点之前的起点最多选走 top_k * i 组 API，所以它只需带回 top_k * (i + 1) 条键互不相同的候选路径
+    """
+    seed = random.getrandbits(64) if seed is None else seed
+    workers = workers or os.cpu_count() or 1
+    starts = list(dict.fromkeys(start_node_ids))
+    tasks = [(start, iterations, seed, top_k * (i + 1)) for i, start in enumerate(starts)]
+    if workers == 1 or len(tasks) <= 1:
+        candidates = [search_from(G, *task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks)), initializer=init_worker,
+                                 initargs=(G,)) as pool:
+            candidates = list(pool.map(_search_in_worker, tasks, chunksize=max(1, len(tasks) // (workers * 4))))
+
+    seen = set()
+    return [
+        sample_entity_groups(take_unseen(scored, top_k, seen), G, sample_nodes_per_path,
+                             random.Random(f"{seed}:{start}:sample"))
+        for start, scored in zip(starts, candidates)
+    ]
@@ -1,9 +1,9 @@
 import os
 import re
-from config import driver
+from config import get_graph_store, get_cached_llm, get_corpus_cache, setting
+from corpus_budget import budgeted_corpus, relevance_key, split_budget, log_prompt_tokens
 from pydantic import BaseModel
 from typing import TypedDict
-from config import llm
 from typing import Annotated, Optional
 from langgraph.graph.message import add_messages
 from langchain_core.messages import HumanMessage
@@ -44,7 +44,7 @@ class Code(TypedDict):
 
 def message_to_state(prompt: str):
     messages = [HumanMessage(content=prompt)]
-    structured_llm = llm.with_structured_output(Code)
+    structured_llm = get_cached_llm(Code)
     response = structured_llm.invoke(messages)
     messages.append(HumanMessage(content=response['code']))
     return messages, response
@@ -53,8 +53,6 @@ def generate_comprehensive_question(state: State) -> State:
     if hasattr(state, "entity_group") and state.entity_group:
         entities = state.entity_group
         entity_names = [e.get("name", "") for e in entities]
-        entity_comments = [e.get("comment", "") or "" for e in entities]
-        entity_descs = [e.get("description", "") or "" for e in entities]
         entity_parent = state.module
 
         state.import_entity = ", ".join(
@@ -73,19 +71,12 @@ def generate_comprehensive_question(state: State) -> State:
             )
             state.type_statement = f"Add the following code after the import statement:\n{type_defs}"
 
+        budget = split_budget(int(setting("CORPUS_TOKEN_BUDGET")), len(entities))
         corpus = "\n\n".join(
-            get_entity_corpus(e["name"], entity_parent, "summary") for e in entities
+            get_entity_corpus(e["name"], entity_parent, budget=budget, context=entity_context(e)) for e in entities
         )
         state.corpus = corpus
-
-        prompt = multi_api_question_prompt.replace(
-            "[API]: {entity_name}", f"[APIs]: {', '.join(entity_names)}"
-        ).format(
-            entity_names=", ".join(entity_names),
-            entity_comment="\n".join(entity_comments),
-            entity_description="\n".join(entity_descs),
-            entity_corpus=corpus
-        )
+        template, api_name = multi_api_question_prompt, ", ".join(entity_names)
 
     else:
         entity = state.entity
@@ -97,20 +88,24 @@ def generate_comprehensive_question(state: State) -> State:
         state.import_entity, state.use_entity = extract_ns_and_usage(entity.get("origin", ""), entity_name)
         if state.import_entity != state.use_entity:
             state.type_statement = f"Add the following code after the import statement: `type {entity_name} = {state.use_entity};`"
-        corpus = get_entity_corpus(entity_name, entity_parent, "summary")
+        corpus = get_entity_corpus(entity_name, entity_parent, budget=int(setting("CORPUS_TOKEN_BUDGET")),
+                                   context=entity_context(entity))
         state.corpus = corpus
-        prompt = question_prompt.format(
-            framework=state.framework,
-            num = state.num,
-            API_name=entity_name,
-            API_member=corpus
-        )
+        template, api_name = question_prompt, entity_name
 
     messages = state.messages.copy()
 
     if not state.question_list:
+        # 只有没有预先批量生成的问题时才需要提示词
+        prompt = template.format(
+            framework=state.framework,
+            num=state.num,
+            API_name=api_name,
+            API_member=corpus
+        )
         messages.append(HumanMessage(content=prompt))
-        structured_llm = llm.with_structured_output(QuestionList)
+        log_prompt_tokens("问题", prompt, corpus)
+        structured_llm = get_cached_llm(QuestionList)
         response = structured_llm.invoke(messages)
         questions = response.get("problem", [])
         if not questions:
@@ -159,8 +154,11 @@ def generate_student_code(state: State) -> State:
             )
             state.type_statement = f"Add the following code after the import statement:\n{type_defs}"
 
+        # 代码提示词里的语料按当前问题挑选相关成员，预算由组内实体均分
+        budget = split_budget(int(setting("CORPUS_TOKEN_BUDGET")), len(entities))
         corpus = "\n\n".join(
-            f"{e['name']} 的成员语料如下：\n{get_entity_corpus(e['name'], entity_parent, 'summary')}"
+            f"{e['name']} 的成员语料如下：\n"
+            f"{get_entity_corpus(e['name'], entity_parent, question=state.question, budget=budget)}"
             for e in entities
         )
         state.corpus = corpus
@@ -178,13 +176,15 @@ def generate_student_code(state: State) -> State:
         state.type_statement = ""
         if state.import_entity != state.use_entity:
             state.type_statement = f"Add the following code after the import statement: `type {entity_name_str} = {state.use_entity};`"
-        corpus = get_entity_corpus(entity_name_str, state.module, "summary")
+        corpus = get_entity_corpus(entity_name_str, state.module, question=state.question,
+                                   budget=int(setting("CORPUS_TOKEN_BUDGET")))
         state.corpus = corpus
 
     prompt = code_prompt.format(
         framework=state.framework,
         question=state.question,
         API_name=entity_name_str,
+        function=entity_comment_str,
         module=state.module,
         meta_data=entity_desc_str,
         corpus=state.corpus,
@@ -192,6 +192,7 @@ def generate_student_code(state: State) -> State:
         type_statement=state.type_statement,
     )
 
+    log_prompt_tokens("代码", prompt, state.corpus)
     messages, response = message_to_state(prompt)
     state.messages = messages
     state.student_code = response['code']
@@ -210,22 +211,7 @@ def router(state: State):
     return "end"
 
 def get_entities_in_module(module: str = "@kit.ArkTS"):
-    prefix = module + "."
-    query = """
-    MATCH (e)
-    WHERE ANY(l IN labels(e) WHERE l IN ['Class','Interface','Enum','Namespace'])
-      AND e.`唯一键` IS NOT NULL
-      AND e.`唯一键` STARTS WITH $prefix
-    RETURN e.名称 AS name,
-           labels(e) AS labels,
-           e.注释信息 AS comment,
-           e.`唯一键` AS origin,
-           e.功能描述 AS description
-    ORDER BY name
-    """
-    with driver.session() as session:
-        results = session.run(query, prefix=prefix)
-        return [dict(record) for record in results]
+    return get_graph_store().entities_in_module(module)
 
 def extract_doc_comments(comment: str) -> str:
     if not comment:
@@ -241,76 +227,83 @@ def extract_doc_comments(comment: str) -> str:
                 break
     return "\n".join(extracted)
 
-def get_entity_corpus(entity_name: str, module: str, mode: str = "summary") -> str:
-    query = """
-    MATCH (parent {名称: $entity_name})
-    WHERE parent.唯一键 STARTS WITH $module
-    MATCH (parent)-[:HAS_METHOD|HAS_PROPERTY|HAS_TYPE_ALIAS|HAS_ENUM]->(child)
-    WHERE child.名称 <> $entity_name
-    RETURN 
-        child.名称 AS name,
-        child.唯一键 AS origin,
-        parent.唯一键 AS parent_origin,
-        labels(child) AS labels,
-        child.注释信息 AS comment
-    ORDER BY name
+def get_entity_corpus(entity_name: str, module: str, mode: str | None = None, question: str = "",
+                      budget: int = 0, context: str = "") -> str:
     """
-
-    with driver.session() as session:
-        results = session.run(query, entity_name=entity_name, module=module)
-        grouped = {}
-        import_tip = None
-
-        for record in results:
-            name = record.get("name") or "unknown"
-            parent_origin = record.get("parent_origin") or ""
-            labels = record.get("labels") or []
-            comment = record.get("comment") or ""
-
-            if parent_origin and "::" in parent_origin and import_tip is None:
-                try:
-                    parts = parent_origin.split("::")
-                    module_part = parts[0]
-                    class_part = parts[1] if len(parts) > 1 else ""
-                    if module_part and class_part:
-                        import_tip = f"Please import before use: `import {{{class_part}}} from '{module_part}'`"
-                except Exception as e:
-                    print(f"[ERROR] Failed to parse import info: {e}")
-                    import_tip = None
-
-            label_str = labels[0] if labels else "Unknown"
-
-            if label_str not in grouped:
-                grouped[label_str] = []
-            grouped[label_str].append({
-                "name": name,
-                "comment": extract_doc_comments(comment)
-            })
-
-        if not grouped:
-            return f"No members found under structure `{entity_name}`."
-
-        lines = [f"The member corpus of {entity_name} is as follows:"]
-        for label, items in grouped.items():
-            if mode == "summary":
-                names = ", ".join(i["name"] for i in items)
-                lines.append(f"[{label}]: {names}")
-            elif mode == "full":
-                for i in items:
-                    comment_str = f": {i['comment']}" if i["comment"] else ""
-                    lines.append(f"[{label}]: {i['name']}{comment_str}")
-            elif mode == "hybrid":
-                names = ", ".join(i["name"] for i in items)
-                lines.append(f"[{label}]: {names}")
-                for i in items[:5]:
-                    comment_str = f": {i['comment']}" if i["comment"] else ""
-                    lines.append(f"    - {i['name']}{comment_str}")
-
-        corpus = "\n".join(lines)
-        if import_tip:
-            corpus = f"{import_tip}\n\n{corpus}"
-
-        return corpus
+    mode 默认取 CORPUS_MODE。budget > 0 时语料超出 budget 个 token 会按成员与 question 的相关度裁掉成员，
+    出题阶段还没有问题时改按与实体自身注释/描述 context 的相关度裁剪；裁剪结果按相关成员缓存
+    """
+    mode = mode or setting("CORPUS_MODE")
+    cache = get_corpus_cache()
+    build = lambda records: build_entity_corpus(entity_name, records, mode)
+    if not budget:
+        return cache.corpus(entity_name, module, mode, build)
+    text = question or context
+    records = [r for r in cache.members(entity_name, module) if r.get("name") != entity_name]
+    return cache.corpus(entity_name, module, mode, lambda _: budgeted_corpus(records, text, budget, build),
+                        variant=(budget, relevance_key(records, text)))
+
+
+def entity_context(entity: dict) -> str:
+    return f"{entity.get('comment') or ''}\n{entity.get('description') or ''}"
+
+
+def build_entity_corpus(entity_name: str, records: list[dict], mode: str = "summary") -> str:
+    grouped = {}
+    import_tip = None
+
+    for record in records:
+        if record.get("name") == entity_name:
+            continue
+        name = record.get("name") or "unknown"
+        parent_origin = record.get("parent_origin") or ""
+        labels = record.get("labels") or []
+        comment = record.get("comment") or ""
+
+        if parent_origin and "::" in parent_origin and import_tip is None:
+            try:
+                parts = parent_origin.split("::")
+                module_part = parts[0]
+                class_part = parts[1] if len(parts) > 1 else ""
+                if module_part and class_part:
+                    import_tip = f"Please import before use: `import {{{class_part}}} from '{module_part}'`"
+            except Exception as e:
+                print(f"[ERROR] Failed to parse import info: {e}")
+                import_tip = None
+
+        label_str = labels[0] if labels else "Unknown"
+
+        if label_str not in grouped:
+            grouped[label_str] = []
+        grouped[label_str].append({
+            "name": name,
+            "comment": extract_doc_comments(comment)
+        })
+
+    if not grouped:
+        return f"No members found under structure `{entity_name}`."
+
+    lines = [f"The member corpus of {entity_name} is as follows:"]
+    for label, items in grouped.items():
+        if mode == "summary":
+            names = ", ".join(i["name"] for i in items)
+            lines.append(f"[{label}]: {names}")
+        elif mode == "full":
+            for i in items:
+                comment_str = f": {i['comment']}" if i["comment"] else ""
+                lines.append(f"[{label}]: {i['name']}{comment_str}")
+        elif mode == "hybrid":
+            names = ", ".join(i["name"] for i in items)
+            lines.append(f"[{label}]: {names}")
+            for i in items[:5]:
+                comment_str = f": {i['comment']}" if i["comment"] else ""
+                lines.append(f"    - {i['name']}{comment_str}")
+
+    corpus = "\n".join(lines)
+    if import_tip:
+        corpus = f"{import_tip}\n\n{corpus}"
+
+    return corpus
 
 def save_student_code(module: str, student_code: str, name: str, idx: int = 0):
     out_code_path = os.path.join("/root/research/test/entry/src/main/ets", "functions")
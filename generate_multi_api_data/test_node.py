@@ -0,0 +1,61 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+HERE = Path(__file__).resolve().parent
+for path in (HERE, HERE.parent):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+pytest.importorskip("pydantic")
+pytest.importorskip("langgraph")
+pytest.importorskip("langchain_core")
+
+import node  # noqa: E402
+
+GROUP = [
+    {"name": "ArrayList", "origin": "@kit.ArkTS.ArrayList", "comment": "", "description": ""},
+    {"name": "buffer", "origin": "@kit.ArkTS.buffer", "comment": "", "description": ""},
+]
+
+
+class FakeLLM:
+    def __init__(self):
+        self.calls = []
+
+    def invoke(self, messages):
+        self.calls.append(messages[-1].content)
+        return {"problem": ["use ArrayList.forEach and buffer.write"]}
+
+
+@pytest.fixture
+def llm(monkeypatch):
+    fake = FakeLLM()
+    monkeypatch.setattr(node, "get_cached_llm", lambda schema=None: fake)
+    monkeypatch.setattr(node, "get_entity_corpus", lambda name, module, **kwargs: f"<corpus of {name}>")
+    monkeypatch.setattr(node, "log_prompt_tokens", lambda *args: None)
+    return fake
+
+
+def group_state(**kwargs):
+    return node.State(messages=[], entity=GROUP[0], entity_group=GROUP, module="@kit.ArkTS",
+                      current_question_index=0, student_code="", student_file_path="", **kwargs)
+
+
+def test_group_question_prompt_uses_template_fields(llm):
+    state = node.generate_comprehensive_question(group_state())
+
+    assert state.question == "use ArrayList.forEach and buffer.write"
+    [prompt] = llm.calls
+    assert "ArkTS" in prompt and "ArrayList, buffer" in prompt
+    assert "<corpus of ArrayList>" in prompt and "<corpus of buffer>" in prompt
+    assert "**3 simple programming exercises**" in prompt
+
+
+def test_group_with_prefilled_questions_skips_llm(llm):
+    state = node.generate_comprehensive_question(group_state(question_list=["q1", "q2"], current_question_index=1))
+
+    assert state.question == "q2"
+    assert llm.calls == []
+    assert "<corpus of buffer>" in state.corpus
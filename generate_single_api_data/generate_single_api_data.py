@@ -1,13 +1,17 @@
-import os
-import json
 import re
+from config import get_corpus_cache, setting
+from scheduler import run_as_completed, format_error
+from checkpoint import JsonlCheckpoint
+from question_batch import generate_questions_batched
 from langgraph.graph import StateGraph, START, END
 from node import (
     State,
     generate_comprehensive_question,
     generate_student_code,
     router,
-    get_entities_in_module
+    get_entities_in_module,
+    get_entity_corpus,
+    entity_context
 )
 
 def build_graph():
@@ -31,26 +35,73 @@ def build_graph():
     return graph.compile()
 
 class ArkTSDataGenerator:
-    def __init__(self, version ,module: str = "@kit.ArkTS", max_attempts: int = 1):
+    def __init__(self, version ,module: str = "@kit.ArkTS", max_attempts: int = 1, warm_corpus=True, resume=False,
+                 batch_questions=False, batch_token_budget=4000):
         self.graph = build_graph()
         self.module = module
         self.max_attempts = max_attempts
-        self.logs = []
+        self.resume = resume
+        self.batch_questions = batch_questions
+        self.batch_token_budget = batch_token_budget
+        self.questions = {}
         self.version = version
         self.entities = get_entities_in_module(module)
+        if warm_corpus:
+            get_corpus_cache().warm(module)
 
-    def generate_all(self):
-        for entity in self.entities:
-            print(f"\n[PROCESSING] 正在处理：{entity['name']} {entity['labels']}")
-            self.generate_for_entity(entity)
-            self._save_logs()
+    def generate_all(self, workers=None):
+        """
+        并发处理全部实体，workers 默认取 LLM_MAX_CONCURRENCY；每个实体完成即写入检查点，最终输出按实体顺序整理
+        """
+        workers = workers or int(setting("LLM_MAX_CONCURRENCY")) or 1
+        checkpoint = JsonlCheckpoint(self._output_path(".jsonl"), resume=self.resume)
+        pending = [entity for entity in self.entities if not checkpoint.done(self.task_key(entity))]
+        if len(pending) < len(self.entities):
+            print(f"[RESUME] 跳过 {len(self.entities) - len(pending)} 个已完成实体，剩余 {len(pending)} 个")
+        if self.batch_questions:
+            self.questions = self._batch_questions(pending, workers)
+        try:
+            run_as_completed(pending, self._run_task, workers,
+                        lambda entity, records, error: self._collect(checkpoint, entity, records, error))
+        finally:
+            checkpoint.close()
+        count = checkpoint.compact(self._output_path(".json"), [self.task_key(entity) for entity in self.entities])
+        print(f"[INFO] 模块 {self.module} 的训练数据已保存完成 ✅ 共 {count} 条")
+        get_corpus_cache().report()
+
+    def _batch_questions(self, entities: list[dict], workers: int) -> dict[str, list[str]]:
+        budget = int(setting("CORPUS_TOKEN_BUDGET"))
+        items = [
+            {
+                "key": self.task_key(entity),
+                "api_name": entity["name"],
+                "corpus": get_entity_corpus(entity["name"], self.module, budget=budget, context=entity_context(entity)),
+            }
+            for entity in entities
+        ]
+        return generate_questions_batched(items, num=State.model_fields["num"].default,
+                                          token_budget=self.batch_token_budget, workers=workers)
+
+    @staticmethod
+    def task_key(entity: dict) -> str:
+        return entity.get("origin") or entity["name"]
+
+    def _run_task(self, entity: dict):
+        print(f"\n[PROCESSING] 正在处理：{entity['name']} {entity['labels']}")
+        return self.generate_for_entity(entity)
+
+    def _collect(self, checkpoint: JsonlCheckpoint, entity: dict, records, error):
+        if error is not None:
+            print(f"[ERROR] 处理 {entity['name']} 时出错: {error}\n{format_error(error)}")
+            records = [{"module": self.module, "entity": entity["name"], "error": str(error)}]
+        checkpoint.append(self.task_key(entity), records, failed=error is not None)
 
     def generate_for_entity(self, entity: dict):
         init_state = {
             "messages": [],
             "entity": entity,
             "question": "",
-            "question_list": [],
+            "question_list": self.questions.get(self.task_key(entity), []),
             "student_code": "",
             "current_question_index": 0,
             "student_attempt": 0,
@@ -63,22 +114,20 @@ class ArkTSDataGenerator:
         state = State(**init_state)
         final_state = self.graph.invoke(state, config={"recursion_limit": 100})
 
-        for idx, question in enumerate(final_state.get("question_list", [])):
-            self.logs.append({
+        return [
+            {
                 "module": self.module,
                 "entity": entity["name"],
                 "labels": entity["labels"],
                 "question": question,
                 "student_code": final_state['final_code'][idx],
-            })
+            }
+            for idx, question in enumerate(final_state.get("question_list", []))
+        ]
 
-    def _save_logs(self):
+    def _output_path(self, suffix: str) -> str:
         safe_name = re.sub(r'[^\w\-]', '_', self.module.replace("@kit.", ""))
-        output_path = f"/root/research/training_data/training_data_{self.module}_{safe_name}_{self.version}.json"
-        os.makedirs(os.path.dirname(output_path), exist_ok=True)
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(self.logs, f, indent=2, ensure_ascii=False)
-        print(f"[INFO] 模块 {self.module} 的训练数据已保存完成 ✅")
+        return f"/root/research/training_data/training_data_{self.module}_{safe_name}_{self.version}{suffix}"
 
 
 if __name__ == "__main__":
@@ -1,10 +1,9 @@
 import os
 import re
-import json
-from config import driver
+from config import get_graph_store, get_cached_llm, get_corpus_cache, setting
+from corpus_budget import budgeted_corpus, relevance_key, log_prompt_tokens
 from pydantic import BaseModel
 from typing import TypedDict
-from config import llm
 from typing import Annotated, Optional
 from langchain_core.exceptions import OutputParserException
 from langgraph.graph.message import add_messages
@@ -51,7 +50,7 @@ class ReflectThought(TypedDict):
 
 def message_to_state(prompt: str):
     messages = [HumanMessage(content=prompt)]
-    structured_llm = llm.with_structured_output(Code)
+    structured_llm = get_cached_llm(Code)
 
     try:
         response = structured_llm.invoke(messages)
@@ -67,7 +66,7 @@ def message_to_state(prompt: str):
 
 def message_to_state_reflect(prompt: str):
     messages = [HumanMessage(content=prompt)]
-    structured_llm = llm.with_structured_output(ReflectThought)
+    structured_llm = get_cached_llm(ReflectThought)
     response = structured_llm.invoke(messages)
     messages.append(HumanMessage(content=response['code']))
     return messages, response
@@ -83,7 +82,8 @@ def generate_comprehensive_question(state: State) -> State:
     state.import_entity, state.use_entity = extract_ns_and_usage(entity.get("origin", ""), entity_name)
     if state.import_entity != state.use_entity:
         state.type_statement = f"Add the following code after the import statement: `type {entity_name} = {state.use_entity};`"
-    corpus = get_entity_corpus(entity_name, entity_parent, "summary")
+    corpus = get_entity_corpus(entity_name, entity_parent, budget=int(setting("CORPUS_TOKEN_BUDGET")),
+                               context=entity_context(entity))
     state.corpus = corpus
     prompt = question_prompt.format(
         framework=state.framework,
@@ -96,7 +96,8 @@ def generate_comprehensive_question(state: State) -> State:
 
     if not state.question_list:
         messages.append(HumanMessage(content=prompt))
-        structured_llm = llm.with_structured_output(QuestionList)
+        log_prompt_tokens("问题", prompt, corpus)
+        structured_llm = get_cached_llm(QuestionList)
         response = structured_llm.invoke(messages)
         questions = response.get("problem", [])
         if not questions:
@@ -123,16 +124,23 @@ def generate_comprehensive_question(state: State) -> State:
 
 def generate_student_code(state: State) -> State:
     state.question = state.question_list[state.current_question_index]
-    prompt = student_code_prompt.format(
+    entity = state.entity
+    entity_name = entity.get("name", "")
+    # 代码提示词里的语料按当前问题挑选相关成员
+    state.corpus = get_entity_corpus(entity_name, state.module, question=state.question,
+                                     budget=int(setting("CORPUS_TOKEN_BUDGET")))
+    prompt = code_prompt.format(
         framework=state.framework,
         question=state.question,
-        API_name=entity_name_str,
+        API_name=entity_name,
+        function=get_api_details(entity_name, state.module, extract_api_names(state.question)),
         module=state.module,
-        meta_data=entity_desc_str,
+        meta_data=entity.get("description", ""),
         corpus=state.corpus,
         name=state.import_entity,
         type_statement=state.type_statement,
     )
+    log_prompt_tokens("代码", prompt, state.corpus)
     messages, response = message_to_state(prompt)
     state.messages = messages
     state.student_code = response['code']
@@ -161,36 +169,12 @@ def get_child_nodes_by_type(type_: str, name: str, module: str = "@kit.ArkTS"):
     if not rel_types:
         raise ValueError(f"不支持的类型: {type_}")
 
-    query = f"""
-    MATCH (parent {{名称: $name}})-[:BELONGS_TO]->(m:Module {{名称: $module}})
-    MATCH (parent)-[r]->(e)
-    WHERE type(r) IN {json.dumps(rel_types)}
-    RETURN e.名称 AS name, e.注释信息 AS comment, e.唯一键 AS origin, e.功能描述 AS description, labels(e) AS labels
-    ORDER BY name
-    """
-
-    with driver.session() as session:
-        results = session.run(query, module=module, name=name)
-        return [dict(record) for record in results]
+    records = get_graph_store().children(name, rel_types, module + ".")
+    return [{key: record[key] for key in ("name", "comment", "origin", "description", "labels")} for record in records]
 
 
 def get_entities_in_module(module: str = "@kit.ArkTS"):
-    prefix = module + "."
-    query = """
-    MATCH (e)
-    WHERE ANY(l IN labels(e) WHERE l IN ['Class','Interface','Enum','Namespace'])
-      AND e.`唯一键` IS NOT NULL
-      AND e.`唯一键` STARTS WITH $prefix
-    RETURN e.名称 AS name,
-           labels(e) AS labels,
-           e.注释信息 AS comment,
-           e.`唯一键` AS origin,
-           e.功能描述 AS description
-    ORDER BY name
-    """
-    with driver.session() as session:
-        results = session.run(query, prefix=prefix)
-        return [dict(record) for record in results]
+    return get_graph_store().entities_in_module(module)
 
 
 def extract_doc_comments(comment: str) -> str:
@@ -213,96 +197,96 @@ def extract_api_names(question: str) -> list[str]:
 
 
 def get_api_details(entity_name: str, module: str, api_names: list[str]) -> str:
-    query = """
-    MATCH (parent {名称: $entity_name})-[:HAS_METHOD|HAS_PROPERTY]->(child)
-    WHERE child.名称 IN $api_names AND parent.唯一键 STARTS WITH $module
-    RETURN child.名称 AS name, labels(child) AS labels, child.注释信息 AS comment
-    ORDER BY name
+    lines = []
+    for record in get_graph_store().children(entity_name, ("HAS_METHOD", "HAS_PROPERTY"), module):
+        name = record.get("name")
+        if name not in api_names:
+            continue
+        labels = record.get("labels") or []
+        comment = record.get("comment") or ""
+        label_str = labels[0] if labels else "Unknown"
+        comment_str = extract_doc_comments(comment)
+        lines.append(f"({label_str}) {name}: \n{comment_str}")
+    return "\n".join(lines) if lines else "No details found."
+
+
+def get_entity_corpus(entity_name: str, module: str, mode: str | None = None, question: str = "",
+                      budget: int = 0, context: str = "") -> str:
     """
-
-    with driver.session() as session:
-        results = session.run(query, entity_name=entity_name, module=module, api_names=api_names)
-        lines = []
-        for record in results:
-            name = record.get("name")
-            labels = record.get("labels") or []
-            comment = record.get("comment") or ""
-            label_str = labels[0] if labels else "Unknown"
-            comment_str = extract_doc_comments(comment)
-            lines.append(f"({label_str}) {name}: \n{comment_str}")
-        return "\n".join(lines) if lines else "No details found."
-
-
-def get_entity_corpus(entity_name: str, module: str, mode: str = "summary") -> str:
-    query = """
-    MATCH (parent {名称: $entity_name})
-    WHERE parent.唯一键 STARTS WITH $module
-    MATCH (parent)-[:HAS_METHOD|HAS_PROPERTY|HAS_TYPE_ALIAS|HAS_ENUM]->(child)
-    WHERE child.名称 <> $entity_name
-    RETURN 
-        child.名称 AS name,
-        child.唯一键 AS origin,
-        parent.唯一键 AS parent_origin,
-        labels(child) AS labels,
-        child.注释信息 AS comment
-    ORDER BY name
+    mode 默认取 CORPUS_MODE。budget > 0 时语料超出 budget 个 token 会按成员与 question 的相关度裁掉成员，
+    出题阶段还没有问题时改按与实体自身注释/描述 context 的相关度裁剪；裁剪结果按相关成员缓存
     """
-
-    with driver.session() as session:
-        results = session.run(query, entity_name=entity_name, module=module)
-        grouped = {}
-        import_tip = None
-
-        for record in results:
-            name = record.get("name") or "unknown"
-            parent_origin = record.get("parent_origin") or ""
-            labels = record.get("labels") or []
-            comment = record.get("comment") or ""
-
-            if parent_origin and "::" in parent_origin and import_tip is None:
-                try:
-                    parts = parent_origin.split("::")
-                    module_part = parts[0]
-                    class_part = parts[1] if len(parts) > 1 else ""
-                    if module_part and class_part:
-                        import_tip = f"Please import before use: `import {{{class_part}}} from '{module_part}'`"
-                except Exception as e:
-                    print(f"[ERROR] Failed to parse import info: {e}")
-                    import_tip = None
-
-            label_str = labels[0] if labels else "Unknown"
-
-            if label_str not in grouped:
-                grouped[label_str] = []
-            grouped[label_str].append({
-                "name": name,
-                "comment": extract_doc_comments(comment)
-            })
-
-        if not grouped:
-            return f"No members found under structure `{entity_name}`."
-
-        lines = []
-        for label, items in grouped.items():
-            if mode == "summary":
-                names = ", ".join(i["name"] for i in items)
-                lines.append(f"[{label}]: {names}")
-            elif mode == "full":
-                for i in items:
-                    comment_str = f": {i['comment']}" if i["comment"] else ""
-                    lines.append(f"[{label}]: {i['name']}{comment_str}")
-            elif mode == "hybrid":
-                names = ", ".join(i["name"] for i in items)
-                lines.append(f"[{label}]: {names}")
-                for i in items[:5]:
-                    comment_str = f": {i['comment']}" if i["comment"] else ""
-                    lines.append(f"    - {i['name']}{comment_str}")
-
-        corpus = "The API member corpus is as follows:\n" + "\n".join(lines)
-        if import_tip:
-            corpus = f"{import_tip}\n\n" + corpus
-
-        return corpus
+    mode = mode or setting("CORPUS_MODE")
+    cache = get_corpus_cache()
+    build = lambda records: build_entity_corpus(entity_name, records, mode)
+    if not budget:
+        return cache.corpus(entity_name, module, mode, build)
+    text = question or context
+    records = [r for r in cache.members(entity_name, module) if r.get("name") != entity_name]
+    return cache.corpus(entity_name, module, mode, lambda _: budgeted_corpus(records, text, budget, build),
+                        variant=(budget, relevance_key(records, text)))
+
+
+def entity_context(entity: dict) -> str:
+    return f"{entity.get('comment') or ''}\n{entity.get('description') or ''}"
+
+
+def build_entity_corpus(entity_name: str, records: list[dict], mode: str = "summary") -> str:
+    grouped = {}
+    import_tip = None
+
+    for record in records:
+        if record.get("name") == entity_name:
+            continue
+        name = record.get("name") or "unknown"
+        parent_origin = record.get("parent_origin") or ""
+        labels = record.get("labels") or []
+        comment = record.get("comment") or ""
+
+        if parent_origin and "::" in parent_origin and import_tip is None:
+            try:
+                parts = parent_origin.split("::")
+                module_part = parts[0]
+                class_part = parts[1] if len(parts) > 1 else ""
+                if module_part and class_part:
+                    import_tip = f"Please import before use: `import {{{class_part}}} from '{module_part}'`"
+            except Exception as e:
+                print(f"[ERROR] Failed to parse import info: {e}")
+                import_tip = None
+
+        label_str = labels[0] if labels else "Unknown"
+
+        if label_str not in grouped:
+            grouped[label_str] = []
+        grouped[label_str].append({
+            "name": name,
+            "comment": extract_doc_comments(comment)
+        })
+
+    if not grouped:
+        return f"No members found under structure `{entity_name}`."
+
+    lines = []
+    for label, items in grouped.items():
+        if mode == "summary":
+            names = ", ".join(i["name"] for i in items)
+            lines.append(f"[{label}]: {names}")
+        elif mode == "full":
+            for i in items:
+                comment_str = f": {i['comment']}" if i["comment"] else ""
+                lines.append(f"[{label}]: {i['name']}{comment_str}")
+        elif mode == "hybrid":
+            names = ", ".join(i["name"] for i in items)
+            lines.append(f"[{label}]: {names}")
+            for i in items[:5]:
+                comment_str = f": {i['comment']}" if i["comment"] else ""
+                lines.append(f"    - {i['name']}{comment_str}")
+
+    corpus = "The API member corpus is as follows:\n" + "\n".join(lines)
+    if import_tip:
+        corpus = f"{import_tip}\n\n" + corpus
+
+    return corpus
 
 
 def save_student_code(module: str, student_code: str, name: str, idx: int = 0):
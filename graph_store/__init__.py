@@ -0,0 +1,22 @@
+from graph_store.base import (
+    GraphStore,
+    ENTITY_LABELS,
+    STRUCTURE_RELATIONS,
+    MEMBER_RELATIONS,
+    node_key,
+    split_node_key,
+)
+from graph_store.neo4j_store import Neo4jGraphStore, API_NODE_LABEL
+from graph_store.memory_store import MemoryGraphStore
+
+__all__ = [
+    "GraphStore",
+    "Neo4jGraphStore",
+    "MemoryGraphStore",
+    "API_NODE_LABEL",
+    "ENTITY_LABELS",
+    "STRUCTURE_RELATIONS",
+    "MEMBER_RELATIONS",
+    "node_key",
+    "split_node_key",
+]
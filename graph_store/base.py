@@ -0,0 +1,73 @@
+from abc import ABC, abstractmethod
+
+ENTITY_LABELS = ("Class", "Interface", "Enum", "Namespace")
+
+STRUCTURE_RELATIONS = ("HAS_METHOD", "HAS_PROPERTY", "HAS_TYPE_ALIAS", "HAS_INTERFACE", "HAS_CLASS", "HAS_ENUM")
+
+MEMBER_RELATIONS = ("HAS_METHOD", "HAS_PROPERTY", "HAS_TYPE_ALIAS", "HAS_ENUM")
+
+
+def node_key(label: str, uid: str) -> str:
+    # 唯一键在不同标签间可能重复（如同名的 Class 与 Interface），节点由 `标签:唯一键` 确定
+    return f"{label}:{uid}"
+
+
+def split_node_key(key: str) -> tuple[str, str]:
+    label, uid = key.split(":", 1)
+    return label, uid
+
+
+class GraphStore(ABC):
+    """
+    项目实际用到的几类图查询。返回的节点记录统一包含
+    name / labels / comment / origin / description 字段，labels 不含公共标签 ApiNode
+    """
+
+    @abstractmethod
+    def module_names(self) -> list[str]:
+        """全部模块名，按名称排序"""
+
+    @abstractmethod
+    def children(self, parent_name: str, rel_types, module_prefix: str | None = None) -> list[dict]:
+        """
+        名称为 parent_name 的所有节点经 rel_types 指向的子节点，按子节点名称排序；
+        给定 module_prefix 时只看唯一键以其开头的上级。记录额外带 parent_origin
+        """
+
+    @abstractmethod
+    def children_in_module(self, module_prefix: str, rel_types) -> dict[str, list[dict]]:
+        """
+        一次取出唯一键以 module_prefix 开头的全部上级经 rel_types 指向的子节点，
+        按上级名称分组，每组与 children(名称, rel_types, module_prefix) 的结果相同
+        """
+
+    @abstractmethod
+    def entities_in_module(self, module: str, labels=ENTITY_LABELS) -> list[dict]:
+        """唯一键以 `module.` 开头且带有 labels 之一的节点，按名称排序"""
+
+    @abstractmethod
+    def structure_corpora(self, module: str, rel_types=STRUCTURE_RELATIONS) -> list[dict]:
+        """
+        模块下至少有一个 rel_types 子节点的结构，一次性连同子节点返回，按唯一键、标签排序。
+        记录包含 name / label / origin / info_score / children，children 为按名称排序的 {name, labels}
+        """
+
+    @abstractmethod
+    def scored_nodes_in_module(self, module: str) -> list[dict]:
+        """直接属于模块且已有 info_score 的节点，记录额外带 id 与 score，按名称排序"""
+
+    @abstractmethod
+    def set_info_scores(self, scores: dict[str, float]):
+        """批量写入 {node_key(标签, 唯一键): info_score}"""
+
+    def flush(self):
+        """把缓冲的写入持久化，默认无需处理"""
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
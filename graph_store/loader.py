@@ -0,0 +1,190 @@
+import os
+import json
+
+RESERVED_FILES = {"manifest.json", "info_scores.json"}
+
+def build_unique_key(node, nodes_map, cache, first_by_name):
+    if node is None:
+        return None
+    uid = node.get("唯一键")
+    if uid in cache:
+        return cache[uid]
+
+    parent_name = node.get("上级")
+    name = node.get("名称")
+    if not parent_name:
+        cache[uid] = name
+        return name
+
+    parent_node = nodes_map.get(parent_name)
+    if not parent_node:
+        parent_node = first_by_name.get(parent_name)
+
+    parent_uid = build_unique_key(parent_node, nodes_map, cache, first_by_name) if parent_node else parent_name
+    full_uid = f"{parent_uid}.{name}" if parent_uid else name
+    cache[uid] = full_uid
+    return full_uid
+
+def preprocess_nodes_unique_keys(nodes):
+    for node in nodes:
+        name = node.get("名称")
+        parent = node.get("上级")
+        if not parent:
+            node["唯一键"] = name
+        else:
+            node["唯一键"] = f"{parent}.{name}"
+
+    nodes_map = {node["唯一键"]: node for node in nodes}
+    first_by_name = {}
+    for node in nodes_map.values():
+        first_by_name.setdefault(node.get("名称"), node)
+    cache = {}
+
+    for node in nodes:
+        new_uid = build_unique_key(node, nodes_map, cache, first_by_name)
+        node["唯一键"] = new_uid
+
+    uids_by_name = {}
+    for node in nodes:
+        uids_by_name.setdefault(node.get("名称"), []).append(node["唯一键"])
+
+    for node in nodes:
+        parent = node.get("上级")
+        if not parent:
+            continue
+        candidates = uids_by_name.get(parent, [])
+        if len(candidates) == 1:
+            node["上级"] = candidates[0]
+        elif len(candidates) > 1:
+            exacts = [c for c in candidates if c.split('.')[-1] == parent]
+            if exacts:
+                node["上级"] = exacts[0]
+            else:
+                print(f"[WARN] 多重匹配无精确匹配，保留原上级: {parent}")
+        else:
+            print(f"[WARN] 未找到上级唯一键，保留原上级: {parent}")
+
+    return nodes
+
+LABEL_MAP = {
+    "interface": "Interface",
+    "property": "Property",
+    "call_signature": "CallSignature",
+    "method": "Method",
+    "type_alias": "TypeAlias",
+    "enum": "Enum",
+    "enum_member": "EnumMember",
+    "namespace": "Namespace",
+    "class": "Class",
+    "struct": "Struct",
+    "export_import": "ExportImport",
+    "module": "Module"
+}
+
+HIGH_LEVEL_LABELS = {"Namespace", "Class", "Interface", "Enum", "Struct"}
+
+def node_label(type_):
+    return LABEL_MAP.get(type_.lower(), type_.capitalize())
+
+def load_graph_rows(json_path):
+    """
+    读取单个 API JSON，返回按标签分组的节点行与按 (关系类型, 起点标签, 终点标签) 分组的关系行
+    """
+    with open(json_path, 'r', encoding='utf-8') as f:
+        try:
+            data = json.load(f)
+            if not isinstance(data, dict):
+                print(f"[WARNING] 文件 {json_path} 内容为空或不是合法字典，已跳过")
+                return None
+        except json.JSONDecodeError:
+            print(f"[WARNING] 文件 {json_path} 不是合法 JSON，已跳过")
+            return None
+
+    nodes = data.get("节点", [])
+    nodes = preprocess_nodes_unique_keys(nodes)
+    nodes_by_uid = {}
+    for node in nodes:
+        nodes_by_uid.setdefault(node["唯一键"], node)
+
+    node_rows = {}
+    relation_rows = {}
+
+    for node in nodes:
+        type_ = node.get("类型", "结构体")
+        if type_ == "call_signature":
+            name = node.get("签名", "未知签名")
+        else:
+            name = node.get("名称")
+
+        module = node.get("所属模块")
+        parent = node.get("上级")
+        label = node_label(type_)
+        unique_id = node.get("唯一键")
+
+        if name:
+            props = {
+                "名称": name,
+                "功能描述": node.get("功能描述", ""),
+                "注释信息": "\n".join(node.get("注释信息", []))
+            }
+            if "装饰器" in node:
+                props["装饰器"] = "\n".join(node["装饰器"])
+            node_rows.setdefault(label, []).append({"唯一键": unique_id, "props": props})
+
+        if parent and (not module or module == "未知模块"):
+            parent_node = nodes_by_uid.get(parent)
+            if parent_node:
+                parent_label = node_label(parent_node.get("类型", ""))
+                if parent_label in HIGH_LEVEL_LABELS:
+                    key = (f"HAS_{type_.upper()}", parent_label, label)
+                    relation_rows.setdefault(key, []).append({"from_uid": parent, "to_uid": unique_id})
+
+        if module and module != "未知模块":
+            node_rows.setdefault("Module", []).append({"唯一键": module, "props": {"名称": module}})
+            key = ("BELONGS_TO", label, "Module")
+            relation_rows.setdefault(key, []).append({"from_uid": unique_id, "to_uid": module})
+
+    return node_rows, relation_rows
+
+def merge_rows(target, rows):
+    for key, items in rows.items():
+        target.setdefault(key, []).extend(items)
+
+def collect_graph(api_folder_path: str):
+    """
+    把整个 API JSON 目录折叠成与 Neo4j 导入结果一致的图：节点按 (标签, 唯一键) 去重并合并属性，
+    关系按 MERGE 语义去重，并丢弃端点不存在的关系
+    """
+    json_files = []
+    for root, _, files in os.walk(api_folder_path):
+        for file in files:
+            if file.endswith(".json") and file not in RESERVED_FILES:
+                json_files.append(os.path.join(root, file))
+    json_files.sort()
+
+    node_rows = {}
+    relation_rows = {}
+    for file_path in json_files:
+        rows = load_graph_rows(file_path)
+        if rows is not None:
+            merge_rows(node_rows, rows[0])
+            merge_rows(relation_rows, rows[1])
+
+    nodes = {}
+    for label, rows in node_rows.items():
+        merged = nodes.setdefault(label, {})
+        for row in rows:
+            merged.setdefault(row["唯一键"], {}).update(row["props"])
+
+    relations = {}
+    for (rel_type, from_label, to_label), rows in relation_rows.items():
+        pairs = dict.fromkeys(
+            (row["from_uid"], row["to_uid"]) for row in rows
+            if row["from_uid"] in nodes.get(from_label, {}) and row["to_uid"] in nodes.get(to_label, {})
+        )
+        if pairs:
+            relations[(rel_type, from_label, to_label)] = list(pairs)
+
+    print(f"[INFO] 共 {sum(len(n) for n in nodes.values())} 个节点，"
+          f"{sum(len(r) for r in relations.values())} 条关系")
+    return nodes, relations
@@ -0,0 +1,178 @@
+import os
+import json
+from pathlib import Path
+from graph_store.base import GraphStore, ENTITY_LABELS, STRUCTURE_RELATIONS
+from graph_store.loader import collect_graph
+
+SCORES_NAME = "info_scores.json"
+
+
+class MemoryGraphStore(GraphStore):
+    """
+    直接由提取出的 API JSON 构建的内存图：节点按 `标签:唯一键` 编号，
+    并按名称、上级与所属模块建立索引。info_score 的每次写入追加到 info_scores.jsonl，
+    加载或 close() 时合并进同目录下的 info_scores.json
+    """
+
+    def __init__(self, nodes: dict, relations: dict, score_path=None):
+        self.nodes = {}
+        self.ids_by_name = {}
+        self.ids_by_uid = {}
+        self.children_by_id = {}
+        self.members_by_module = {}
+        self.score_path = Path(score_path) if score_path else None
+        self.delta_path = self.score_path.with_suffix(".jsonl") if self.score_path else None
+        self.pending_deltas = False
+
+        for label, items in nodes.items():
+            for uid, props in items.items():
+                node_id = f"{label}:{uid}"
+                self.nodes[node_id] = {**props, "id": node_id, "label": label, "唯一键": uid}
+                self.ids_by_name.setdefault(props.get("名称"), []).append(node_id)
+                self.ids_by_uid.setdefault(uid, []).append(node_id)
+
+        for (rel_type, from_label, to_label), pairs in relations.items():
+            for from_uid, to_uid in pairs:
+                from_id = f"{from_label}:{from_uid}"
+                if rel_type == "BELONGS_TO":
+                    self.members_by_module.setdefault(to_uid, []).append(from_id)
+                else:
+                    self.children_by_id.setdefault(from_id, []).append((rel_type, f"{to_label}:{to_uid}"))
+
+        if self.score_path:
+            self.load_scores()
+
+    @classmethod
+    def from_json_folder(cls, api_folder_path: str, score_path=None):
+        graph = collect_graph(api_folder_path)
+        return cls(*graph, score_path=score_path or os.path.join(api_folder_path, SCORES_NAME))
+
+    @staticmethod
+    def _record(node: dict) -> dict:
+        return {
+            "name": node.get("名称"),
+            "labels": [node["label"]],
+            "comment": node.get("注释信息"),
+            "origin": node["唯一键"],
+            "description": node.get("功能描述"),
+        }
+
+    def module_names(self) -> list[str]:
+        return sorted(node["名称"] for node in self.nodes.values() if node["label"] == "Module")
+
+    def children(self, parent_name: str, rel_types, module_prefix: str | None = None) -> list[dict]:
+        rel_types = set(rel_types)
+        records = []
+        for parent_id in self.ids_by_name.get(parent_name, []):
+            parent = self.nodes[parent_id]
+            if module_prefix is not None and not parent["唯一键"].startswith(module_prefix):
+                continue
+            for rel_type, child_id in self.children_by_id.get(parent_id, []):
+                if rel_type in rel_types:
+                    records.append({**self._record(self.nodes[child_id]), "parent_origin": parent["唯一键"]})
+        records.sort(key=lambda r: r["name"] or "")
+        return records
+
+    def children_in_module(self, module_prefix: str, rel_types) -> dict[str, list[dict]]:
+        names = dict.fromkeys(
+            self.nodes[parent_id].get("名称") for parent_id in self.children_by_id
+            if self.nodes[parent_id]["唯一键"].startswith(module_prefix)
+        )
+        grouped = {name: self.children(name, rel_types, module_prefix) for name in names}
+        return {name: records for name, records in grouped.items() if records}
+
+    def entities_in_module(self, module: str, labels=ENTITY_LABELS) -> list[dict]:
+        prefix = module + "."
+        records = [
+            self._record(node) for node in self.nodes.values()
+            if node["label"] in labels and node["唯一键"].startswith(prefix)
+        ]
+        records.sort(key=lambda r: r["name"] or "")
+        return records
+
+    def structure_corpora(self, module: str, rel_types=STRUCTURE_RELATIONS) -> list[dict]:
+        rel_types = set(rel_types)
+        structures = []
+        for node_id in dict.fromkeys([f"Module:{module}", *self.members_by_module.get(module, [])]):
+            if node_id not in self.nodes:
+                continue
+            children = [
+                {"name": self.nodes[child_id].get("名称"), "labels": [self.nodes[child_id]["label"]]}
+                for rel_type, child_id in self.children_by_id.get(node_id, []) if rel_type in rel_types
+            ]
+            if children:
+                parent = self.nodes[node_id]
+                children.sort(key=lambda c: c["name"] or "")
+                structures.append({
+                    "name": parent.get("名称"),
+                    "label": parent["label"],
+                    "origin": parent["唯一键"],
+                    "info_score": parent.get("info_score"),
+                    "children": children,
+                })
+        structures.sort(key=lambda s: (s["origin"], s["label"]))
+        return structures
+
+    def scored_nodes_in_module(self, module: str) -> list[dict]:
+        records = [
+            {"id": node["id"], **self._record(node), "score": node["info_score"]}
+            for node in (self.nodes[node_id] for node_id in self.members_by_module.get(module, []))
+            if node.get("info_score") is not None
+        ]
+        records.sort(key=lambda r: r["name"] or "")
+        return records
+
+    def set_info_scores(self, scores: dict[str, float]):
+        updates = {}
+        for node_id, score in scores.items():
+            # 节点编号即 node_key(标签, 唯一键)
+            if node_id in self.nodes:
+                self.nodes[node_id]["info_score"] = score
+                updates[node_id] = score
+        if self.delta_path and updates:
+            # 只追加本批分数，避免每批都重写整个分数文件
+            with self.delta_path.open('a', encoding='utf-8') as f:
+                f.write(json.dumps(updates, ensure_ascii=False) + "\n")
+            self.pending_deltas = True
+
+    def load_scores(self):
+        scores = {}
+        if self.score_path.exists():
+            with self.score_path.open('r', encoding='utf-8') as f:
+                scores.update(json.load(f))
+        if self.delta_path.exists():
+            with self.delta_path.open('r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        scores.update(json.loads(line))
+                    except json.JSONDecodeError:
+                        # 崩溃时最后一行可能只写了一半
+                        continue
+            self.pending_deltas = True
+        for node_id, score in scores.items():
+            if node_id in self.nodes:
+                self.nodes[node_id]["info_score"] = score
+        self.flush()
+
+    def flush(self):
+        """
+        把追加的分数合并进 info_scores.json 并删除增量文件
+        """
+        if not self.pending_deltas:
+            return
+        self.save_scores()
+        self.delta_path.unlink(missing_ok=True)
+        self.pending_deltas = False
+
+    def close(self):
+        if self.score_path:
+            self.flush()
+
+    def save_scores(self):
+        if not self.score_path:
+            return
+        scores = {node_id: node["info_score"] for node_id, node in self.nodes.items() if "info_score" in node}
+        tmp_path = self.score_path.with_suffix(".tmp")
+        with tmp_path.open('w', encoding='utf-8') as f:
+            json.dump(scores, f, ensure_ascii=False, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.score_path)
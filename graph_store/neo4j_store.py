@@ -0,0 +1,126 @@
+from graph_store.base import GraphStore, ENTITY_LABELS, STRUCTURE_RELATIONS, split_node_key
+
+API_NODE_LABEL = "ApiNode"
+
+
+def node_fields(var: str) -> str:
+    return (f"{var}.名称 AS name, [l IN labels({var}) WHERE l <> '{API_NODE_LABEL}'] AS labels, "
+            f"{var}.注释信息 AS comment, {var}.`唯一键` AS origin, {var}.功能描述 AS description")
+
+
+def rel_pattern(rel_types) -> str:
+    return "|".join(rel_types)
+
+
+MODULE_NAMES_QUERY = """
+    MATCH (m:Module)
+    RETURN m.名称 AS name
+    ORDER BY name
+"""
+
+ENTITIES_IN_MODULE_QUERY = f"""
+    MATCH (e:{API_NODE_LABEL})
+    WHERE e.`唯一键` STARTS WITH $prefix
+      AND ANY(l IN labels(e) WHERE l IN $labels)
+    RETURN {node_fields("e")}
+    ORDER BY name
+"""
+
+SCORED_NODES_QUERY = f"""
+    MATCH (m:Module {{名称: $module_name}})<-[:BELONGS_TO]-(n)
+    WHERE n.info_score IS NOT NULL
+    RETURN elementId(n) AS id, {node_fields("n")}, n.info_score AS score
+    ORDER BY name
+"""
+
+def set_info_scores_query(label: str) -> str:
+    # 按具体标签匹配，走 `标签_唯一键_unique` 约束的索引，同唯一键的其他标签节点不受影响
+    return f"""
+    UNWIND $rows AS row
+    MATCH (n:`{label}` {{唯一键: row.uid}})
+    SET n.info_score = row.score
+"""
+
+
+def children_query(rel_types) -> str:
+    return f"""
+    MATCH (parent:{API_NODE_LABEL} {{名称: $parent_name}})
+    WHERE $module_prefix IS NULL OR parent.唯一键 STARTS WITH $module_prefix
+    MATCH (parent)-[:{rel_pattern(rel_types)}]->(child)
+    RETURN {node_fields("child")}, parent.唯一键 AS parent_origin
+    ORDER BY name
+"""
+
+
+def children_in_module_query(rel_types) -> str:
+    return f"""
+    MATCH (parent:{API_NODE_LABEL})-[:{rel_pattern(rel_types)}]->(child)
+    WHERE parent.唯一键 STARTS WITH $module_prefix
+    RETURN parent.名称 AS parent_name, {node_fields("child")}, parent.唯一键 AS parent_origin
+    ORDER BY parent_name, name
+"""
+
+
+def structure_corpora_query(rel_types) -> str:
+    return f"""
+    MATCH (m:Module {{名称: $module_name}})<-[:BELONGS_TO*0..5]-(parent)
+    WHERE EXISTS {{
+        MATCH (parent)-[:{rel_pattern(rel_types)}]->()
+    }}
+    WITH DISTINCT parent
+    ORDER BY parent.唯一键, elementId(parent)
+    SKIP $skip LIMIT $limit
+    MATCH (parent)-[:{rel_pattern(rel_types)}]->(child)
+    WITH parent, collect({{name: child.名称, labels: [l IN labels(child) WHERE l <> '{API_NODE_LABEL}']}}) AS children
+    RETURN parent.名称 AS name, head([l IN labels(parent) WHERE l <> '{API_NODE_LABEL}']) AS label,
+           parent.唯一键 AS origin, parent.info_score AS info_score, children
+    ORDER BY origin, label
+"""
+
+
+class Neo4jGraphStore(GraphStore):
+    def __init__(self, driver, page_size: int = 500):
+        self.driver = driver
+        self.page_size = page_size
+
+    def _run(self, query: str, **params) -> list[dict]:
+        with self.driver.session() as session:
+            return [dict(record) for record in session.run(query, **params)]
+
+    def module_names(self) -> list[str]:
+        return [record["name"] for record in self._run(MODULE_NAMES_QUERY)]
+
+    def children(self, parent_name: str, rel_types, module_prefix: str | None = None) -> list[dict]:
+        return self._run(children_query(rel_types), parent_name=parent_name, module_prefix=module_prefix)
+
+    def children_in_module(self, module_prefix: str, rel_types) -> dict[str, list[dict]]:
+        grouped = {}
+        for record in self._run(children_in_module_query(rel_types), module_prefix=module_prefix):
+            grouped.setdefault(record.pop("parent_name"), []).append(record)
+        return grouped
+
+    def entities_in_module(self, module: str, labels=ENTITY_LABELS) -> list[dict]:
+        return self._run(ENTITIES_IN_MODULE_QUERY, prefix=module + ".", labels=list(labels))
+
+    def structure_corpora(self, module: str, rel_types=STRUCTURE_RELATIONS) -> list[dict]:
+        query = structure_corpora_query(rel_types)
+        structures = []
+        while True:
+            page = self._run(query, module_name=module, skip=len(structures), limit=self.page_size)
+            for record in page:
+                record["children"].sort(key=lambda c: c["name"] or "")
+            structures.extend(page)
+            if len(page) < self.page_size:
+                return structures
+
+    def scored_nodes_in_module(self, module: str) -> list[dict]:
+        return self._run(SCORED_NODES_QUERY, module_name=module)
+
+    def set_info_scores(self, scores: dict[str, float]):
+        rows_by_label = {}
+        for key, score in scores.items():
+            label, uid = split_node_key(key)
+            rows_by_label.setdefault(label, []).append({"uid": uid, "score": score})
+        with self.driver.session() as session:
+            for label, rows in rows_by_label.items():
+                session.run(set_info_scores_query(label), rows=rows).consume()
@@ -0,0 +1,180 @@
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from pathlib import Path
+from llm_limits import estimate_tokens, provider_name
+
+
+def serialize_prompt(prompt) -> list | str:
+    if isinstance(prompt, str):
+        return prompt
+    return [(getattr(m, "type", type(m).__name__), getattr(m, "content", str(m))) for m in prompt]
+
+
+def prompt_tokens(prompt) -> int:
+    serialized = serialize_prompt(prompt)
+    return estimate_tokens(serialized if isinstance(serialized, str) else "\n".join(str(c) for _, c in serialized))
+
+
+def response_tokens(value) -> int:
+    if value is None:
+        return 0
+    return estimate_tokens(value if isinstance(value, str) else json.dumps(value, ensure_ascii=False, default=str))
+
+
+def model_signature(llm) -> dict:
+    params = getattr(llm, "_identifying_params", None) or {}
+    model = getattr(llm, "model_name", None) or getattr(llm, "model", None) or type(llm).__name__
+    return {"model": model, "params": params}
+
+
+class LLMCache:
+    """
+    SQLite 持久化的 LLM 响应缓存。键为 (模型名, 调用参数, 输出结构, 提示词) 的 sha256，
+    条目超过 ttl 秒视为过期，总数超过 max_entries 时按最近访问时间淘汰
+    """
+
+    def __init__(self, path=":memory:", ttl: float | None = None, max_entries: int = 100_000):
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(str(path), check_same_thread=False)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                model TEXT,
+                value TEXT,
+                created REAL,
+                accessed REAL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS llm_cache_accessed ON llm_cache (accessed)")
+        if ttl:
+            self.conn.execute("DELETE FROM llm_cache WHERE created < ?", (time.time() - ttl,))
+        self.conn.commit()
+        self.size = self.conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+
+    @staticmethod
+    def make_key(llm, prompt, schema=None) -> str:
+        payload = {
+            **model_signature(llm),
+            "schema": getattr(schema, "__name__", None),
+            "prompt": serialize_prompt(prompt),
+        }
+        encoded = json.dumps(payload, ensure_ascii=False, sort_keys=True, default=str)
+        return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+    def get(self, key: str):
+        now = time.time()
+        with self.lock:
+            row = self.conn.execute("SELECT value, created FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row and self.ttl and row[1] < now - self.ttl:
+                self.conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self.conn.commit()
+                self.size -= 1
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self.conn.execute("UPDATE llm_cache SET accessed = ? WHERE key = ?", (now, key))
+            self.conn.commit()
+            self.hits += 1
+            return json.loads(row[0])
+
+    def put(self, key: str, value, model: str = ""):
+        now = time.time()
+        with self.lock:
+            exists = self.conn.execute("SELECT 1 FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            self.conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, model, value, created, accessed) VALUES (?, ?, ?, ?, ?)",
+                (key, model, json.dumps(value, ensure_ascii=False), now, now)
+            )
+            if not exists:
+                self.size += 1
+            if self.size > self.max_entries:
+                overflow = self.size - self.max_entries
+                self.conn.execute("""
+                    DELETE FROM llm_cache WHERE key IN (
+                        SELECT key FROM llm_cache ORDER BY accessed LIMIT ?
+                    )
+                """, (overflow,))
+                self.size -= overflow
+            self.conn.commit()
+
+    def report(self):
+        lookups = self.hits + self.misses
+        if not lookups:
+            return
+        print(f"[CACHE] LLM 缓存命中 {self.hits} 次，未命中 {self.misses} 次，"
+              f"命中率 {self.hits / lookups:.1%}，本次运行少调用 LLM {self.hits} 次")
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+class CachedLLM:
+    """
+    包装 LangChain 聊天模型：schema 非空时等价于 with_structured_output(schema)，
+    否则返回消息文本。invoke / ainvoke 先查缓存，未命中才真正调用模型，异常结果不缓存；
+    给定 limiter 时真正的调用受全局并发与服务商 TPM 限制
+    """
+
+    def __init__(self, llm, cache: LLMCache | None, schema=None, limiter=None):
+        self.llm = llm
+        self.cache = cache
+        self.schema = schema
+        self.limiter = limiter
+        self.runnable = llm.with_structured_output(schema) if schema is not None else llm
+        self.model = str(model_signature(llm)["model"])
+        self.provider = provider_name(llm)
+
+    def _unwrap(self, response):
+        return response if self.schema is not None else response.content
+
+    def _call(self, prompt):
+        if self.limiter is None:
+            return self._unwrap(self.runnable.invoke(prompt))
+        self.limiter.acquire(self.provider, prompt_tokens(prompt))
+        value = None
+        try:
+            value = self._unwrap(self.runnable.invoke(prompt))
+            return value
+        finally:
+            self.limiter.release(self.provider, response_tokens(value))
+
+    async def _acall(self, prompt):
+        if self.limiter is None:
+            return self._unwrap(await self.runnable.ainvoke(prompt))
+        await self.limiter.aacquire(self.provider, prompt_tokens(prompt))
+        value = self._unwrap(await self.runnable.ainvoke(prompt))
+        self.limiter.record(self.provider, response_tokens(value))
+        return value
+
+    def invoke(self, prompt):
+        if self.cache is None:
+            return self._call(prompt)
+        key = LLMCache.make_key(self.llm, prompt, self.schema)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        value = self._call(prompt)
+        self.cache.put(key, value, self.model)
+        return value
+
+    async def ainvoke(self, prompt):
+        if self.cache is None:
+            return await self._acall(prompt)
+        key = LLMCache.make_key(self.llm, prompt, self.schema)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        value = await self._acall(prompt)
+        self.cache.put(key, value, self.model)
+        return value
@@ -0,0 +1,106 @@
+import time
+import asyncio
+import threading
+from collections import deque
+from functools import lru_cache
+from urllib.parse import urlparse
+
+WINDOW = 60.0
+
+
+def estimate_tokens(text: str) -> int:
+    # 没有本地分词器时的粗略估计：约 4 个字符折合 1 个 token
+    return len(text) // 4 + 1
+
+
+@lru_cache(maxsize=None)
+def local_tokenizer():
+    try:
+        import tiktoken
+
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        print(f"[WARN] 本地分词器不可用，按字符数估算 token: {e}")
+        return None
+
+
+def count_tokens(text: str) -> int:
+    """
+    用本地 tiktoken 分词器计数，未安装或词表加载失败时退回 estimate_tokens
+    """
+    encoding = local_tokenizer()
+    if encoding is None:
+        return estimate_tokens(text)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def provider_name(llm) -> str:
+    """
+    服务商标识：OpenAI 兼容接口取 base_url 的主机名，其他客户端取类名
+    """
+    base_url = getattr(llm, "openai_api_base", None) or getattr(llm, "base_url", None)
+    if base_url:
+        return urlparse(str(base_url)).netloc or str(base_url)
+    return type(llm).__name__
+
+
+class LLMLimiter:
+    """
+    全局 LLM 限流：max_concurrency 限制同时进行的调用数，tpm_limits 按服务商限制每分钟 token 数
+    （最近 60 秒滑动窗口，调用前按提示词预估预留，返回后补记输出 token）。未配置的服务商不限 TPM
+    """
+
+    def __init__(self, max_concurrency: int = 8, tpm_limits: dict[str, int] | None = None):
+        self.slots = threading.BoundedSemaphore(max_concurrency) if max_concurrency else None
+        self.tpm_limits = dict(tpm_limits or {})
+        self.windows = {}
+        self.lock = threading.Lock()
+        self.waited = 0.0
+
+    def _reserve(self, provider: str, tokens: int) -> float:
+        """
+        预留成功返回 0，否则返回还需等待的秒数。单次超过整个预算的调用在窗口清空后放行
+        """
+        limit = self.tpm_limits.get(provider)
+        if not limit:
+            return 0.0
+        now = time.monotonic()
+        with self.lock:
+            window = self.windows.setdefault(provider, deque())
+            while window and window[0][0] <= now - WINDOW:
+                window.popleft()
+            used = sum(count for _, count in window)
+            if used + tokens <= limit or not window:
+                window.append((now, tokens))
+                return 0.0
+            # 等到足够多的旧记录滑出窗口
+            freed = 0
+            for stamp, count in window:
+                freed += count
+                if used - freed + tokens <= limit:
+                    return stamp + WINDOW - now
+            return window[-1][0] + WINDOW - now
+
+    def record(self, provider: str, tokens: int):
+        if not self.tpm_limits.get(provider) or tokens <= 0:
+            return
+        with self.lock:
+            self.windows.setdefault(provider, deque()).append((time.monotonic(), tokens))
+
+    def acquire(self, provider: str, tokens: int):
+        if self.slots is not None:
+            self.slots.acquire()
+        while (delay := self._reserve(provider, tokens)) > 0:
+            self.waited += delay
+            time.sleep(delay)
+
+    def release(self, provider: str, completion_tokens: int = 0):
+        self.record(provider, completion_tokens)
+        if self.slots is not None:
+            self.slots.release()
+
+    async def aacquire(self, provider: str, tokens: int):
+        # 异步调用方（如 UE 打分）自带并发上限，这里只做 TPM 等待，不占用线程信号量
+        while (delay := self._reserve(provider, tokens)) > 0:
+            self.waited += delay
+            await asyncio.sleep(delay)
@@ -0,0 +1,120 @@
+from typing import TypedDict, Annotated
+from llm_limits import count_tokens
+from scheduler import run_as_completed
+from corpus_budget import log_prompt_tokens
+
+BATCH_QUESTION_PROMPT = """
+You are given the definitions of several {framework} APIs, including their methods, properties, and documentation.
+Each API is introduced by a section header with a key in backticks.
+
+{sections}
+
+Your task: For **each** section above, design **{num} simple programming exercises** based on that section's API.
+
+[Guidelines]:
+1. For each exercise, first **reason step by step** about how it can be solved using both the **sub-API methods/properties** and the **parent API methods/properties**.
+2. Each exercise must **explicitly specify the exact API methods/properties that must be used to solve the problem** (e.g., "use the `sort` and `remove` methods").
+3. Each exercise must combine **at least two different methods/properties**.
+4. Exercises for a section may only use the APIs of that section.
+5. If a section is marked **[Cross-API]**, every exercise for it must combine methods/properties of **all** the APIs listed in that section, e.g. "Write a function that uses an `ArrayList`’s `forEach` and a `buffer`’s `write` / `alloc` methods to write all elements to the `buffer`."
+6. Output only the **final problem statements**, not the reasoning process.
+
+[Output Format]:
+{{
+    "questions": {{
+        "section key 1": ["Problem statement with explicit API usage", ...],
+        "section key 2": ["Problem statement with explicit API usage", ...],
+        ...
+    }}
+}}
+"""
+
+
+class BatchQuestionList(TypedDict):
+    questions: Annotated[dict[str, list[str]], ..., "generated problems keyed by section key"]
+
+
+def format_question_section(key: str, api_name: str, corpus: str, apis: list[str] | None = None) -> str:
+    if apis and len(set(apis)) > 1:
+        # 多 API 组合（如 MCTS 路径）保留原多 API 出题提示词中“每题必须跨 API 组合”的要求
+        return (f"### Section `{key}` [Cross-API]\n[APIs]:\n{', '.join(apis)}\n"
+                f"Each exercise must use members of all of: {', '.join(f'`{api}`' for api in apis)}\n\n"
+                f"[API Members]:\n{corpus}")
+    return f"### Section `{key}`\n[API]:\n{api_name}\n\n[API Members]:\n{corpus}"
+
+
+def pack_question_batches(items: list[dict], framework: str, num: int, token_budget: int,
+                          max_items: int) -> list[list[dict]]:
+    """
+    按顺序把实体装进批次，每批提示词的 token 数不超过 token_budget；单个实体本身超预算时单独成批
+    """
+    overhead = count_tokens(BATCH_QUESTION_PROMPT.format(framework=framework, num=num, sections=""))
+    batches = []
+    current = []
+    used = overhead
+    for item in items:
+        cost = count_tokens(item["section"])
+        if current and (used + cost > token_budget or len(current) >= max_items):
+            batches.append(current)
+            current = []
+            used = overhead
+        current.append(item)
+        used += cost
+    if current:
+        batches.append(current)
+    return batches
+
+
+def validate_questions(questions, num: int, apis: list[str] | None = None) -> list[str] | None:
+    """
+    至少要有 num 个非空问题；多 API 组合时只保留提到其中至少两个 API 的问题
+    """
+    if not isinstance(questions, list):
+        return None
+    questions = [q.strip() for q in questions if isinstance(q, str) and q.strip()]
+    if apis and len(set(apis)) > 1:
+        questions = [q for q in questions if sum(api in q for api in set(apis)) >= 2]
+    if len(questions) < num:
+        return None
+    return questions[:num]
+
+
+def generate_questions_batched(items: list[dict], framework: str = "ArkTS", num: int = 3, token_budget: int = 4000,
+                               max_items: int = 8, workers: int = 4, llm=None) -> dict[str, list[str]]:
+    """
+    items 为 [{key, api_name, corpus}]，多 API 组合另带 apis 列表，把多个实体的语料打包进一次结构化请求，返回 {key: 问题列表}。
+    批量结果里缺失或数量不足的实体不出现在返回值中，由调用方按原流程单独生成
+    """
+    from config import get_cached_llm
+
+    batch_llm = get_cached_llm(BatchQuestionList, llm)
+    items = [
+        {**item, "section_key": f"api{i + 1}",
+         "section": format_question_section(f"api{i + 1}", item["api_name"], item["corpus"], item.get("apis"))}
+        for i, item in enumerate(items)
+    ]
+    batches = pack_question_batches(items, framework, num, token_budget, max_items)
+
+    def ask(batch: list[dict]) -> dict:
+        prompt = BATCH_QUESTION_PROMPT.format(
+            framework=framework, num=num, sections="\n\n".join(item["section"] for item in batch)
+        )
+        log_prompt_tokens(f"批量问题（{len(batch)} 个实体）", prompt, "\n\n".join(item["corpus"] for item in batch))
+        return batch_llm.invoke(prompt).get("questions", {})
+
+    results = {}
+
+    def collect(batch: list[dict], returned, error):
+        if error is not None:
+            print(f"[WARN] 批量生成问题失败，{len(batch)} 个实体将单独生成: {error}")
+            return
+        returned = returned if isinstance(returned, dict) else {}
+        for item in batch:
+            questions = validate_questions(returned.get(item["section_key"]), num, item.get("apis"))
+            if questions is not None:
+                results[item["key"]] = questions
+
+    run_as_completed(batches, ask, workers, collect)
+    print(f"[BATCH] 问题生成：{len(items)} 个实体打包为 {len(batches)} 次请求，"
+          f"{len(items) - len(results)} 个实体回退到单独请求")
+    return results
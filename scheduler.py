@@ -0,0 +1,26 @@
+import traceback
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+
+def run_as_completed(items: list, fn, max_workers: int, on_result):
+    """
+    用线程池并发执行 fn(item)，每个任务一完成就调用 on_result(item, result, error)，不等待前面较慢的任务，
+    需要固定顺序的调用方自行在最终输出时排序。单个任务的异常被捕获后作为 error 交出（result 为 None），
+    不影响其他任务；on_result 只在调用线程中执行，不需要额外加锁
+    """
+    pool = ThreadPoolExecutor(max_workers=max(1, max_workers))
+    try:
+        futures = {pool.submit(fn, item): item for item in items}
+        for future in as_completed(futures):
+            try:
+                result, error = future.result(), None
+            except Exception as e:
+                result, error = None, e
+            on_result(futures[future], result, error)
+    finally:
+        # 中断（如 Ctrl+C）时丢弃尚未开始的任务，已在执行的任务结束后再退出
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def format_error(error: BaseException) -> str:
+    return "".join(traceback.format_exception(type(error), error, error.__traceback__))